@@ -0,0 +1,43 @@
+"""
+Stand-in model for load testing the storyteller service without Groq.
+
+Enabled with STORYTELLER_FAKE_LLM=1. Every call waits
+STORYTELLER_FAKE_LLM_LATENCY seconds (default 1.0) and returns a canned
+passage, so the service's own overhead (routing, MongoDB, serialization) can
+be measured under realistic concurrency without paying for model calls.
+Synchronous calls block like the real client does when used via .invoke().
+"""
+import asyncio
+import os
+import time
+
+
+FAKE_PASSAGE = (
+    "The lantern flickers as the wind finds its way through the cracked shutters. "
+    "Somewhere below, a door groans on rusted hinges and the smell of salt and old smoke drifts up the stairs.\n\n"
+    "Footsteps answer the sound, slow and deliberate, pausing each time the floorboards complain. "
+    "Whoever it is knows the house well enough to avoid the loudest ones.\n\n"
+    "On the table, the map you found earlier has shifted, its corner now pointing toward the cellar."
+)
+
+
+def fake_llm_enabled():
+    return os.environ.get("STORYTELLER_FAKE_LLM", "").lower() in ("1", "true", "yes")
+
+
+def make_fake_llm(latency=None):
+    """Runnable that behaves like a chat model returning FAKE_PASSAGE after `latency` seconds"""
+    from langchain_core.runnables import RunnableLambda
+
+    if latency is None:
+        latency = float(os.environ.get("STORYTELLER_FAKE_LLM_LATENCY", "1.0"))
+
+    def respond(_prompt):
+        time.sleep(latency)
+        return FAKE_PASSAGE
+
+    async def arespond(_prompt):
+        await asyncio.sleep(latency)
+        return FAKE_PASSAGE
+
+    return RunnableLambda(respond, afunc=arespond, name="FakeStoryLLM")
@@ -0,0 +1,144 @@
+"""
+Record/replay cassettes for the storyteller's LLM calls.
+
+CassetteLLM sits where the chat model sits in a chain
+(prompt | llm | StrOutputParser()). In record mode it streams from the real
+model and saves the prompt, the completion chunks and when each chunk
+arrived. In replay mode it serves the completion back with the recorded
+chunk timing, divided by LLM_CASSETTE_SPEED, without touching the provider.
+
+    LLM_CASSETTE_MODE   off (default) | record | replay
+    LLM_CASSETTE_DIR    cassette store, one JSON file per prompt hash (default ./cassettes)
+    LLM_CASSETTE_SPEED  replay speed factor; 1 = original latency, 0 = no delay
+
+Cassettes are keyed by the SHA-256 of model name + rendered prompt, so
+replay is exact-match: a prompt that was never recorded raises
+CassetteMissError.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """Replay mode found no cassette for a prompt"""
+
+
+def cassette_mode():
+    mode = os.environ.get("LLM_CASSETTE_MODE", "off").lower() or "off"
+    if mode not in MODES:
+        raise ValueError(f"LLM_CASSETTE_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+    return mode
+
+
+def _prompt_text(prompt):
+    return prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+
+
+def _chunk_text(chunk):
+    return chunk.content if hasattr(chunk, "content") else str(chunk)
+
+
+class CassetteLLM(Runnable):
+    """Chat-model stand-in that records to or replays from a cassette directory"""
+
+    def __init__(self, llm, model, mode=None, directory=None, speed=None):
+        self.llm = llm
+        self.model = model
+        self.mode = mode or cassette_mode()
+        self.directory = Path(directory or os.environ.get("LLM_CASSETTE_DIR", "cassettes"))
+        self.speed = float(os.environ.get("LLM_CASSETTE_SPEED", "1") if speed is None else speed)
+        if self.mode == "record" and llm is None:
+            raise ValueError("Record mode needs the real model to wrap")
+
+    def key(self, prompt):
+        return hashlib.sha256(f"{self.model}\n{_prompt_text(prompt)}".encode("utf-8")).hexdigest()
+
+    def _path(self, prompt):
+        return self.directory / f"{self.key(prompt)}.json"
+
+    def _save(self, prompt, chunks):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(prompt)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "model": self.model,
+            "prompt": _prompt_text(prompt),
+            "recorded": time.strftime('%Y-%m-%d %H:%M:%S'),
+            # [seconds since the request started, text]
+            "chunks": chunks
+        }, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _load(self, prompt):
+        path = self._path(prompt)
+        if not path.exists():
+            raise CassetteMissError(f"No cassette for {self.model} prompt {self.key(prompt)[:12]} in {self.directory}")
+        return json.loads(path.read_text(encoding="utf-8"))["chunks"]
+
+    def _delays(self, chunks):
+        """Sleep before each chunk so replay reproduces the recorded arrival times"""
+        previous = 0.0
+        for offset, text in chunks:
+            yield ((offset - previous) / self.speed if self.speed > 0 else 0.0), text
+            previous = offset
+
+    # --- streaming ---
+
+    def stream(self, input, config=None, **kwargs):
+        if self.mode == "replay":
+            for delay, text in self._delays(self._load(input)):
+                time.sleep(delay)
+                yield AIMessageChunk(content=text)
+            return
+        start = time.perf_counter()
+        chunks = []
+        for chunk in self.llm.stream(input, config, **kwargs):
+            text = _chunk_text(chunk)
+            chunks.append([round(time.perf_counter() - start, 4), text])
+            yield AIMessageChunk(content=text)
+        self._save(input, chunks)
+
+    async def astream(self, input, config=None, **kwargs):
+        if self.mode == "replay":
+            for delay, text in self._delays(self._load(input)):
+                await asyncio.sleep(delay)
+                yield AIMessageChunk(content=text)
+            return
+        start = time.perf_counter()
+        chunks = []
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            text = _chunk_text(chunk)
+            chunks.append([round(time.perf_counter() - start, 4), text])
+            yield AIMessageChunk(content=text)
+        self._save(input, chunks)
+
+    # --- single response, built from the stream so timing is always captured ---
+
+    def invoke(self, input, config=None, **kwargs):
+        return AIMessage(content="".join(chunk.content for chunk in self.stream(input, config, **kwargs)))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return AIMessage(content="".join([chunk.content async for chunk in self.astream(input, config, **kwargs)]))
+
+
+def with_cassette(make_model, model):
+    """
+    Model to use for `model` under the current LLM_CASSETTE_MODE. make_model
+    builds the real (or fake) model and is not called in replay mode.
+    """
+    mode = cassette_mode()
+    if mode == "replay":
+        return CassetteLLM(None, model, mode)
+    if mode == "record":
+        return CassetteLLM(make_model(), model, mode)
+    return make_model()
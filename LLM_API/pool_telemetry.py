@@ -0,0 +1,178 @@
+"""
+MongoDB connection-pool telemetry from CMAP events.
+
+PoolTelemetry is a pymongo ConnectionPoolListener registered on the Motor
+client. For every server pool it tracks open, in-use and waiting checkouts
+(current and peak), checkout failures by reason, and a checkout-latency
+histogram, which is the time a request waited for a connection. Peaks close
+to maxPoolSize together with growing checkout latency mean the pool is too
+small for the traffic; a pool that never gets near its size can be shrunk.
+
+Callbacks run on driver threads, so all counters sit behind one lock.
+"""
+import math
+import threading
+
+from pymongo import monitoring
+
+
+# PoolCreatedEvent only lists non-default options; this is the driver's default size
+DEFAULT_MAX_POOL_SIZE = 100
+# Upper bounds of the checkout-latency buckets, in milliseconds
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+
+
+class _PoolStats:
+    def __init__(self):
+        self.options = {}
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.max_open = 0
+        self.max_in_use = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.failures = {}
+        self.cleared = 0
+        self.buckets = [0] * len(BUCKET_BOUNDS_MS)
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+
+    def record_latency(self, seconds):
+        ms = seconds * 1000
+        for index, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                break
+        self.latency_sum_ms += ms
+        self.latency_max_ms = max(self.latency_max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (the true max for the last one)"""
+        total = sum(self.buckets)
+        if not total:
+            return 0.0
+        rank = math.ceil(total * q / 100)
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.latency_max_ms)
+        return self.latency_max_ms
+
+    def snapshot(self):
+        measured = sum(self.buckets)
+        max_pool_size = self.options.get("maxPoolSize", DEFAULT_MAX_POOL_SIZE)
+        return {
+            "options": self.options,
+            "max_pool_size": max_pool_size,
+            "open": self.open,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "max_open": self.max_open,
+            "max_in_use": self.max_in_use,
+            "max_waiting": self.max_waiting,
+            "peak_utilization": self.max_in_use / max_pool_size * 100 if max_pool_size else None,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.failures),
+            "pool_cleared": self.cleared,
+            "checkout_ms": {
+                "mean": self.latency_sum_ms / measured if measured else 0.0,
+                "p50": self.percentile(50),
+                "p95": self.percentile(95),
+                "p99": self.percentile(99),
+                "max": self.latency_max_ms
+            },
+            "checkout_ms_buckets": {
+                ("+Inf" if math.isinf(bound) else str(bound)): count
+                for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets)
+            }
+        }
+
+
+class PoolTelemetry(monitoring.ConnectionPoolListener):
+    """Aggregates CMAP events per server address"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def _pool(self, address):
+        key = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+        if key not in self._pools:
+            self._pools[key] = _PoolStats()
+        return self._pools[key]
+
+    def snapshot(self):
+        with self._lock:
+            return {address: stats.snapshot() for address, stats in self._pools.items()}
+
+    def reset(self):
+        """Zero counters and peaks; current open / in-use / waiting levels are kept"""
+        with self._lock:
+            for address, stats in list(self._pools.items()):
+                fresh = _PoolStats()
+                fresh.options = stats.options
+                fresh.open = fresh.max_open = stats.open
+                fresh.in_use = fresh.max_in_use = stats.in_use
+                fresh.waiting = fresh.max_waiting = stats.waiting
+                self._pools[address] = fresh
+
+    # --- pool events ---
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address).options = dict(event.options)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # --- connection events ---
+
+    def connection_created(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.open += 1
+            stats.max_open = max(stats.max_open, stats.open)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.open = max(stats.open - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.waiting += 1
+            stats.max_waiting = max(stats.max_waiting, stats.waiting)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.waiting = max(stats.waiting - 1, 0)
+            stats.in_use += 1
+            stats.max_in_use = max(stats.max_in_use, stats.in_use)
+            stats.checkouts += 1
+            if getattr(event, "duration", None) is not None:
+                stats.record_latency(event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.waiting = max(stats.waiting - 1, 0)
+            stats.failures[event.reason] = stats.failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.in_use = max(stats.in_use - 1, 0)
@@ -1,35 +1,213 @@
+import asyncio
+import hmac
 import os
 import random
+import threading
+import time
 import traceback
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
 from bson.errors import InvalidId
-import motor.motor_asyncio
-
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from dotenv import load_dotenv
 
-load_dotenv()
+from compression import DEFAULT_MINIMUM_SIZE, CompressionMiddleware
+from fake_llm import fake_llm_enabled, make_fake_llm
+from trace_recorder import TraceRecorder, record_shape
 
-# --- FastAPI Setup ---
-app = FastAPI(title="AI Storyteller API", strict_slashes=True)
+# langchain, langchain_groq and motor are imported on first use rather than
+# here: they are most of the import time, and on a serverless cold start
+# requests such as /health never need them.
+
+load_dotenv()
 
 # --- MongoDB Setup ---
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-db = client["test"]
-story_collection = db["stories"]
+DATABASE_NAME = "test"
+mongo_client = None
+pool_telemetry = None
+# Clients may be created from the warm-up thread and a request at the same time
+_client_lock = threading.Lock()
+
+# Pool options from the environment; unset ones keep the driver defaults
+# (maxPoolSize 100, minPoolSize 0, no idle limit, no wait-queue timeout)
+MONGO_POOL_ENV = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "maxConnecting": "MONGO_MAX_CONNECTING"
+}
+
+
+def mongo_pool_options():
+    return {option: int(os.environ[name]) for option, name in MONGO_POOL_ENV.items() if os.environ.get(name)}
+
+
+def get_mongo_client():
+    """Motor client, created (and motor imported) on first use, with pool telemetry attached"""
+    global mongo_client, pool_telemetry
+    with _client_lock:
+        if mongo_client is None:
+            import motor.motor_asyncio
+            from pool_telemetry import PoolTelemetry
+            pool_telemetry = PoolTelemetry()
+            mongo_client = motor.motor_asyncio.AsyncIOMotorClient(
+                MONGO_URI, event_listeners=[pool_telemetry], **mongo_pool_options()
+            )
+    return mongo_client
+
+
+class LazyCollection:
+    """Stands in for a Motor collection and forwards to it once the client exists"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_mongo_client()[DATABASE_NAME][self.name], attr)
+
+
+# Module global so tests can keep patching storyteller_fastapi.story_collection
+story_collection = LazyCollection("stories")
+
+# Story reads ask the server for only what /story/continue uses, so turn ids,
+# timestamps and (for the prompt) user ids are never sent or decoded.
+# Testing/NFR_tests/serialization_benchmark.py (read path) measures the effect.
+STORY_CONTEXT_PROJECTION = {
+    "title": 1, "description": 1, "dialect": 1, "summary": 1, "ownerid": 1,
+    "content.prompt": 1, "content.response": 1
+}
+# The response, shaped by the server (MongoDB 4.4+ projection expressions):
+# user ids arrive as strings and missing fields as "", so the turns are
+# returned exactly as read, with no ObjectId or dict built per turn.
+STORY_RESPONSE_PROJECTION = {
+    "title": 1, "description": 1, "summary": 1, "complete": 1,
+    "content": {"$map": {
+        "input": {"$ifNull": ["$content", []]},
+        "as": "turn",
+        "in": {
+            "prompt": {"$ifNull": ["$$turn.prompt", ""]},
+            "user": {"$ifNull": [{"$toString": "$$turn.user"}, ""]},
+            "response": {"$ifNull": ["$$turn.response", ""]}
+        }
+    }}
+}
+
+# --- Provider HTTP Clients ---
+# Shared by every ChatGroq instance so connections (and TLS sessions) to the
+# provider are reused across requests instead of opened per request.
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "https://api.groq.com")
+provider_http_client = None
+provider_async_client = None
+
+
+def get_provider_http_clients():
+    """(sync, async) httpx clients for the model provider, created on first use"""
+    global provider_http_client, provider_async_client
+    with _client_lock:
+        if provider_http_client is None:
+            import httpx
+            limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            provider_http_client = httpx.Client(limits=limits, timeout=60)
+            provider_async_client = httpx.AsyncClient(limits=limits, timeout=60)
+    return provider_http_client, provider_async_client
+
+
+# --- FastAPI Setup ---
+def _preload():
+    """Import the LLM stack in the background so the first story request does not pay for it"""
+    import langchain_groq  # noqa: F401
+    import langchain_core.prompts  # noqa: F401
+    import langchain_core.output_parsers  # noqa: F401
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global mongo_client, provider_http_client, provider_async_client, warmup_task
+    # Long-running servers can warm up right away; serverless deployments leave this unset
+    if os.environ.get("STORYTELLER_PRELOAD", "").lower() in ("1", "true", "yes"):
+        threading.Thread(target=_preload, daemon=True).start()
+    # Long-running servers can also open the Mongo pool and provider connections in the
+    # background (/ready reports "warming_up" until done); serverless leaves this unset too
+    if os.environ.get("STORYTELLER_WARMUP", "").lower() in ("1", "true", "yes"):
+        warmup_task = asyncio.create_task(warm_up())
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        warmup_task = None
+    if mongo_client is not None:
+        mongo_client.close()
+        mongo_client = None
+    if provider_http_client is not None:
+        provider_http_client.close()
+        await provider_async_client.aclose()
+        provider_http_client = provider_async_client = None
+
+
+app = FastAPI(title="AI Storyteller API", strict_slashes=True, lifespan=lifespan)
+
+# zstd / br / gzip by Accept-Encoding for bodies above the threshold (see compression.py)
+if os.environ.get("STORYTELLER_COMPRESSION", "1").lower() not in ("0", "false", "no"):
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.environ.get("COMPRESSION_MIN_SIZE", DEFAULT_MINIMUM_SIZE))
+    )
+
+# Record anonymized request shapes for trace replay (Testing/NFR_tests/trace_replay.py)
+TRACE_RECORD_PATH = os.environ.get("TRACE_RECORD_PATH")
+if TRACE_RECORD_PATH:
+    app.add_middleware(TraceRecorder, path=TRACE_RECORD_PATH)
 
 # --- LLM Setup ---
+def make_llm(model, api_key):
+    """
+    Groq chat model, or the canned fake when STORYTELLER_FAKE_LLM is set (load testing).
+    LLM_CASSETTE_MODE=record/replay wraps it in a cassette (see llm_cassette.py).
+    """
+    from llm_cassette import with_cassette
+
+    def build():
+        if fake_llm_enabled():
+            return make_fake_llm()
+        from langchain_groq import ChatGroq
+        http_client, http_async_client = get_provider_http_clients()
+        return ChatGroq(model=model, temperature=0.9, groq_api_key=api_key,
+                        http_client=http_client, http_async_client=http_async_client)
+    return with_cassette(build, model)
+
+
+def build_chain(prompt, llm):
+    from langchain_core.output_parsers import StrOutputParser
+    return prompt | llm | StrOutputParser()
+
+
+class LazyPromptTemplate:
+    """PromptTemplate arguments, turned into the real template on first use"""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._prompt = None
+
+    def get(self):
+        if self._prompt is None:
+            from langchain_core.prompts import PromptTemplate
+            self._prompt = PromptTemplate(**self.kwargs)
+        return self._prompt
+
+    def __or__(self, other):
+        return self.get() | other
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
 
 # --- Prompt Templates ---
 
 # 1. Improved Dialect Generation Prompt - Now detects if it's fanfic and extracts source style
-dialect_prompt = PromptTemplate(
+dialect_prompt = LazyPromptTemplate(
     input_variables=["description"],
     template=(
         "Analyze this story description.\n\n"
@@ -46,7 +224,7 @@ dialect_prompt = PromptTemplate(
 )
 
 # 2. Improved Story Setup Prompt - Handles both original and fanfic
-setup_prompt = PromptTemplate(
+setup_prompt = LazyPromptTemplate(
     input_variables=["title", "description", "character", "dialect", "genre"],
     template=(
         "You are a masterful storyteller creating a {genre} story.\n\n"
@@ -67,7 +245,7 @@ setup_prompt = PromptTemplate(
 )
 
 # 3. Improved Story Continuation Prompt - Maintains style consistency
-story_prompt = PromptTemplate(
+story_prompt = LazyPromptTemplate(
     input_variables=["story_so_far", "user_input", "character", "dialect"],
     template=(
         "Continue this story where {character} is the protagonist.\n\n"
@@ -89,7 +267,7 @@ story_prompt = PromptTemplate(
 )
 
 # 4. Improved Summary Prompt
-summary_prompt = PromptTemplate(
+summary_prompt = LazyPromptTemplate(
     input_variables=["existing_summary", "new_chunk"],
     template=(
         "You are condensing a story while preserving its essence.\n\n"
@@ -155,25 +333,65 @@ class ContinueStoryRequest(BaseModel):
     user_action: str
     api_key: str
 
+# Response models: with a response_model FastAPI validates the returned dict and
+# serializes it straight to JSON bytes in pydantic-core, skipping the
+# jsonable_encoder + json.dumps pass that untyped responses go through. This
+# matters for /story/continue, which returns every turn of the story.
+# (Testing/NFR_tests/serialization_benchmark.py measures the difference.)
+class NewStoryResponse(BaseModel):
+    content: str
+    character: str
+    dialect: str
+
+class StoryTurn(BaseModel):
+    prompt: Optional[str] = None
+    user: str
+    response: Optional[str] = None
+
+class ContinueStoryResponse(BaseModel):
+    story_id: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    character: Optional[str] = None
+    content: List[StoryTurn]
+    summary: Optional[str] = None
+    complete: bool = False
+    dialect: Optional[str] = None
+
+class HealthResponse(BaseModel):
+    status: str
+    database: str
+
+class ReadinessResponse(BaseModel):
+    status: str
+    checks: Dict[str, dict]
+
+class PoolMetricsResponse(BaseModel):
+    config: Dict[str, int]
+    pools: Dict[str, dict]
+
+class PoolResetResponse(BaseModel):
+    reset: bool
 
 
 # --- API Endpoints ---
-@app.post("/story/new")
+@app.post("/story/new", response_model=NewStoryResponse)
 async def start_new_story(request: NewStoryRequest):
     """Non-streaming version (backward compatible)"""
     try:
-        llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.9,
-            groq_api_key=request.api_key
+        record_shape(
+            name_chars=len(request.name),
+            description_chars=len(request.description),
+            character_chars=len(request.owner.character)
         )
+        llm = make_llm("llama-3.3-70b-versatile", request.api_key)
         global dialect_chain, setup_chain
 
         # Tests patch these — DO NOT override if patched
         if dialect_chain is None:
-            dialect_chain = dialect_prompt | llm | StrOutputParser()
+            dialect_chain = build_chain(dialect_prompt, llm)
         if setup_chain is None:
-            setup_chain = setup_prompt | llm | StrOutputParser()
+            setup_chain = build_chain(setup_prompt, llm)
 
         dialect = dialect_chain.invoke({"description": request.description})
 
@@ -207,19 +425,16 @@ async def start_new_story(request: NewStoryRequest):
         raise HTTPException(status_code=500, detail=f"Error generating story: {str(e)}")
 
 
-@app.post("/story/continue")
+@app.post("/story/continue", response_model=ContinueStoryResponse)
 async def continue_story_api(request: ContinueStoryRequest):
     try:
-        llm = ChatGroq(
-            model="moonshotai/kimi-k2-instruct",
-            temperature=0.9,
-            groq_api_key=request.api_key
-        )
+        record_shape(action_chars=len(request.user_action))
+        llm = make_llm("moonshotai/kimi-k2-instruct", request.api_key)
         global story_chain, summary_chain
         if story_chain is None:
-            story_chain = story_prompt | llm | StrOutputParser()
+            story_chain = build_chain(story_prompt, llm)
         if summary_chain is None:
-            summary_chain = summary_prompt | llm | StrOutputParser()
+            summary_chain = build_chain(summary_prompt, llm)
 
         try:
             story_oid = ObjectId(request.story_id)
@@ -231,7 +446,7 @@ async def continue_story_api(request: ContinueStoryRequest):
         except InvalidId:
             raise HTTPException(status_code=400, detail=f"Invalid user_id format: {request.user_id}")
 
-        story = await story_collection.find_one({"_id": story_oid})
+        story = await story_collection.find_one({"_id": story_oid}, STORY_CONTEXT_PROJECTION)
         if not story:
             raise HTTPException(status_code=404, detail="Story not found")
         
@@ -244,6 +459,14 @@ async def continue_story_api(request: ContinueStoryRequest):
         if not isinstance(content_list, list):
             raise HTTPException(status_code=500, detail="Invalid content format")
 
+        # Formatted once; reused as the prompt context unless summarization trims it
+        formatted_content = format_story_chunk(content_list)
+        record_shape(
+            turns=len(content_list),
+            story_chars=len(formatted_content),
+            summary_chars=len(summary or "")
+        )
+
         character = None
         for owner_entry in story.get("ownerid", []):
             if str(owner_entry.get("owner")) == request.user_id:
@@ -255,8 +478,9 @@ async def continue_story_api(request: ContinueStoryRequest):
         MAX_RECENT_CONTEXT_TURNS = 15
         TURNS_TO_TRIGGER_SUMMARY = 10
 
-        existing_summary = story.get("summary", "")
-        recent_content_list = story.get("content", [])
+        existing_summary = summary
+        recent_content_list = content_list
+        formatted_recent_content = formatted_content
         
         # Check if context needs summarization
         if len(recent_content_list) > MAX_RECENT_CONTEXT_TURNS:
@@ -274,20 +498,21 @@ async def continue_story_api(request: ContinueStoryRequest):
             
             existing_summary = new_summary.strip()
             recent_content_list = remaining_recent_content
+            formatted_recent_content = format_story_chunk(recent_content_list)
             
+            # Drop the summarized turns on the server (update pipeline, MongoDB 4.2+) rather
+            # than writing the remaining ones back: the context read has no turn ids or users
             await story_collection.update_one(
                 {"_id": story_oid},
-                {
+                [{
                     "$set": {
                         "summary": existing_summary,
-                        "content": remaining_recent_content
+                        "content": {"$slice": ["$content", TURNS_TO_TRIGGER_SUMMARY, {"$size": "$content"}]}
                     }
-                }
+                }]
             )
             print("--- LOG: Summarization complete. DB updated. ---")
 
-        formatted_recent_content = format_story_chunk(recent_content_list)
-        
         # Combine summary and recent events
         story_so_far = ""
         if existing_summary:
@@ -317,22 +542,14 @@ async def continue_story_api(request: ContinueStoryRequest):
             raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
 
-        updated_story = await story_collection.find_one({"_id": story_oid})
-        
-        content_list = []
-        for c in updated_story.get("content", []):
-            content_list.append({
-                "prompt": c.get("prompt", ""),
-                "user": str(c.get("user", "")),
-                "response": c.get("response", "")
-            })
+        updated_story = await story_collection.find_one({"_id": story_oid}, STORY_RESPONSE_PROJECTION)
 
         return {
             "story_id": str(updated_story["_id"]),
             "title": updated_story.get("title", ""),
             "description": updated_story.get("description", ""),
             "character": character,
-            "content": content_list,
+            "content": updated_story.get("content", []),
             "summary": updated_story.get("summary", ""),
             "complete": updated_story.get("complete", False),
             "dialect": dialect
@@ -346,10 +563,138 @@ async def continue_story_api(request: ContinueStoryRequest):
         traceback.print_exc() 
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
     
-@app.get("/health")
+@app.get("/health", response_model=HealthResponse)
 async def health_check():
     return {"status": "healthy", "database": "test"}
 
+
+# --- Readiness ---
+READY_TIMEOUT = float(os.environ.get("READY_TIMEOUT", "2"))
+# How long a check result is reused; probes inside the window cost nothing
+READY_CACHE_SECONDS = {
+    "mongo": float(os.environ.get("READY_MONGO_CACHE_SECONDS", "5")),
+    "llm_provider": float(os.environ.get("READY_PROVIDER_CACHE_SECONDS", "60"))
+}
+readiness_cache = {}
+_refreshing = set()
+warmup_task = None
+
+
+def provider_required():
+    """The real provider is only needed when neither the fake model nor cassette replay is in use"""
+    return not fake_llm_enabled() and os.environ.get("LLM_CASSETTE_MODE", "off").lower() != "replay"
+
+
+async def _timed(probe):
+    start = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(probe(), READY_TIMEOUT)
+        result = {"ok": True, **(detail or {})}
+    except asyncio.TimeoutError:
+        result = {"ok": False, "error": f"no answer within {READY_TIMEOUT}s"}
+    except Exception as e:
+        result = {"ok": False, "error": str(e) or type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+async def ping_mongo():
+    await get_mongo_client().admin.command("ping")
+
+
+async def probe_provider():
+    """Any HTTP answer from the provider API (401 without a key) means it is reachable"""
+    if not provider_required():
+        return {"skipped": "fake model" if fake_llm_enabled() else "cassette replay"}
+    _, client = get_provider_http_clients()
+    response = await client.get(f"{GROQ_BASE_URL}/openai/v1/models", timeout=READY_TIMEOUT)
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return {"status_code": response.status_code}
+
+
+READY_CHECKS = {"mongo": ping_mongo, "llm_provider": probe_provider}
+
+
+async def run_check(name):
+    """Run one check now and cache its result"""
+    result = await _timed(READY_CHECKS[name])
+    result["checked_at"] = time.time()
+    readiness_cache[name] = (time.monotonic(), result)
+    return result
+
+
+async def cached_check(name):
+    """
+    Cached result of a check. A stale result is refreshed by the first caller;
+    callers arriving while that refresh runs get the stale result instead of
+    piling more pings onto the dependency.
+    """
+    cached = readiness_cache.get(name)
+    if cached and time.monotonic() - cached[0] < READY_CACHE_SECONDS[name]:
+        return cached[1]
+    if cached and name in _refreshing:
+        return cached[1]
+    _refreshing.add(name)
+    try:
+        return await run_check(name)
+    finally:
+        _refreshing.discard(name)
+
+
+async def warm_up():
+    """Open a Mongo connection and a provider connection so the first real request finds them ready"""
+    # Creating the clients imports motor and httpx; keep that off the event loop
+    await asyncio.gather(asyncio.to_thread(get_mongo_client), asyncio.to_thread(get_provider_http_clients))
+    await asyncio.gather(*(run_check(name) for name in READY_CHECKS))
+
+
+@app.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check():
+    """Deep readiness: 200 when Mongo and the model provider answer, 503 otherwise"""
+    if warmup_task is not None and not warmup_task.done():
+        return JSONResponse(status_code=503, content={"status": "warming_up", "checks": {}})
+    checks = dict(zip(READY_CHECKS, await asyncio.gather(*(cached_check(name) for name in READY_CHECKS))))
+    now = time.time()
+    ready = all(result["ok"] for result in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "checks": {name: {**result, "age_s": round(now - result["checked_at"], 2)} for name, result in checks.items()}
+        }
+    )
+
+
+# --- Pool Metrics ---
+def check_metrics_token(token):
+    """The /metrics routes only exist when METRICS_TOKEN is set, and require it in X-Metrics-Token"""
+    expected = os.environ.get("METRICS_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@app.get("/metrics/pool", response_model=PoolMetricsResponse)
+async def pool_metrics(x_metrics_token: Optional[str] = Header(None)):
+    """Connection-pool telemetry per MongoDB server (empty until the client is first used)"""
+    check_metrics_token(x_metrics_token)
+    return {
+        "config": mongo_pool_options(),
+        "pools": pool_telemetry.snapshot() if pool_telemetry is not None else {}
+    }
+
+
+@app.post("/metrics/pool/reset", response_model=PoolResetResponse)
+async def reset_pool_metrics(x_metrics_token: Optional[str] = Header(None)):
+    """Start a new measurement window, e.g. between load-test runs"""
+    check_metrics_token(x_metrics_token)
+    if pool_telemetry is not None:
+        pool_telemetry.reset()
+    return {"reset": pool_telemetry is not None}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
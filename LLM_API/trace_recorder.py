@@ -0,0 +1,81 @@
+"""
+Request-shape recorder for the storyteller service.
+
+Pure ASGI middleware that appends one compact JSON line per HTTP request:
+arrival offset, matched route, status, duration and the anonymized shape the
+handler reported through record_shape() (character counts and turn counts,
+never the text itself). The file is replayed by
+Testing/NFR_tests/trace_replay.py to load test with the real traffic mix.
+
+Enabled by setting TRACE_RECORD_PATH. Each process start writes a header line
+{"trace": 1, "started": <unix time>}; records carry "t", the seconds since
+that header, so several runs can share one file.
+"""
+import contextvars
+import json
+import time
+from pathlib import Path
+
+
+_shape = contextvars.ContextVar("trace_shape", default=None)
+
+
+def record_shape(**fields):
+    """Attach anonymized size fields to the trace record of the current request (no-op if not recording)"""
+    shape = _shape.get()
+    if shape is not None:
+        shape.update(fields)
+
+
+class TraceRecorder:
+    """ASGI middleware writing one trace record per HTTP request to `path`"""
+
+    def __init__(self, app, path):
+        self.app = app
+        self.path = Path(path)
+        self._file = None
+        self._origin = None
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._origin = time.perf_counter()
+        self._file.write(json.dumps({"trace": 1, "started": round(time.time(), 3)}) + "\n")
+
+    def _write(self, scope, start, duration, status, shape):
+        # Route template rather than the raw path, so ids or probes of unknown URLs are not logged
+        route = scope.get("route")
+        record = {
+            "t": round(start - self._origin, 4),
+            "m": scope["method"],
+            "ep": getattr(route, "path", None) or "<unmatched>",
+            "st": status,
+            "d": round(duration, 4)
+        }
+        if shape:
+            record["shape"] = shape
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        shape = {}
+        token = _shape.set(shape)
+        status = 500
+        if self._file is None:
+            self._open()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _shape.reset(token)
+            self._write(scope, start, time.perf_counter() - start, status, shape)
@@ -0,0 +1,24 @@
+import sys
+
+import page_tests
+
+# Pages covered by the individual *_page.test.py scripts
+PAGES = [
+    ("Login", "https://quest-ai-frontend.vercel.app/Login"),
+    ("Sign_Up", "https://quest-ai-frontend.vercel.app"),
+    ("Public_Story", "https://quest-ai-frontend.vercel.app/Public_Story"),
+    ("About_Us", "https://quest-ai-frontend.vercel.app/About"),
+]
+
+
+if __name__ == "__main__":
+
+    # Run every page's NFR suite, one worker process per page and test group
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    summary = page_tests.run_nfr_test_suites_parallel(PAGES, max_workers=max_workers)
+
+    print("\n" + "=" * 60)
+    print("ALL PAGES")
+    print("=" * 60)
+    for page_name, passed in summary.items():
+        print(f"{page_name}: {'✓ PASS' if passed else '✗ FAIL'}")
@@ -0,0 +1,135 @@
+"""
+Browser-native performance metrics for page load tests.
+
+Reads Navigation Timing, Paint Timing, Largest Contentful Paint and
+Cumulative Layout Shift from the page through WebDriver's script interface,
+so load tests report what the browser measured instead of Selenium's own
+round trips. All times are in milliseconds from navigation start.
+"""
+import json
+import time
+
+import numpy as np
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+METRICS = ('ttfb', 'fcp', 'lcp', 'dom_content_loaded', 'load', 'dns', 'connect', 'tls', 'cls', 'transfer_size')
+
+_NAVIGATION_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const paints = {};
+for (const entry of performance.getEntriesByType('paint')) {
+    paints[entry.name] = entry.startTime;
+}
+return {navigation: nav ? nav.toJSON() : null, paints: paints};
+"""
+
+# LCP and layout-shift entries are only exposed to PerformanceObservers;
+# buffered: true replays the entries recorded before the observer existed.
+_VITALS_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const result = {lcp: null, cls: 0};
+try {
+    new PerformanceObserver((list) => {
+        const entries = list.getEntries();
+        if (entries.length) result.lcp = entries[entries.length - 1].startTime;
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+    new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+            if (!entry.hadRecentInput) result.cls += entry.value;
+        }
+    }).observe({type: 'layout-shift', buffered: true});
+} catch (e) {}
+setTimeout(() => done(result), 100);
+"""
+
+
+def wait_for_load_event(driver, timeout=30):
+    """Wait until the load event has finished so loadEventEnd is populated"""
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script(
+        "const nav = performance.getEntriesByType('navigation')[0];"
+        "return document.readyState === 'complete' && !!nav && nav.loadEventEnd > 0;"
+    ))
+
+
+def collect_page_metrics(driver, timeout=30):
+    """
+    Collect one sample of browser metrics for the page currently loaded.
+    If the load event has not finished within timeout (e.g. a hung
+    subresource), the other metrics are still collected and 'load' is None.
+    """
+    try:
+        wait_for_load_event(driver, timeout)
+    except TimeoutException:
+        pass
+    timing = driver.execute_script(_NAVIGATION_SCRIPT)
+    vitals = driver.execute_async_script(_VITALS_SCRIPT)
+
+    nav = timing['navigation'] or {}
+    paints = timing['paints']
+    secure_start = nav.get('secureConnectionStart', 0)
+    return {
+        'ttfb': nav.get('responseStart', 0) - nav.get('startTime', 0),
+        'fcp': paints.get('first-contentful-paint'),
+        'lcp': vitals.get('lcp'),
+        'dom_content_loaded': nav.get('domContentLoadedEventEnd'),
+        'load': nav.get('loadEventEnd') or None,
+        'dns': nav.get('domainLookupEnd', 0) - nav.get('domainLookupStart', 0),
+        'connect': nav.get('connectEnd', 0) - nav.get('connectStart', 0),
+        'tls': nav.get('connectEnd', 0) - secure_start if secure_start else 0,
+        'cls': vitals.get('cls', 0),
+        'transfer_size': nav.get('transferSize')
+    }
+
+
+def aggregate_metrics(samples):
+    """Median / P75 / P95 / min / max per metric over several page loads"""
+    aggregated = {}
+    for metric in METRICS:
+        values = [s[metric] for s in samples if s.get(metric) is not None]
+        if not values:
+            continue
+        aggregated[metric] = {
+            'median': float(np.percentile(values, 50)),
+            'p75': float(np.percentile(values, 75)),
+            'p95': float(np.percentile(values, 95)),
+            'min': float(min(values)),
+            'max': float(max(values)),
+            'samples': len(values)
+        }
+    return aggregated
+
+
+def print_metrics(aggregated):
+    for metric, stats in aggregated.items():
+        unit = "" if metric == 'cls' else (" B" if metric == 'transfer_size' else " ms")
+        print(f"  {metric:<20} median {stats['median']:.3f}{unit}  p75 {stats['p75']:.3f}{unit}  p95 {stats['p95']:.3f}{unit}")
+
+
+def write_metrics_report(page_url, samples, report_dir, prefix):
+    """Write raw samples and percentiles per metric as JSON and text"""
+    report_dir.mkdir(parents=True, exist_ok=True)
+    aggregated = aggregate_metrics(samples)
+
+    summary_file = report_dir / f"{prefix}_browser_metrics.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("BROWSER PERFORMANCE METRICS\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Page: {page_url}\nLoads: {len(samples)}\n\n")
+        f.write(f"{'Metric':<22} {'Median':<12} {'P75':<12} {'P95':<12} {'Max':<12}\n")
+        f.write("-" * 80 + "\n")
+        for metric, stats in aggregated.items():
+            f.write(f"{metric:<22} {stats['median']:<12.3f} {stats['p75']:<12.3f} "
+                    f"{stats['p95']:<12.3f} {stats['max']:<12.3f}\n")
+
+    json_file = report_dir / f"{prefix}_browser_metrics.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'url': page_url, 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')},
+            'metrics': aggregated,
+            'samples': samples
+        }, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
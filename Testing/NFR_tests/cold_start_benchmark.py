@@ -0,0 +1,281 @@
+"""
+Cold-start benchmark for the storyteller FastAPI service (LLM_API).
+
+Each run starts a fresh interpreter the way a serverless platform does and
+measures:
+    import          importing storyteller_fastapi (python -X importtime)
+    first_health    process start -> first 200 from /health
+    first_story     first POST /story/new, which pays for any lazily imported modules
+    warm_story      the second POST /story/new
+    start_to_story  process start -> first story response (first_health + first_story)
+
+Story requests use STORYTELLER_FAKE_LLM with zero latency, so only the
+service's own start-up cost is measured. STORYTELLER_PRELOAD and
+STORYTELLER_WARMUP are cleared, as on a serverless deployment. With --baseline REF the same
+measurements are taken for LLM_API at that git revision (extracted with
+git archive) to show the change in first-request latency; revisions without
+the fake model report first_story as failed.
+
+Usage:
+    python cold_start_benchmark.py [--runs 5] [--baseline HEAD~1]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+LLM_DIR = REPO_ROOT / "LLM_API"
+APP_MODULE = "storyteller_fastapi"
+METRICS = ('import', 'first_health', 'first_story', 'warm_story', 'start_to_story')
+STORY_REQUEST = {
+    'name': "Cold start",
+    'description': "A lighthouse keeper finds a door that was not there yesterday.",
+    'owner': {'owner': "000000000000000000000000", 'character': "Ash"},
+    'api_key': "cold-start-benchmark"
+}
+
+
+def _env():
+    env = dict(os.environ, STORYTELLER_FAKE_LLM="1", STORYTELLER_FAKE_LLM_LATENCY="0")
+    for name in ("LLM_CASSETTE_MODE", "TRACE_RECORD_PATH", "STORYTELLER_PRELOAD", "STORYTELLER_WARMUP"):
+        env.pop(name, None)
+    return env
+
+
+def import_profile(app_dir):
+    """(total seconds, [(module, cumulative seconds)] for the app's direct imports, slowest first)"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {APP_MODULE}"],
+        cwd=app_dir, env=_env(), capture_output=True, text=True, check=True
+    )
+    total, modules = 0.0, []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == APP_MODULE:
+            total = int(cumulative) / 1e6
+        elif depth == 1:
+            modules.append((name.strip(), int(cumulative) / 1e6))
+    modules.sort(key=lambda m: -m[1])
+    return total, modules
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(url, body=None, timeout=30):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def measure_cold_start(app_dir, timeout=60):
+    """Start the app in a new process and time its first requests"""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {'first_health': None, 'first_story': None, 'warm_story': None, 'start_to_story': None}
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            try:
+                _request(f"{base_url}/health", timeout=1)
+                result['first_health'] = time.perf_counter() - start
+                break
+            except (urllib.error.URLError, ConnectionError):
+                if process.poll() is not None:
+                    break
+                time.sleep(0.005)
+        if result['first_health'] is not None:
+            for metric in ('first_story', 'warm_story'):
+                try:
+                    result[metric] = _request(f"{base_url}/story/new", STORY_REQUEST)
+                except (urllib.error.URLError, ConnectionError):
+                    break
+            if result['first_story'] is not None:
+                result['start_to_story'] = result['first_health'] + result['first_story']
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+
+def checkout_revision(ref, directory):
+    """Extract LLM_API at `ref` into directory and return its path"""
+    archive = subprocess.run(["git", "archive", ref, "LLM_API"], cwd=REPO_ROOT, capture_output=True, check=True)
+    with tarfile.open(fileobj=BytesIO(archive.stdout)) as tar:
+        tar.extractall(directory)
+    return Path(directory) / "LLM_API"
+
+
+def benchmark_revision(app_dir, runs=5):
+    """Median / min of every metric over `runs` fresh processes"""
+    # One untimed import so every timed run starts from compiled bytecode, as a deployment would
+    import_profile(app_dir)
+    samples = {metric: [] for metric in METRICS}
+    modules = []
+    for _ in range(runs):
+        total, modules = import_profile(app_dir)
+        samples['import'].append(total)
+        for metric, value in measure_cold_start(app_dir).items():
+            if value is not None:
+                samples[metric].append(value)
+    return {
+        'metrics': {
+            metric: {
+                'median': statistics.median(values) if values else None,
+                'min': min(values) if values else None,
+                'runs': len(values)
+            } for metric, values in samples.items()
+        },
+        'slowest_imports': modules[:15]
+    }
+
+
+def _format(value):
+    return f"{value * 1000:.0f}ms" if value is not None else "failed"
+
+
+def _create_graph(results, report_dir, prefix):
+    """Grouped bars of median time per metric and revision"""
+    labels = list(results)
+    width = 0.8 / len(labels)
+    plt.figure(figsize=(10, 6))
+    for i, label in enumerate(labels):
+        values = [(results[label]['metrics'][m]['median'] or 0) * 1000 for m in METRICS]
+        plt.bar([p + i * width for p in range(len(METRICS))], values, width=width, label=label)
+    plt.xticks([p + width * (len(labels) - 1) / 2 for p in range(len(METRICS))], METRICS)
+    plt.ylabel('Median Time (ms)')
+    plt.title('Storyteller Cold Start')
+    plt.legend()
+    plt.grid(True, axis='y')
+
+    graph_file = report_dir / f"{prefix}_cold_start.png"
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def generate_cold_start_report(runs=5, baseline=None, output_dir="load_reports", graph_prefix=None, folder_name=None):
+    """Benchmark the working tree (and optionally a baseline revision) and write the report"""
+    report_name = folder_name or graph_prefix or "cold_start"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "cold_start"
+
+    print("=" * 80)
+    print("COLD START BENCHMARK")
+    print("=" * 80)
+    print(f"App: {LLM_DIR / APP_MODULE}.py  Runs: {runs}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = {"working tree": LLM_DIR}
+        if baseline:
+            targets = {baseline: checkout_revision(baseline, tmp), **targets}
+        for label, app_dir in targets.items():
+            print(f"\n{label}:")
+            results[label] = benchmark_revision(app_dir, runs)
+            for metric in METRICS:
+                print(f"  {metric:<16} {_format(results[label]['metrics'][metric]['median'])}")
+
+    if baseline:
+        print()
+        for metric in METRICS:
+            before = results[baseline]['metrics'][metric]['median']
+            after = results["working tree"]['metrics'][metric]['median']
+            if before and after:
+                symbol = "✓" if after <= before else "✗"
+                print(f"{symbol} {metric}: {_format(before)} -> {_format(after)} ({(after - before) / before * 100:+.0f}%)")
+
+    graph_file = _create_graph(results, report_dir, prefix)
+
+    profile_file = report_dir / f"{prefix}_importtime.txt"
+    with open(profile_file, 'w', encoding='utf-8') as f:
+        for label, result in results.items():
+            f.write(f"{label}: slowest direct imports of {APP_MODULE} (cumulative)\n")
+            f.write("-" * 80 + "\n")
+            for module, seconds in result['slowest_imports']:
+                f.write(f"{module:<50} {seconds * 1000:>8.1f}ms\n")
+            f.write("\n")
+
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("COLD START BENCHMARK\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Runs per revision: {runs} (median, min in parentheses)\n\n")
+        f.write(f"{'Metric':<16}" + "".join(f"{label:<24}" for label in results) + "\n")
+        f.write("-" * 80 + "\n")
+        for metric in METRICS:
+            row = f"{metric:<16}"
+            for result in results.values():
+                m = result['metrics'][metric]
+                row += f"{_format(m['median']) + ' (' + _format(m['min']) + ')':<24}"
+            f.write(row + "\n")
+        f.write(f"\nImport profile: {profile_file}\n")
+
+    json_summary = {
+        'metadata': {
+            'app': str(LLM_DIR / f"{APP_MODULE}.py"),
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'runs': runs,
+            'baseline': baseline,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'results': results,
+        'graphs': [graph_file]
+    }
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    return json_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure storyteller import time and first-request latency")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--baseline', default=None, help="git revision to compare against, e.g. HEAD~1")
+    parser.add_argument('--prefix', default=None)
+    args = parser.parse_args()
+    generate_cold_start_report(args.runs, args.baseline, graph_prefix=args.prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Performance regression comparator for load-test reports.
+
+Loads a baseline *_summary.json and one or more candidate reports, aligns
+their results by user count (or open-loop stage), and bootstraps confidence
+intervals for the relative change in p50/p95/p99 and throughput. Latency is
+resampled from the response times; throughput from the per-second completion
+counts, so it varies with the run's own rate fluctuations. A metric is a
+regression when the whole confidence interval lies beyond its budget; without
+an interval (e.g. a report that has no completions_per_second) a change past
+the budget is only a warning.
+
+Usage:
+    python compare_reports.py baseline_summary.json candidate_summary.json \
+        [--budget p95=10] [--budget throughput=5] [--output-dir load_reports]
+
+Exits with status 1 if any regression is found, so it can gate a pipeline.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from histogram import LatencyHistogram
+
+
+LATENCY_METRICS = {'p50': 50, 'p95': 95, 'p99': 99}
+
+# Allowed degradation in percent: latency increase or throughput decrease
+DEFAULT_BUDGETS = {'p50': 10.0, 'p95': 10.0, 'p99': 15.0, 'throughput': 10.0}
+
+# Fewer seconds than this give a throughput interval too narrow to trust
+MIN_THROUGHPUT_SECONDS = 5
+
+
+def _load_report(path):
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    results = {}
+    for result in report.get('results', []):
+        key = result.get('users', result.get('stage'))
+        results[key] = result
+    return report, results
+
+
+def _latency_samples(result):
+    """Distinct latency values and their counts, from raw samples or a histogram"""
+    if result.get('response_times'):
+        return np.unique(np.asarray(result['response_times'], dtype=float), return_counts=True)
+    if result.get('histogram'):
+        buckets = list(LatencyHistogram.from_dict(result['histogram']).buckets())
+        if buckets:
+            values, counts = zip(*buckets)
+            return np.asarray(values), np.asarray(counts)
+    return None
+
+
+def _weighted_percentiles(values, count_matrix, q):
+    """Percentile q of each row of bucket counts over the same sorted values"""
+    cumulative = np.cumsum(count_matrix, axis=1)
+    targets = np.ceil(q / 100 * cumulative[:, -1:]).clip(min=1)
+    return values[np.argmax(cumulative >= targets, axis=1)]
+
+
+def _bootstrap_metrics(result, iterations, rng):
+    """Bootstrap distribution of every compared metric for one result"""
+    distributions = {}
+    samples = _latency_samples(result)
+    if samples is not None:
+        values, counts = samples
+        resampled = rng.multinomial(counts.sum(), counts / counts.sum(), size=iterations)
+        for metric, q in LATENCY_METRICS.items():
+            distributions[metric] = _weighted_percentiles(values, resampled, q)
+    completions = np.asarray(result.get('completions_per_second') or [], dtype=float)
+    if len(completions) >= MIN_THROUGHPUT_SECONDS and completions.sum() > 0:
+        # Resample seconds of the run and scale the mean rate to the reported throughput
+        means = rng.choice(completions, size=(iterations, len(completions))).mean(axis=1)
+        distributions['throughput'] = means / completions.mean() * result.get('throughput', 0)
+    return distributions
+
+
+def _point_metrics(result):
+    return {
+        'p50': result.get('median_response_time', 0),
+        'p95': result.get('p95_response_time', 0),
+        'p99': result.get('p99_response_time', 0),
+        'throughput': result.get('throughput', 0)
+    }
+
+
+def _relative_change(candidate, baseline):
+    return (candidate - baseline) / baseline * 100 if baseline else 0.0
+
+
+def compare_results(baseline, candidate, budgets, confidence=0.95, iterations=2000, seed=0):
+    """
+    Compare one aligned pair of result dicts. Returns one row per metric with
+    the point delta, its bootstrap confidence interval and a verdict.
+    """
+    rng = np.random.default_rng(seed)
+    baseline_points = _point_metrics(baseline)
+    candidate_points = _point_metrics(candidate)
+    baseline_boot = _bootstrap_metrics(baseline, iterations, rng)
+    candidate_boot = _bootstrap_metrics(candidate, iterations, rng)
+    alpha = (1 - confidence) / 2 * 100
+
+    rows = []
+    for metric, budget in budgets.items():
+        # Degradation is positive when latency grows or throughput drops
+        sign = -1 if metric == 'throughput' else 1
+        delta = _relative_change(candidate_points[metric], baseline_points[metric])
+        row = {
+            'metric': metric,
+            'baseline': baseline_points[metric],
+            'candidate': candidate_points[metric],
+            'delta_pct': delta,
+            'ci_low_pct': None,
+            'ci_high_pct': None,
+            'budget_pct': budget
+        }
+        if metric in baseline_boot and metric in candidate_boot:
+            base = baseline_boot[metric]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                deltas = np.where(base > 0, (candidate_boot[metric] - base) / base * 100, 0.0)
+            row['ci_low_pct'], row['ci_high_pct'] = (float(v) for v in np.percentile(deltas, [alpha, 100 - alpha]))
+            degradation_low = min(sign * row['ci_low_pct'], sign * row['ci_high_pct'])
+            significant = row['ci_low_pct'] > 0 or row['ci_high_pct'] < 0
+        else:
+            degradation_low = None
+            significant = False
+
+        if degradation_low is not None and degradation_low > budget:
+            row['status'] = 'REGRESSION'
+        elif sign * delta > budget:
+            row['status'] = 'WARNING'
+        elif significant and sign * delta < 0:
+            row['status'] = 'IMPROVED'
+        else:
+            row['status'] = 'OK'
+        rows.append(row)
+    return rows
+
+
+def compare_reports(baseline_path, candidate_paths, budgets=None, confidence=0.95, iterations=2000):
+    """Compare every candidate report against the baseline report"""
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    baseline_report, baseline_results = _load_report(baseline_path)
+
+    comparisons = []
+    for candidate_path in candidate_paths:
+        candidate_report, candidate_results = _load_report(candidate_path)
+        common = sorted(set(baseline_results) & set(candidate_results))
+        unmatched = sorted(set(baseline_results) ^ set(candidate_results))
+        aligned = []
+        for key in common:
+            aligned.append({
+                'users': key,
+                'metrics': compare_results(
+                    baseline_results[key], candidate_results[key], budgets, confidence, iterations
+                )
+            })
+        comparisons.append({
+            'candidate': str(candidate_path),
+            'candidate_timestamp': candidate_report.get('metadata', {}).get('timestamp'),
+            'aligned': aligned,
+            'unmatched_user_counts': unmatched,
+            'regressions': sum(1 for a in aligned for m in a['metrics'] if m['status'] == 'REGRESSION')
+        })
+
+    return {
+        'metadata': {
+            'baseline': str(baseline_path),
+            'baseline_timestamp': baseline_report.get('metadata', {}).get('timestamp'),
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'budgets': budgets,
+            'confidence': confidence,
+            'iterations': iterations
+        },
+        'comparisons': comparisons,
+        'regressions': sum(c['regressions'] for c in comparisons)
+    }
+
+
+def _format_ci(row):
+    if row['ci_low_pct'] is None:
+        return "n/a"
+    return f"[{row['ci_low_pct']:+.1f}, {row['ci_high_pct']:+.1f}]"
+
+
+def _create_diff_report(comparison, report_dir, prefix):
+    """Write the side-by-side diff as text and JSON"""
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 100 + "\n")
+        f.write("LOAD TEST REGRESSION COMPARISON\n")
+        f.write("=" * 100 + "\n\n")
+        f.write(f"Baseline: {comparison['metadata']['baseline']}\n")
+        f.write(f"Confidence: {comparison['metadata']['confidence'] * 100:.0f}%  "
+                f"Budgets (%): {comparison['metadata']['budgets']}\n")
+
+        for candidate in comparison['comparisons']:
+            f.write("\n" + "-" * 100 + "\n")
+            f.write(f"Candidate: {candidate['candidate']}\n")
+            if candidate['unmatched_user_counts']:
+                f.write(f"Not compared (present in one report only): {candidate['unmatched_user_counts']}\n")
+            f.write(f"\n{'Users':<8} {'Metric':<12} {'Baseline':<12} {'Candidate':<12} "
+                    f"{'Delta%':<10} {'CI%':<20} {'Budget%':<10} {'Status':<12}\n")
+            f.write("-" * 100 + "\n")
+            for aligned in candidate['aligned']:
+                for row in aligned['metrics']:
+                    f.write(f"{aligned['users']:<8} {row['metric']:<12} {row['baseline']:<12.3f} "
+                            f"{row['candidate']:<12.3f} {row['delta_pct']:<+10.1f} {_format_ci(row):<20} "
+                            f"{row['budget_pct']:<10.1f} {row['status']:<12}\n")
+            f.write(f"\nRegressions: {candidate['regressions']}\n")
+
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(comparison, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
+
+
+def _parse_budget(value):
+    metric, _, percent = value.partition('=')
+    if metric not in DEFAULT_BUDGETS or not percent:
+        raise argparse.ArgumentTypeError(
+            f"Budget must look like METRIC=PERCENT with METRIC in {', '.join(DEFAULT_BUDGETS)}"
+        )
+    return metric, float(percent)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare load-test reports against a baseline")
+    parser.add_argument('baseline', help="Baseline *_summary.json")
+    parser.add_argument('candidates', nargs='+', help="Candidate *_summary.json files")
+    parser.add_argument('--budget', action='append', type=_parse_budget, default=[],
+                        help="Allowed degradation, e.g. p95=10 or throughput=5 (percent)")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--output-dir', default="load_reports")
+    parser.add_argument('--prefix', default="comparison")
+    args = parser.parse_args(argv)
+
+    comparison = compare_reports(
+        args.baseline, args.candidates, dict(args.budget), args.confidence, args.iterations
+    )
+
+    report_dir = Path(args.output_dir) / f"{args.prefix}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    summary_file, json_file = _create_diff_report(comparison, report_dir, args.prefix)
+
+    with open(summary_file, encoding='utf-8') as f:
+        print(f.read())
+    print(f"JSON: {json_file}")
+
+    if comparison['regressions']:
+        print(f"✗ FAIL: {comparison['regressions']} regressions beyond budget")
+        return 1
+    print("✓ PASS: No regressions beyond budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
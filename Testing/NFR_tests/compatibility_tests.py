@@ -1,47 +1,192 @@
 # compatibility_tests.py
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from selenium import webdriver
+from selenium.webdriver.chromium.webdriver import ChromiumDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 
-def test_browser_compatibility(base_url):
-    """Test across different browsers (Chrome, Firefox, Edge)"""
+BROWSERS = {
+    "Chrome": webdriver.Chrome,
+    "Firefox": webdriver.Firefox,
+    "Edge": webdriver.Edge
+    # "Safari": webdriver.Safari,
+    # "Opera": webdriver.Opera,
+    # "Internet Explorer": webdriver.Ie
+}
+
+# (name, width, height)
+VIEWPORTS = [
+    ("Desktop", 1366, 900),
+    ("Tablet", 768, 1024),
+    ("Mobile", 390, 844)
+]
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def _set_viewport(driver, width, height):
+    """
+    Make window.innerWidth x innerHeight equal width x height. Chromium
+    browsers clamp the window to ~500px wide, so they get a device-metrics
+    override; other browsers get a window sized to the measured chrome.
+    """
+    if isinstance(driver, ChromiumDriver):
+        # mobile=False: no meta-viewport rescaling, so innerWidth is exactly `width`
+        driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {
+            'width': width, 'height': height, 'deviceScaleFactor': 0, 'mobile': False
+        })
+        return
+    driver.set_window_size(width, height)
+    inner_width, inner_height = driver.execute_script("return [window.innerWidth, window.innerHeight];")
+    driver.set_window_size(2 * width - inner_width, 2 * height - inner_height)
+
+
+def _check_combination(job):
+    """Worker entry point: load the page in one browser at one viewport size"""
+    browser_name, (viewport_name, width, height), base_url = job
+    result = {
+        'browser': browser_name,
+        'viewport': viewport_name,
+        'size': f"{width}x{height}",
+        'actual_size': None,
+        'success': False,
+        'launch_time': None,
+        'load_time': None,
+        'horizontal_overflow': None
+    }
+    start_time = time.perf_counter()
+    driver = None
+    try:
+        driver = BROWSERS[browser_name]()
+        result['launch_time'] = time.perf_counter() - start_time
+        _set_viewport(driver, width, height)
+
+        load_start = time.perf_counter()
+        driver.get(base_url)
+        WebDriverWait(driver, 10).until(EC.url_to_be(base_url))
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        result['load_time'] = time.perf_counter() - load_start
+
+        scroll_width, inner_width, inner_height = driver.execute_script(
+            "return [document.documentElement.scrollWidth, window.innerWidth, window.innerHeight];"
+        )
+        result['actual_size'] = f"{inner_width}x{inner_height}"
+        # Content wider than the viewport means a horizontal scrollbar at this size
+        result['horizontal_overflow'] = scroll_width > inner_width
+        if (inner_width, inner_height) != (width, height):
+            result['error'] = f"Viewport is {result['actual_size']}, not the requested {result['size']}"
+        else:
+            result['success'] = True
+    except Exception as e:
+        result['error'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    result['total_time'] = time.perf_counter() - start_time
+    return result
+
+
+def run_compatibility_matrix(base_url, browsers=None, viewports=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Check every browser x viewport combination, each in its own process with
+    at most max_workers browsers running at once. Results keep matrix order.
+    """
+    browsers = browsers or list(BROWSERS)
+    viewports = viewports or VIEWPORTS
+    jobs = [(browser_name, viewport, base_url) for browser_name in browsers for viewport in viewports]
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        return list(executor.map(_check_combination, jobs))
+
+
+def write_matrix_report(base_url, results, wall_time, report_dir, prefix):
+    """Write the browser x viewport matrix as text and JSON"""
+    report_dir.mkdir(parents=True, exist_ok=True)
+    viewports = list(dict.fromkeys(r['viewport'] for r in results))
+    browsers = list(dict.fromkeys(r['browser'] for r in results))
+    cells = {(r['browser'], r['viewport']): r for r in results}
+
+    summary_file = report_dir / f"{prefix}_compatibility_matrix.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("BROWSER COMPATIBILITY MATRIX\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Page: {base_url}\n")
+        f.write(f"Combinations: {len(results)}  Wall time: {wall_time:.2f}s  "
+                f"Sum of combination times: {sum(r['total_time'] for r in results):.2f}s\n\n")
+        f.write(f"{'Browser':<12}" + "".join(f"{v:<22}" for v in viewports) + "\n")
+        f.write("-" * 80 + "\n")
+        for browser_name in browsers:
+            row = f"{browser_name:<12}"
+            for viewport in viewports:
+                cell = cells.get((browser_name, viewport))
+                if cell is None:
+                    text = "-"
+                elif cell['success']:
+                    text = f"PASS {cell['load_time']:.2f}s" + (" overflow" if cell['horizontal_overflow'] else "")
+                else:
+                    text = "FAIL"
+                row += f"{text:<22}"
+            f.write(row + "\n")
+
+        failures = [r for r in results if not r['success']]
+        if failures:
+            f.write("\nFAILURES\n")
+            f.write("-" * 80 + "\n")
+            for r in failures:
+                f.write(f"{r['browser']} @ {r['viewport']} ({r['size']}, actual {r['actual_size'] or '-'}): "
+                        f"{r.get('error', 'Unknown')}\n")
+
+    json_file = report_dir / f"{prefix}_compatibility_matrix.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {
+                'url': base_url,
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'wall_time': wall_time
+            },
+            'results': results
+        }, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
+
+
+def test_browser_compatibility(base_url, browsers=None, viewports=None, max_workers=DEFAULT_MAX_WORKERS,
+                               report_dir=None, prefix="page"):
+    """Test across different browsers (Chrome, Firefox, Edge) and viewport sizes in parallel"""
     print("\n=== COMPATIBILITY TEST: Multiple Browsers ===")
-    
-    browsers = [
-        ("Chrome", webdriver.Chrome),
-        ("Firefox", webdriver.Firefox),
-        ("Edge", webdriver.Edge)
-        # ("Safari", webdriver.Safari),
-        # ("Opera", webdriver.Opera),
-        # ("Internet Explorer", webdriver.Ie)
-    ]
-    
-    results = []
-    
-    for browser_name, browser_driver in browsers:
-        try:
-            print(f"\nTesting {browser_name}...")
-            driver = browser_driver()
-            driver.get(base_url)
-            
-            WebDriverWait(driver, 10).until(EC.url_to_be(base_url))
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-            print(f"✓ {browser_name}: PASS")
-            results.append(True)
-            driver.quit()
-        except Exception as e:
-            print(f"✗ {browser_name}: FAIL - {str(e)}")
-            results.append(False)
-    
-    passed = sum(results)
+
+    start_time = time.perf_counter()
+    results = run_compatibility_matrix(base_url, browsers, viewports, max_workers)
+    wall_time = time.perf_counter() - start_time
+
+    for r in results:
+        if r['success']:
+            overflow = " (horizontal overflow)" if r['horizontal_overflow'] else ""
+            print(f"✓ {r['browser']} @ {r['viewport']}: PASS - load {r['load_time']:.2f}s, "
+                  f"total {r['total_time']:.2f}s{overflow}")
+        else:
+            print(f"✗ {r['browser']} @ {r['viewport']}: FAIL - {r.get('error', 'Unknown')}")
+    print(f"\nWall time: {wall_time:.2f}s for {len(results)} combinations "
+          f"(sequential would be ~{sum(r['total_time'] for r in results):.2f}s)")
+    if report_dir is not None:
+        summary_file, _ = write_matrix_report(base_url, results, wall_time, Path(report_dir), prefix)
+        print(f"Compatibility matrix saved to: {summary_file}")
+
+    passed = sum(1 for r in results if r['success'])
     total = len(results)
-    
+
     if passed == total:
         print("✓ PASS: Works on at all browser")
         return True
     else:
-        print(f"✗ FAIL: Fails on {total - passed} browsers")
+        print(f"✗ FAIL: Fails on {total - passed} browser/viewport combinations")
         return False
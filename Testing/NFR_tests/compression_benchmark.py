@@ -0,0 +1,263 @@
+"""
+Response compression benchmark for the storyteller FastAPI service (LLM_API).
+
+Compresses /story/continue bodies of increasing size with every encoder the
+CompressionMiddleware can use (compression.py), at its shipped level and at
+faster / stronger levels, and reports per payload size:
+    compress_ms     median CPU time to compress one response
+    decompress_ms   median time for the client to decompress it
+    ratio           compressed size / original size
+    saved_kb        bytes saved per response
+    us_per_kb       compression CPU per KB saved, the cost of each KB not sent
+
+The story text is generated from a fixed vocabulary with a seeded RNG, so it
+compresses like prose rather than like a repeated sentence. Encoders whose
+library is not installed (zstandard, brotli) are skipped.
+
+Usage:
+    python compression_benchmark.py [--turns 1 5 20 100 500] [--repeat 20]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from bson import ObjectId
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "LLM_API"))
+
+import compression  # noqa: E402
+
+
+DEFAULT_TURNS = (1, 5, 20, 100, 500)
+# (coding, level); None is the level the middleware ships with
+LEVELS = {
+    'zstd': (1, None, 9, 19),
+    'br': (1, None, 6, 11),
+    'gzip': (1, None, 9)
+}
+WORDS = ("the", "a", "of", "and", "to", "in", "you", "door", "light", "sea", "stone", "wind", "dark", "old",
+         "keeper", "stairs", "salt", "lamp", "shadow", "voice", "cold", "silver", "whisper", "ancient",
+         "beneath", "slowly", "suddenly", "behind", "across", "towards", "glimmer", "echoes", "storm",
+         "harbor", "rope", "lantern", "footsteps", "iron", "glass", "waves", "night", "hollow", "beacon")
+
+
+def _prose(rng, words):
+    sentences = []
+    while words > 0:
+        length = rng.randint(6, 18)
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        words -= length
+    return " ".join(sentences)
+
+
+def make_payload(turns, seed=7):
+    """JSON body of a /story/continue response with `turns` turns of varied prose"""
+    rng = random.Random(seed)
+    user = str(ObjectId())
+    body = {
+        "story_id": str(ObjectId()),
+        "title": "The Door That Was Not There",
+        "description": "A lighthouse keeper finds a door that was not there yesterday.",
+        "character": "Ash",
+        "content": [{"prompt": _prose(rng, 12), "user": user, "response": _prose(rng, 180)} for _ in range(turns)],
+        "summary": _prose(rng, 250),
+        "complete": False,
+        "dialect": "ORIGINAL: quiet coastal gothic"
+    }
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def _decompressor(coding):
+    if coding == 'zstd':
+        return compression.zstandard.ZstdDecompressor().decompress
+    if coding == 'br':
+        return compression.brotli.decompress
+    return lambda data: zlib.decompress(data, 31)
+
+
+def _median_time(func, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def encoder_configs():
+    """{label: (coding, encoder)} for every installed encoder and level"""
+    installed = compression.available_encoders()
+    configs = {}
+    for coding, levels in LEVELS.items():
+        if coding not in installed:
+            continue
+        for level in levels:
+            label = f"{coding}-{'default' if level is None else level}"
+            configs[label] = (coding, compression.make_encoder(coding, level))
+    return configs
+
+
+def measure(coding, encoder, payload, repeat=20):
+    compressed = encoder.compress(payload)
+    compress_s = _median_time(encoder.compress, payload, repeat)
+    decompress_s = _median_time(_decompressor(coding), compressed, repeat)
+    saved = len(payload) - len(compressed)
+    return {
+        'original_bytes': len(payload),
+        'compressed_bytes': len(compressed),
+        'ratio': len(compressed) / len(payload),
+        'saved_kb': saved / 1024,
+        'compress_ms': compress_s * 1000,
+        'decompress_ms': decompress_s * 1000,
+        'us_per_kb': compress_s * 1e6 / (saved / 1024) if saved > 0 else None
+    }
+
+
+def _create_graphs(results, report_dir, prefix):
+    """Compression time and bytes saved by payload size, and the time / ratio trade-off at the largest size"""
+    graph_files = []
+
+    plt.figure(figsize=(12, 6))
+    plt.subplot(1, 2, 1)
+    for label, rows in results.items():
+        plt.plot([r['original_bytes'] / 1024 for r in rows], [r['compress_ms'] for r in rows], marker='o', label=label)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel('Response Size (KB)')
+    plt.ylabel('Compress Time (ms)')
+    plt.title('CPU Cost by Payload Size')
+    plt.grid(True, which='both', alpha=0.3)
+    plt.legend(fontsize=7)
+    plt.subplot(1, 2, 2)
+    for label, rows in results.items():
+        plt.plot([r['original_bytes'] / 1024 for r in rows], [r['saved_kb'] for r in rows], marker='o', label=label)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel('Response Size (KB)')
+    plt.ylabel('Saved per Response (KB)')
+    plt.title('Bytes Saved by Payload Size')
+    plt.grid(True, which='both', alpha=0.3)
+    plt.tight_layout()
+    graph_file = report_dir / f"{prefix}_by_size.png"
+    plt.savefig(graph_file)
+    plt.close()
+    graph_files.append(str(graph_file))
+
+    plt.figure(figsize=(10, 6))
+    for label, rows in results.items():
+        largest = rows[-1]
+        plt.scatter(largest['compress_ms'], largest['ratio'] * 100)
+        plt.annotate(label, (largest['compress_ms'], largest['ratio'] * 100), fontsize=8)
+    plt.xscale('log')
+    plt.xlabel('Compress Time (ms)')
+    plt.ylabel('Compressed Size (% of original)')
+    plt.title(f"Trade-off at {rows[-1]['original_bytes'] / 1024:.0f}KB")
+    plt.grid(True, alpha=0.3)
+    graph_file = report_dir / f"{prefix}_tradeoff.png"
+    plt.savefig(graph_file)
+    plt.close()
+    graph_files.append(str(graph_file))
+    return graph_files
+
+
+def generate_compression_report(turns=DEFAULT_TURNS, repeat=20, output_dir="load_reports", graph_prefix=None, folder_name=None):
+    """Benchmark every encoder and level by payload size and write the report"""
+    report_name = folder_name or graph_prefix or "compression"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "compression"
+
+    print("=" * 80)
+    print("RESPONSE COMPRESSION BENCHMARK")
+    print("=" * 80)
+    configs = encoder_configs()
+    missing = [coding for coding in LEVELS if not any(c == coding for c, _ in configs.values())]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+    print(f"Middleware threshold: {compression.DEFAULT_MINIMUM_SIZE} bytes")
+
+    payloads = [make_payload(n) for n in turns]
+    results = {label: [] for label in configs}
+    for n, payload in zip(turns, payloads):
+        print(f"\n{n} turns ({len(payload) / 1024:.1f}KB):")
+        print(f"  {'encoder':<14}{'compress':>10}{'decompress':>12}{'ratio':>8}{'saved':>10}{'us/KB':>8}")
+        for label, (coding, encoder) in configs.items():
+            row = measure(coding, encoder, payload, repeat)
+            row['turns'] = n
+            results[label].append(row)
+            per_kb = f"{row['us_per_kb']:.1f}" if row['us_per_kb'] is not None else "-"
+            print(f"  {label:<14}{row['compress_ms']:>8.3f}ms{row['decompress_ms']:>10.3f}ms"
+                  f"{row['ratio'] * 100:>7.1f}%{row['saved_kb']:>8.1f}KB{per_kb:>8}")
+
+    # Cheapest shipped encoder per saved KB at each size
+    shipped = {label: rows for label, rows in results.items() if label.endswith('-default')}
+    print()
+    for i, n in enumerate(turns):
+        costs = {label: rows[i]['us_per_kb'] for label, rows in shipped.items() if rows[i]['us_per_kb'] is not None}
+        if costs:
+            best = min(costs, key=costs.get)
+            print(f"✓ {n} turns: cheapest per KB saved is {best} ({costs[best]:.1f}us/KB)")
+
+    graph_files = _create_graphs(results, report_dir, prefix)
+
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("RESPONSE COMPRESSION BENCHMARK\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Calls per measurement: {repeat} (median)\n")
+        if missing:
+            f.write(f"Not installed: {', '.join(missing)}\n")
+        for i, n in enumerate(turns):
+            f.write(f"\n{n} turns ({len(payloads[i]) / 1024:.1f}KB)\n")
+            f.write("-" * 80 + "\n")
+            f.write(f"{'Encoder':<14}{'Compress':>12}{'Decompress':>12}{'Ratio':>8}{'Saved':>10}{'us/KB saved':>14}\n")
+            for label, rows in results.items():
+                row = rows[i]
+                per_kb = f"{row['us_per_kb']:.1f}" if row['us_per_kb'] is not None else "-"
+                f.write(f"{label:<14}{row['compress_ms']:>10.3f}ms{row['decompress_ms']:>10.3f}ms"
+                        f"{row['ratio'] * 100:>7.1f}%{row['saved_kb']:>8.1f}KB{per_kb:>14}\n")
+
+    json_summary = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'turns': list(turns),
+            'payload_bytes': [len(p) for p in payloads],
+            'repeat': repeat,
+            'minimum_size': compression.DEFAULT_MINIMUM_SIZE,
+            'not_installed': missing,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'results': results,
+        'graphs': graph_files
+    }
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    return json_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare response compression CPU cost and bytes saved by payload size")
+    parser.add_argument('--turns', type=int, nargs='+', default=list(DEFAULT_TURNS))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--prefix', default=None)
+    args = parser.parse_args()
+    generate_compression_report(args.turns, args.repeat, graph_prefix=args.prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 
 
-def initialize_driver(headless=True, window_size="1366,900"):
+def initialize_driver(headless=True, window_size="1366,900", performance_log=False):
     
     options = webdriver.ChromeOptions()
     options.add_argument("--disable-gpu")
@@ -21,6 +21,10 @@ def initialize_driver(headless=True, window_size="1366,900"):
     if headless:
         options.add_argument("--headless=new")
 
+    # DevTools Network/Page events for waterfall analysis, read via get_log('performance')
+    if performance_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
     driver = webdriver.Chrome(options=options)
     driver.set_page_load_timeout(30)
     return driver
@@ -0,0 +1,266 @@
+"""
+Coordinator/worker mode for concurrent load tests.
+
+Virtual users are sharded across a local process pool and, optionally,
+across worker processes on other hosts reached over a line-delimited JSON
+socket protocol. Every shard waits for a common start time, runs the asyncio
+load engine, and sends back a histogram instead of raw samples; the
+coordinator merges them into the result dict used by the load reports.
+
+Workers only accept jobs carrying the shared token, given with --token or
+the LOAD_WORKER_TOKEN environment variable on both sides, and listen on
+127.0.0.1 unless --host says otherwise.
+
+Start a remote worker:
+    python distributed.py worker --host 0.0.0.0 --port 8790 --processes 4 --token <secret>
+Run from the coordinator:
+    python distributed.py run https://quest-ai-frontend.vercel.app/Login \
+        --users 5000 --processes 4 --hosts 10.0.0.2:8790 10.0.0.3:8790 --token <secret>
+"""
+import argparse
+import hmac
+import json
+import os
+import socket
+import socketserver
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import load_engine
+from histogram import LatencyHistogram
+
+
+DEFAULT_PORT = 8790
+START_DELAY = 3.0
+TOKEN_ENV = "LOAD_WORKER_TOKEN"
+
+
+def _shard(total, parts):
+    """Split total users into `parts` near-equal non-empty shards"""
+    parts = max(1, min(parts, total))
+    base, extra = divmod(total, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+
+def _run_shard(job):
+    """Worker entry point: wait for the shared start time, run, return a histogram"""
+    delay = job['start_at'] - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    started = time.time()
+    results = load_engine.run_concurrent_requests(job['url'], job['users'], timeout=job.get('timeout', 10))
+    finished = time.time()
+
+    histogram = LatencyHistogram()
+    errors = {}
+    successful = 0
+    for result in results:
+        if result['success']:
+            successful += 1
+            histogram.record(result['time'])
+        else:
+            error = result.get('error', f"HTTP {result.get('status', 'Unknown')}")
+            errors[error] = errors.get(error, 0) + 1
+
+    return {
+        'users': job['users'],
+        'requests': len(results),
+        'successful': successful,
+        'errors': errors,
+        'histogram': histogram.to_dict(),
+        'phases': {
+            phase: phase_histogram.to_dict()
+            for phase, phase_histogram in load_engine.phase_histograms(results).items()
+        },
+        # Seconds since the shared start, so shards on different clocks line up
+        'completions': load_engine.completion_counts(results, origin=job['start_at']),
+        'start_lag': started - job['start_at'],
+        'elapsed': finished - job['start_at']
+    }
+
+
+def _run_local(job, processes):
+    """Run a job across a local process pool and return the per-shard results"""
+    shards = _shard(job['users'], processes)
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        return list(executor.map(_run_shard, [{**job, 'users': users} for users in shards]))
+
+
+def _merge(shard_results, num_users):
+    """Merge worker results into a load report result dict"""
+    histogram = LatencyHistogram()
+    phases = {phase: LatencyHistogram() for phase in load_engine.PHASES}
+    errors = {}
+    completions = {}
+    requests = successful = 0
+    total_time = 0
+    for shard in shard_results:
+        histogram.merge(LatencyHistogram.from_dict(shard['histogram']))
+        for phase, phase_histogram in shard['phases'].items():
+            phases[phase].merge(LatencyHistogram.from_dict(phase_histogram))
+        requests += shard['requests']
+        successful += shard['successful']
+        total_time = max(total_time, shard['elapsed'])
+        for error, count in shard['errors'].items():
+            errors[error] = errors.get(error, 0) + count
+        # JSON turns the second keys of remote shards into strings
+        for second, count in shard['completions'].items():
+            completions[int(second)] = completions.get(int(second), 0) + count
+
+    return {
+        'users': num_users,
+        'requests': requests,
+        'successful': successful,
+        'failed': requests - successful,
+        'success_rate': successful / requests * 100 if requests else 0,
+        **histogram.summary(),
+        'total_time': total_time,
+        'throughput': successful / total_time if total_time > 0 else 0,
+        'completions_per_second': load_engine.per_second_series(completions),
+        'histogram': histogram.to_dict(),
+        'errors': errors,
+        'phases': load_engine.summarize_phases(phases),
+        'workers': len(shard_results),
+        'max_start_lag': max((shard['start_lag'] for shard in shard_results), default=0)
+    }
+
+
+# --- Socket protocol: one JSON object per line in each direction ---
+
+def _request(address, message, timeout=None):
+    host, _, port = address.partition(':')
+    with socket.create_connection((host, int(port or DEFAULT_PORT)), timeout=timeout) as sock:
+        stream = sock.makefile('rw', encoding='utf-8')
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+        return json.loads(stream.readline())
+
+
+def _clock_offset(address, token, samples=5):
+    """Remote clock minus local clock, from the ping with the lowest round trip"""
+    best = None
+    for _ in range(samples):
+        sent = time.time()
+        reply = _request(address, {'type': 'clock', 'token': token}, timeout=5)
+        received = time.time()
+        if 'error' in reply:
+            raise RuntimeError(f"Worker {address} failed: {reply['error']}")
+        round_trip = received - sent
+        if best is None or round_trip < best[0]:
+            best = (round_trip, reply['time'] - (sent + received) / 2)
+    return best[1]
+
+
+def _run_remote(address, job, token):
+    offset = _clock_offset(address, token)
+    reply = _request(address, {'type': 'run', 'token': token, 'job': {**job, 'start_at': job['start_at'] + offset}})
+    if 'error' in reply:
+        raise RuntimeError(f"Worker {address} failed: {reply['error']}")
+    return reply['shards']
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        message = json.loads(self.rfile.readline())
+        if not hmac.compare_digest(str(message.get('token', '')).encode('utf-8'), self.server.token.encode('utf-8')):
+            reply = {'error': "Invalid token"}
+        elif message['type'] == 'clock':
+            reply = {'time': time.time()}
+        elif message['type'] == 'run':
+            try:
+                reply = {'shards': _run_local(message['job'], self.server.processes)}
+            except Exception as e:
+                reply = {'error': str(e)}
+        else:
+            reply = {'error': f"Unknown message type: {message['type']}"}
+        self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+
+
+class _WorkerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve_worker(host="127.0.0.1", port=DEFAULT_PORT, processes=None, token=None):
+    """Run a worker that accepts load jobs from a coordinator until interrupted"""
+    token = token or os.environ.get(TOKEN_ENV)
+    if not token:
+        raise ValueError(f"A worker needs a shared token (--token or {TOKEN_ENV})")
+    processes = processes or os.cpu_count()
+    with _WorkerServer((host, port), _WorkerHandler) as server:
+        server.processes = processes
+        server.token = token
+        print(f"Load worker listening on {host}:{port} with {processes} processes")
+        server.serve_forever()
+
+
+def run_distributed_load(base_url, num_users, processes=None, hosts=None, timeout=10, start_delay=START_DELAY,
+                         token=None):
+    """
+    Run one concurrent-load step with users sharded over local processes and
+    remote workers. All shards start at the same (clock-corrected) instant.
+    Remote workers need the shared token (defaults to LOAD_WORKER_TOKEN).
+    """
+    hosts = hosts or []
+    token = token or os.environ.get(TOKEN_ENV)
+    if hosts and not token:
+        raise ValueError(f"Remote workers need a shared token (--token or {TOKEN_ENV})")
+    processes = os.cpu_count() if processes is None else processes
+    units = (1 if processes > 0 else 0) + len(hosts)
+    if units == 0:
+        raise ValueError("No local processes or remote hosts to run on")
+
+    print(f"\nTesting {num_users} concurrent users across {processes} local processes and {len(hosts)} hosts...")
+    shares = _shard(num_users, units)
+    job = {'url': base_url, 'timeout': timeout, 'start_at': time.time() + start_delay}
+
+    with ThreadPoolExecutor(max_workers=units) as executor:
+        futures = []
+        if processes > 0:
+            futures.append(executor.submit(_run_local, {**job, 'users': shares.pop(0)}, processes))
+        for address, users in zip(hosts, shares):
+            futures.append(executor.submit(_run_remote, address, {**job, 'users': users}, token))
+        shard_results = [shard for future in futures for shard in future.result()]
+
+    return _merge(shard_results, num_users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed concurrent load generation")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker = subparsers.add_parser('worker', help="Serve load jobs for a coordinator")
+    worker.add_argument('--host', default="127.0.0.1", help="use 0.0.0.0 to accept coordinators on other hosts")
+    worker.add_argument('--port', type=int, default=DEFAULT_PORT)
+    worker.add_argument('--processes', type=int, default=None)
+    worker.add_argument('--token', default=None, help=f"shared token, default ${TOKEN_ENV}")
+
+    run = subparsers.add_parser('run', help="Coordinate a load test")
+    run.add_argument('url')
+    run.add_argument('--users', type=int, nargs='+', default=[100, 500, 1000])
+    run.add_argument('--processes', type=int, default=None)
+    run.add_argument('--hosts', nargs='*', default=[])
+    run.add_argument('--output-dir', default="load_reports")
+    run.add_argument('--prefix', default=None)
+    run.add_argument('--token', default=None, help=f"shared token, default ${TOKEN_ENV}")
+
+    args = parser.parse_args()
+    if args.command == 'worker':
+        serve_worker(args.host, args.port, args.processes, args.token)
+    else:
+        if args.token:
+            os.environ[TOKEN_ENV] = args.token
+        import performance_tests
+        performance_tests.generate_concurrent_load_report(
+            args.url,
+            output_dir=args.output_dir,
+            user_counts=args.users,
+            graph_prefix=args.prefix,
+            workers=os.cpu_count() if args.processes is None else args.processes,
+            hosts=args.hosts
+        )
+
+
+if __name__ == "__main__":
+    main()
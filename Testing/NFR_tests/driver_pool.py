@@ -0,0 +1,103 @@
+"""
+Pool of warm Chrome instances for the Selenium NFR tests.
+
+Starting Chrome dominates the cost of a short test, so drivers are created
+once and handed out again after their state is reset: cookies, web storage
+and the HTTP cache are cleared and the tab is parked on about:blank. Every
+test therefore starts from the same clean browser, whichever driver it gets.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+import core_tests
+
+
+_CLEAR_WEB_STORAGE = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+return window.location.origin;
+"""
+
+
+def reset_driver(driver):
+    """Bring a used driver back to a clean, blank state"""
+    origin = driver.execute_script(_CLEAR_WEB_STORAGE)
+    driver.delete_all_cookies()
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    if origin and origin != 'null':
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+    driver.get('about:blank')
+    try:
+        # Discard buffered DevTools events so the next test sees only its own
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """
+    Hands out up to `size` drivers, created on first use and reused after a
+    reset. acquire() blocks while every driver is in use.
+    """
+
+    def __init__(self, size=1, **driver_options):
+        self.size = size
+        self.driver_options = driver_options
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _create(self):
+        with self._lock:
+            if len(self._drivers) >= self.size:
+                return None
+            driver = core_tests.initialize_driver(**self.driver_options)
+            self._drivers.append(driver)
+            return driver
+
+    def _checkout(self):
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            driver = self._create() or self._idle.get()
+        # None marks a slot freed by a discarded driver
+        return driver or self._create() or self._checkout()
+
+    @contextmanager
+    def acquire(self):
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            try:
+                reset_driver(driver)
+                self._idle.put(driver)
+            except Exception:
+                # A driver that cannot be reset (crashed tab, dead session) is replaced
+                self._discard(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._drivers.remove(driver)
+        self._idle.put(None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
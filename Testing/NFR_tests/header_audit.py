@@ -0,0 +1,344 @@
+"""
+HTTP performance-header audit for pages, static assets and API endpoints.
+
+The performance counterpart of security_tests.test_security_headers. Each URL
+is fetched once (plus a conditional re-request when it has a validator) and
+scored on caching (Cache-Control, ETag/Last-Modified, immutable hashed
+assets), compression, protocol (HTTP/2 via TLS ALPN, HTTP/3 via Alt-Svc),
+keep-alive and Server-Timing. For HTML pages the linked scripts and
+stylesheets are audited too, since their caching drives repeat-visit cost.
+
+Usage:
+    python header_audit.py https://quest-ai-frontend.vercel.app/Login \
+        http://localhost:3000/api/v1/story/publicstories [--output-dir load_reports]
+"""
+import argparse
+import json
+import re
+import socket
+import ssl
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+import matplotlib.pyplot as plt
+import requests
+
+
+ACCEPT_ENCODING = "br, gzip, deflate"
+ONE_YEAR = 31536000
+# Bodies smaller than this are not worth compressing
+COMPRESSION_THRESHOLD = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                      'image/svg+xml', 'application/manifest+json')
+# Content hash in a build artefact name, e.g. index-B1a2c3D4.js or main.3f9a8c1e.css
+HASHED_ASSET = re.compile(r'[.-][A-Za-z0-9_-]{8,}\.(?:js|mjs|css|woff2?|png|jpe?g|svg|webp|avif)$')
+MAX_ASSETS = 20
+
+# Relative importance of each check in the score
+WEIGHTS = {
+    'cache_policy': 3,
+    'validator': 2,
+    'revalidation': 1,
+    'immutable': 3,
+    'compression': 3,
+    'http2': 2,
+    'http3': 1,
+    'keep_alive': 1,
+    'server_timing': 1
+}
+
+
+class _AssetParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__()
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('src'):
+            self.assets.append(attrs['src'])
+        elif tag == 'link' and attrs.get('href') and attrs.get('rel') in ('stylesheet', 'modulepreload', 'preload'):
+            self.assets.append(attrs['href'])
+
+
+def negotiate_alpn(url, timeout=5):
+    """Protocol the server picks over TLS ALPN ('h2' or 'http/1.1'); None for plain HTTP"""
+    parsed = urlparse(url)
+    if parsed.scheme != 'https':
+        return None
+    context = ssl.create_default_context()
+    context.set_alpn_protocols(['h2', 'http/1.1'])
+    with socket.create_connection((parsed.hostname, parsed.port or 443), timeout=timeout) as sock:
+        with context.wrap_socket(sock, server_hostname=parsed.hostname) as tls:
+            return tls.selected_alpn_protocol() or 'http/1.1'
+
+
+def _max_age(cache_control):
+    match = re.search(r'(?:s-maxage|max-age)=(\d+)', cache_control)
+    return int(match.group(1)) if match else None
+
+
+def _kind(url, response):
+    content_type = response.headers.get('Content-Type', '')
+    if 'html' in content_type:
+        return 'page'
+    if 'json' in content_type:
+        return 'api'
+    return 'asset'
+
+
+def _check(name, passed, detail):
+    """passed is None when the check does not apply to this URL"""
+    return {'check': name, 'passed': passed, 'detail': detail, 'weight': WEIGHTS[name]}
+
+
+def _cache_checks(url, kind, headers):
+    cache_control = headers.get('Cache-Control', '').lower()
+    max_age = _max_age(cache_control)
+    checks = []
+
+    if kind == 'asset' and HASHED_ASSET.search(urlparse(url).path):
+        long_lived = max_age is not None and max_age >= ONE_YEAR
+        checks.append(_check(
+            'immutable', long_lived and 'immutable' in cache_control,
+            f"Hashed asset with Cache-Control: {cache_control or 'missing'}"
+        ))
+    elif kind == 'asset':
+        checks.append(_check('immutable', None, "Asset name has no content hash"))
+    else:
+        checks.append(_check('immutable', None, "Not a static asset"))
+
+    if not cache_control:
+        checks.append(_check('cache_policy', False, "No Cache-Control header"))
+    elif kind == 'page' and max_age and max_age > 3600 and 'no-cache' not in cache_control:
+        checks.append(_check('cache_policy', False, f"HTML cached for {max_age}s without revalidation"))
+    else:
+        checks.append(_check('cache_policy', True, cache_control))
+
+    validator = headers.get('ETag') or headers.get('Last-Modified')
+    if 'no-store' in cache_control:
+        checks.append(_check('validator', None, "no-store: validators unused"))
+    else:
+        checks.append(_check('validator', bool(validator),
+                             f"ETag: {headers.get('ETag')}, Last-Modified: {headers.get('Last-Modified')}"))
+    return checks
+
+
+def _revalidation_check(url, headers, session, timeout):
+    conditional = {}
+    if headers.get('ETag'):
+        conditional['If-None-Match'] = headers['ETag']
+    if headers.get('Last-Modified'):
+        conditional['If-Modified-Since'] = headers['Last-Modified']
+    if not conditional:
+        return _check('revalidation', None, "No validator to revalidate with")
+    response = session.get(url, headers={'Accept-Encoding': ACCEPT_ENCODING, **conditional}, timeout=timeout)
+    return _check('revalidation', response.status_code == 304,
+                  f"Conditional request returned {response.status_code}")
+
+
+def _compression_check(headers, size):
+    content_type = headers.get('Content-Type', '')
+    encoding = headers.get('Content-Encoding', '')
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return _check('compression', None, f"{content_type or 'Unknown type'} is not compressible")
+    if size < COMPRESSION_THRESHOLD:
+        return _check('compression', None, f"Body of {size} bytes is below the threshold")
+    return _check('compression', encoding in ('br', 'gzip', 'zstd'),
+                  f"Content-Encoding: {encoding or 'none'} ({size} bytes on the wire)")
+
+
+def _protocol_checks(url, headers, timeout):
+    checks = []
+    try:
+        protocol = negotiate_alpn(url, timeout)
+    except (OSError, ssl.SSLError) as e:
+        protocol = None
+        checks.append(_check('http2', False, f"TLS/ALPN probe failed: {str(e)}"))
+    else:
+        if protocol is None:
+            checks.append(_check('http2', False, "Plain HTTP: no HTTP/2 negotiation"))
+        else:
+            checks.append(_check('http2', protocol == 'h2', f"ALPN selected {protocol}"))
+
+    alt_svc = headers.get('Alt-Svc', '')
+    checks.append(_check('http3', 'h3' in alt_svc, f"Alt-Svc: {alt_svc or 'missing'}"))
+
+    connection = headers.get('Connection', '').lower()
+    if protocol == 'h2':
+        checks.append(_check('keep_alive', True, "HTTP/2 connections are persistent"))
+    else:
+        checks.append(_check('keep_alive', connection != 'close', f"Connection: {connection or 'default (keep-alive)'}"))
+    return checks
+
+
+def audit_url(url, session=None, timeout=10):
+    """Fetch one URL and run every applicable check. Returns the audit dict"""
+    session = session or requests.Session()
+    response = session.get(url, headers={'Accept-Encoding': ACCEPT_ENCODING}, timeout=timeout, stream=True)
+    # Bytes as sent by the server, before requests decompresses them
+    size = len(response.raw.read(decode_content=False))
+    response.close()
+    headers = response.headers
+    kind = _kind(url, response)
+
+    checks = _cache_checks(url, kind, headers)
+    if 'no-store' not in headers.get('Cache-Control', '').lower():
+        checks.append(_revalidation_check(url, headers, session, timeout))
+    checks.append(_compression_check(headers, size))
+    checks.extend(_protocol_checks(url, headers, timeout))
+    checks.append(_check(
+        'server_timing', None if kind == 'asset' else 'Server-Timing' in headers,
+        f"Server-Timing: {headers.get('Server-Timing', 'missing')}"
+    ))
+
+    applicable = [c for c in checks if c['passed'] is not None]
+    total_weight = sum(c['weight'] for c in applicable)
+    score = sum(c['weight'] for c in applicable if c['passed']) / total_weight * 100 if total_weight else 100
+    return {
+        'url': url,
+        'kind': kind,
+        'status': response.status_code,
+        'transferred_bytes': size,
+        'score': score,
+        'checks': checks
+    }
+
+
+def discover_assets(page_url, session=None, timeout=10, limit=MAX_ASSETS):
+    """Script and stylesheet URLs referenced by an HTML page"""
+    session = session or requests.Session()
+    parser = _AssetParser()
+    parser.feed(session.get(page_url, timeout=timeout).text)
+    assets = list(dict.fromkeys(urljoin(page_url, src) for src in parser.assets))
+    return assets[:limit]
+
+
+def run_header_audit(urls, include_assets=True, timeout=10):
+    """Audit every URL, plus the assets of HTML pages when include_assets"""
+    session = requests.Session()
+    audits = []
+    seen = set()
+    for url in urls:
+        pending = [url]
+        while pending:
+            target = pending.pop(0)
+            if target in seen:
+                continue
+            seen.add(target)
+            try:
+                audit = audit_url(target, session, timeout)
+            except requests.exceptions.RequestException as e:
+                audit = {'url': target, 'kind': 'unknown', 'status': None, 'score': 0, 'checks': [], 'error': str(e)}
+            audit['parent'] = None if target == url else url
+            audits.append(audit)
+            if include_assets and target == url and audit['kind'] == 'page':
+                pending.extend(discover_assets(url, session, timeout))
+    return audits
+
+
+def _create_score_graph(audits, report_dir, prefix):
+    labels = [urlparse(a['url']).path.rsplit('/', 1)[-1] or urlparse(a['url']).netloc for a in audits]
+    scores = [a['score'] for a in audits]
+    colors = ['green' if s >= 80 else 'orange' if s >= 50 else 'red' for s in scores]
+
+    fig, ax = plt.subplots(figsize=(12, max(4, len(audits) * 0.35)))
+    ax.barh(range(len(audits)), scores, color=colors, alpha=0.7)
+    ax.set_yticks(range(len(audits)))
+    ax.set_yticklabels(labels, fontsize=8)
+    ax.invert_yaxis()
+    ax.set_xlim(0, 100)
+    ax.set_xlabel('Score', fontsize=12)
+    ax.set_title('Performance Header Audit', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='x')
+
+    plt.tight_layout()
+    graph_file = report_dir / f"{prefix}_scores.png"
+    plt.savefig(graph_file, dpi=300, bbox_inches='tight')
+    plt.close()
+    return str(graph_file)
+
+
+def _create_audit_summary(audits, report_dir, prefix):
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("PERFORMANCE HEADER AUDIT\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"{'Score':<8} {'Kind':<8} {'Status':<8} URL\n")
+        f.write("-" * 80 + "\n")
+        for audit in audits:
+            f.write(f"{audit['score']:<8.0f} {audit['kind']:<8} {str(audit['status']):<8} {audit['url']}\n")
+
+        f.write("\nFAILED CHECKS\n")
+        f.write("-" * 80 + "\n")
+        for audit in audits:
+            if 'error' in audit:
+                f.write(f"{audit['url']}\n  request failed: {audit['error']}\n")
+                continue
+            failed = [c for c in audit['checks'] if c['passed'] is False]
+            if failed:
+                f.write(f"{audit['url']}\n")
+                for check in failed:
+                    f.write(f"  ✗ {check['check']}: {check['detail']}\n")
+
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'), 'weights': WEIGHTS},
+            'results': audits,
+            'average_score': sum(a['score'] for a in audits) / len(audits) if audits else 0
+        }, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
+
+
+def generate_header_audit_report(
+    urls,
+    output_dir="load_reports",
+    graph_prefix=None,
+    folder_name=None,
+    include_assets=True
+):
+    """Audit urls and write summary, JSON and score graph to {folder_name}_report"""
+    report_name = folder_name or graph_prefix or "header_audit"
+    prefix = graph_prefix or report_name
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    audits = run_header_audit(urls, include_assets)
+    return write_audit_report(audits, report_dir, prefix)
+
+
+def write_audit_report(audits, report_dir, prefix):
+    """Write summary, JSON and score graph for finished audits"""
+    report_dir.mkdir(parents=True, exist_ok=True)
+    summary_file, json_file = _create_audit_summary(audits, report_dir, prefix)
+    graph_file = _create_score_graph(audits, report_dir, prefix)
+    return {
+        'metadata': {'report_folder': str(report_dir), 'summary': summary_file, 'json': json_file},
+        'results': audits,
+        'graphs': [graph_file]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit HTTP performance headers")
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--no-assets', action='store_true', help="Do not audit assets linked from pages")
+    parser.add_argument('--output-dir', default="load_reports")
+    parser.add_argument('--prefix', default="header_audit")
+    args = parser.parse_args()
+
+    report = generate_header_audit_report(
+        args.urls, output_dir=args.output_dir, graph_prefix=args.prefix, include_assets=not args.no_assets
+    )
+    with open(report['metadata']['summary'], encoding='utf-8') as f:
+        print(f.read())
+
+
+if __name__ == "__main__":
+    main()
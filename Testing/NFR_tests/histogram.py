@@ -0,0 +1,128 @@
+"""
+HDR-style latency histogram.
+
+Values are recorded in microseconds into log-linear buckets, so memory is
+bounded by the value range rather than the sample count, and the relative
+error of any reported percentile stays below 10^-significant_digits.
+Histograms from different runs, workers or time slices can be merged.
+"""
+import math
+
+
+class LatencyHistogram:
+
+    def __init__(self, significant_digits=3):
+        self.significant_digits = significant_digits
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_count = 1 << self._sub_bits
+        self._half_count = self._sub_count >> 1
+        self.counts = {}
+        self.total_count = 0
+        self.total_sum = 0.0
+        self.total_sum_squares = 0.0
+        self.min_value = None
+        self.max_value = None
+
+    def _index(self, value_us):
+        if value_us < self._sub_count:
+            return value_us
+        shift = value_us.bit_length() - self._sub_bits
+        return (shift << (self._sub_bits - 1)) + (value_us >> shift)
+
+    def _bucket_bounds(self, index):
+        """Lowest value and width (in microseconds) of a bucket"""
+        if index < self._sub_count:
+            return index, 1
+        shift = index // self._half_count - 1
+        return (index - shift * self._half_count) << shift, 1 << shift
+
+    def record(self, seconds, count=1):
+        """Record a latency given in seconds"""
+        value_us = max(0, int(round(seconds * 1_000_000)))
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_sum += seconds * count
+        self.total_sum_squares += seconds * seconds * count
+        if self.min_value is None or seconds < self.min_value:
+            self.min_value = seconds
+        if self.max_value is None or seconds > self.max_value:
+            self.max_value = seconds
+
+    def merge(self, other):
+        """Add all samples of another histogram into this one"""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        self.total_sum_squares += other.total_sum_squares
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+        return self
+
+    def percentile(self, q):
+        """Latency in seconds at percentile q (0-100)"""
+        if self.total_count == 0:
+            return 0
+        target = max(1, math.ceil(q / 100 * self.total_count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                low, width = self._bucket_bounds(index)
+                value = (low + (width - 1) / 2) / 1_000_000
+                return min(max(value, self.min_value), self.max_value)
+        return self.max_value
+
+    def mean(self):
+        return self.total_sum / self.total_count if self.total_count else 0
+
+    def stdev(self):
+        if self.total_count < 2:
+            return 0
+        variance = (self.total_sum_squares - self.total_sum ** 2 / self.total_count) / (self.total_count - 1)
+        return math.sqrt(max(variance, 0))
+
+    def summary(self):
+        """Response-time fields in the shape of the load report result dicts"""
+        return {
+            'avg_response_time': self.mean(),
+            'min_response_time': self.min_value or 0,
+            'max_response_time': self.max_value or 0,
+            'median_response_time': self.percentile(50),
+            'p95_response_time': self.percentile(95),
+            'p99_response_time': self.percentile(99),
+            'std_dev': self.stdev()
+        }
+
+    def buckets(self):
+        """(value in seconds, count) pairs in ascending order"""
+        for index in sorted(self.counts):
+            low, width = self._bucket_bounds(index)
+            yield (low + (width - 1) / 2) / 1_000_000, self.counts[index]
+
+    def to_dict(self):
+        return {
+            'significant_digits': self.significant_digits,
+            'counts': {str(index): count for index, count in sorted(self.counts.items())},
+            'total_count': self.total_count,
+            'total_sum': self.total_sum,
+            'total_sum_squares': self.total_sum_squares,
+            'min': self.min_value,
+            'max': self.max_value
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get('significant_digits', 3))
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.total_count = data['total_count']
+        histogram.total_sum = data['total_sum']
+        histogram.total_sum_squares = data.get('total_sum_squares', 0.0)
+        histogram.min_value = data['min']
+        histogram.max_value = data['max']
+        return histogram
@@ -0,0 +1,275 @@
+"""
+Asyncio HTTP load engine shared by the NFR load tests.
+
+Virtual users are coroutines rather than OS threads, and every request goes
+through one aiohttp connection pool, so a single process can keep thousands
+of users in flight. Each request produces the same dict that
+performance_tests._fetch_page returns, plus a 'phases' breakdown of where
+the time went (see PHASES).
+"""
+import asyncio
+import math
+import time
+
+import aiohttp
+
+from histogram import LatencyHistogram
+
+
+DEFAULT_CONNECTION_LIMIT = 1000
+
+# Client-side latency phases, in order. 'connect' covers the TCP and TLS
+# handshakes (aiohttp creates the TLS session inside connection creation);
+# 'queue' is time spent waiting for a free connection in the pool. Phases
+# that did not happen (e.g. dns/connect on a reused connection) are 0.
+PHASES = ('queue', 'dns', 'connect', 'send', 'ttfb', 'download')
+
+
+async def _fetch(session, url, timeout, scheduled=None):
+    """
+    Single GET through the shared session. When `scheduled` (a perf_counter
+    value) is given, 'time' is measured from that intended start instead of
+    the actual send, and the raw service time is kept as 'service_time'.
+    """
+    timestamp = time.time()
+    sent = time.perf_counter()
+    start = sent if scheduled is None else scheduled
+    try:
+        result = await _get(session, url, timeout, start)
+    except asyncio.TimeoutError:
+        result = {'success': False, 'time': time.perf_counter() - start, 'error': 'Timeout'}
+    except Exception as e:
+        result = {'success': False, 'time': time.perf_counter() - start, 'error': str(e) or type(e).__name__}
+    result['timestamp'] = timestamp
+    if scheduled is not None:
+        result['service_time'] = time.perf_counter() - sent
+    return result
+
+
+async def _get(session, url, timeout, start):
+    marks = {'request_start': time.perf_counter()}
+    async with session.get(
+        url, timeout=aiohttp.ClientTimeout(total=timeout), trace_request_ctx={'marks': marks}
+    ) as response:
+        await response.read()
+        marks['body_done'] = time.perf_counter()
+        return {
+            'success': response.status == 200,
+            'time': time.perf_counter() - start,
+            'status': response.status,
+            'phases': _phases(marks)
+        }
+
+
+def _phases(marks):
+    """Turn trace timestamps into per-phase durations in seconds"""
+    def span(begin, end):
+        return marks[end] - marks[begin] if begin in marks and end in marks else 0.0
+
+    dns = span('dns_start', 'dns_end')
+    ready = max(marks.get(name, 0.0) for name in ('request_start', 'queue_end', 'connect_end'))
+    return {
+        'queue': span('queue_start', 'queue_end'),
+        'dns': dns,
+        'connect': max(span('connect_start', 'connect_end') - dns, 0.0),
+        'send': marks['headers_sent'] - ready if 'headers_sent' in marks else 0.0,
+        'ttfb': span('headers_sent', 'headers_received'),
+        'download': span('headers_received', 'body_done')
+    }
+
+
+def _trace_config():
+    """aiohttp trace hooks that stamp the phase boundaries of each request"""
+    def mark(name):
+        async def handler(session, context, params):
+            context.trace_request_ctx['marks'][name] = time.perf_counter()
+        return handler
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_queued_start.append(mark('queue_start'))
+    trace_config.on_connection_queued_end.append(mark('queue_end'))
+    trace_config.on_connection_create_start.append(mark('connect_start'))
+    trace_config.on_connection_create_end.append(mark('connect_end'))
+    trace_config.on_dns_resolvehost_start.append(mark('dns_start'))
+    trace_config.on_dns_resolvehost_end.append(mark('dns_end'))
+    trace_config.on_request_headers_sent.append(mark('headers_sent'))
+    trace_config.on_request_end.append(mark('headers_received'))
+    return trace_config
+
+
+def _make_session(connection_limit, force_close=False):
+    connector = aiohttp.TCPConnector(limit=connection_limit, ttl_dns_cache=300, force_close=force_close)
+    return aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config()])
+
+
+def phase_histograms(results):
+    """One LatencyHistogram per phase over the successful results"""
+    histograms = {phase: LatencyHistogram() for phase in PHASES}
+    for result in results:
+        if result['success'] and 'phases' in result:
+            for phase in PHASES:
+                histograms[phase].record(result['phases'][phase])
+    return histograms
+
+
+def completion_counts(results, origin=0.0):
+    """Successful completions per whole second after `origin`, as {second: count}"""
+    counts = {}
+    for result in results:
+        if result['success'] and 'timestamp' in result:
+            second = int(result['timestamp'] + result.get('service_time', result['time']) - origin)
+            counts[second] = counts.get(second, 0) + 1
+    return counts
+
+
+def per_second_series(counts):
+    """{second: count} as a list from the first to the last second, empty seconds as 0"""
+    if not counts:
+        return []
+    return [counts.get(second, 0) for second in range(min(counts), max(counts) + 1)]
+
+
+def summarize_phases(histograms):
+    """Percentile table per phase, in seconds"""
+    return {
+        phase: {
+            'avg': histogram.mean(),
+            'median': histogram.percentile(50),
+            'p95': histogram.percentile(95),
+            'p99': histogram.percentile(99)
+        }
+        for phase, histogram in histograms.items()
+    }
+
+
+# How virtual users get their connections:
+#   shared   - one pool for all users (default, cheapest for the load generator)
+#   per_user - each user keeps its own keep-alive session, like a browser tab
+#   fresh    - every request opens and closes its own connection (TCP + TLS)
+CONNECTION_MODES = ('shared', 'per_user', 'fresh')
+
+
+async def _user_requests(session, url, timeout, requests_per_user):
+    return [await _fetch(session, url, timeout) for _ in range(requests_per_user)]
+
+
+async def _own_session_requests(url, timeout, requests_per_user):
+    async with _make_session(1) as session:
+        return await _user_requests(session, url, timeout, requests_per_user)
+
+
+async def _run_concurrent(url, num_users, connection_limit, timeout, connection_mode, requests_per_user):
+    if connection_mode == 'per_user':
+        per_user = await asyncio.gather(*(
+            _own_session_requests(url, timeout, requests_per_user) for _ in range(num_users)
+        ))
+    else:
+        async with _make_session(connection_limit, force_close=connection_mode == 'fresh') as session:
+            per_user = await asyncio.gather(*(
+                _user_requests(session, url, timeout, requests_per_user) for _ in range(num_users)
+            ))
+    return [result for results in per_user for result in results]
+
+
+def run_concurrent_requests(
+    url,
+    num_users,
+    connection_limit=DEFAULT_CONNECTION_LIMIT,
+    timeout=10,
+    connection_mode='shared',
+    requests_per_user=1
+):
+    """
+    Start all virtual users at once; each issues requests_per_user sequential
+    requests. Returns the flat list of per-request result dicts.
+    """
+    if connection_mode not in CONNECTION_MODES:
+        raise ValueError(f"connection_mode must be one of {', '.join(CONNECTION_MODES)}")
+    return asyncio.run(_run_concurrent(
+        url, num_users, min(num_users, connection_limit), timeout, connection_mode, requests_per_user
+    ))
+
+
+# --- Open-loop arrival schedules ---
+# A schedule is a list of stages (duration_seconds, start_rps, end_rps); the
+# request rate changes linearly within a stage.
+
+def constant_rate(rps, duration):
+    return [(duration, rps, rps)]
+
+
+def ramp_rate(start_rps, end_rps, duration):
+    return [(duration, start_rps, end_rps)]
+
+
+def step_rate(rates, step_duration):
+    return [(step_duration, rps, rps) for rps in rates]
+
+
+def spike_rate(base_rps, spike_rps, duration, spike_start, spike_duration):
+    stages = []
+    if spike_start > 0:
+        stages.append((spike_start, base_rps, base_rps))
+    stages.append((spike_duration, spike_rps, spike_rps))
+    remaining = duration - spike_start - spike_duration
+    if remaining > 0:
+        stages.append((remaining, base_rps, base_rps))
+    return stages
+
+
+def arrival_offsets(stages):
+    """
+    Yield (offset_seconds, stage_index) for every intended request start.
+    Arrivals are spaced so that the cumulative count follows the integral of
+    the stage's rate, which keeps ramps exact even when starting from 0 rps.
+    """
+    stage_start = 0.0
+    for stage_index, (duration, start_rps, end_rps) in enumerate(stages):
+        slope = (end_rps - start_rps) / duration if duration > 0 else 0
+        expected = start_rps * duration + slope * duration ** 2 / 2
+        k = 1
+        while k <= expected:
+            if slope == 0:
+                t = k / start_rps
+            else:
+                t = (-start_rps + math.sqrt(start_rps ** 2 + 2 * slope * k)) / slope
+            yield stage_start + t, stage_index
+            k += 1
+        stage_start += duration
+
+
+async def _run_open_loop(url, stages, connection_limit, timeout, on_result):
+    pending = set()
+
+    def _collect(task):
+        pending.discard(task)
+        on_result(task.result())
+
+    async with _make_session(connection_limit) as session:
+        origin = time.perf_counter() + 0.1
+        for offset, stage_index in arrival_offsets(stages):
+            scheduled = origin + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(_tag(_fetch(session, url, timeout, scheduled), stage_index))
+            pending.add(task)
+            task.add_done_callback(_collect)
+        if pending:
+            await asyncio.wait(set(pending))
+
+
+async def _tag(coro, stage_index):
+    result = await coro
+    result['stage'] = stage_index
+    return result
+
+
+def run_open_loop(url, stages, on_result, connection_limit=DEFAULT_CONNECTION_LIMIT, timeout=10):
+    """
+    Issue requests on the given arrival schedule regardless of how fast the
+    server answers (open loop). Every completed request is passed to
+    on_result; latency is measured from the intended start time, so queueing
+    behind slow responses is not hidden (coordinated-omission correction).
+    """
+    asyncio.run(_run_open_loop(url, stages, connection_limit, timeout, on_result))
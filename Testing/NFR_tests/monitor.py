@@ -0,0 +1,460 @@
+"""
+Synthetic monitoring daemon.
+
+Runs page and API probes from performance_tests on a schedule, keeps the
+results in a local SQLite time-series store, and serves a small dashboard
+and JSON API. Every probe run is stored with a latency histogram; completed
+minutes are rolled up into 1m rows and completed hours into 1h rows by
+merging those histograms, so percentiles stay exact across resolutions.
+A trend check compares the recent window with a longer baseline and records
+latency and error-rate changes as events.
+
+Usage:
+    python monitor.py run [--config monitor.json] [--db monitor.db] [--port 8791]
+    python monitor.py query login_page [--resolution 1h] [--hours 24]
+
+Config file:
+    {"probes": [{"name": "login_page", "url": "https://...", "kind": "page", "interval": 60},
+                {"name": "stories_load", "url": "http://...", "kind": "load", "users": 10, "interval": 300}]}
+"""
+import argparse
+import heapq
+import json
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import performance_tests
+import scenarios
+from histogram import LatencyHistogram
+
+
+DEFAULT_PORT = 8791
+RESOLUTIONS = {'1m': 60, '1h': 3600}
+
+# Samples are stamped with their start time but stored when the probe finishes, so a
+# minute is rolled up only this many seconds after it ends. Must exceed the longest
+# probe (10s request timeout, load probes of several requests) plus executor queueing.
+ROLLUP_GRACE = 120
+
+# Data older than this (seconds) is deleted; 1h rollups are kept forever
+RETENTION = {'samples': 2 * 86400, '1m': 14 * 86400}
+
+DEFAULT_PROBES = [
+    {'name': 'login_page', 'url': "https://quest-ai-frontend.vercel.app/Login", 'kind': 'page', 'interval': 60},
+    {'name': 'public_stories_api', 'url': f"{scenarios.BACKEND_URL}/api/v1/story/publicstories",
+     'kind': 'page', 'interval': 60},
+    {'name': 'llm_health', 'url': f"{scenarios.LLM_URL}/health", 'kind': 'page', 'interval': 60}
+]
+
+# Trend detection: recent window vs the baseline window before it
+TREND = {
+    'recent_window': 15 * 60,
+    'baseline_window': 24 * 3600,
+    'min_samples': 10,
+    'latency_threshold': 0.25,     # relative p95 change
+    'error_threshold': 0.02,       # absolute error-rate increase
+    'z_score': 3.0
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    probe TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    histogram TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_probe_ts ON samples (probe, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    probe TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    p50 REAL, p95 REAL, p99 REAL, mean REAL,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (resolution, probe, bucket)
+);
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    probe TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class MonitorStore:
+    """SQLite time-series store shared by the scheduler and the HTTP threads"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def add_sample(self, ts, probe, requests, errors, histogram, error=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)",
+                (ts, probe, requests, errors, json.dumps(histogram.to_dict()), error)
+            )
+
+    def add_event(self, ts, probe, kind, detail):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO events VALUES (?, ?, ?, ?)", (ts, probe, kind, json.dumps(detail)))
+
+    def _meta(self, key, default=0.0):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _rollup(self, resolution, rows, bucket_size):
+        """Merge (ts, probe, requests, errors, histogram) rows into buckets of one resolution"""
+        buckets = {}
+        for ts, probe, requests, errors, histogram in rows:
+            key = (probe, int(ts // bucket_size * bucket_size))
+            entry = buckets.setdefault(key, [0, 0, LatencyHistogram()])
+            entry[0] += requests
+            entry[1] += errors
+            entry[2].merge(LatencyHistogram.from_dict(json.loads(histogram)))
+        for (probe, bucket), (requests, errors, histogram) in buckets.items():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (resolution, bucket, probe, requests, errors,
+                 histogram.percentile(50), histogram.percentile(95), histogram.percentile(99), histogram.mean(),
+                 json.dumps(histogram.to_dict()))
+            )
+
+    def rollup(self, now=None, grace=ROLLUP_GRACE):
+        """Roll completed minutes and hours up, then apply retention"""
+        now = now or time.time()
+        # Minutes that probes still running may write into stay open until the grace has passed
+        minute_end = (now - grace) // 60 * 60
+        hour_end = minute_end // 3600 * 3600
+        with self.lock, self.conn:
+            rolled = self._meta('rolled_1m')
+            rows = self.conn.execute(
+                "SELECT ts, probe, requests, errors, histogram FROM samples WHERE ts >= ? AND ts < ?",
+                (rolled, minute_end)
+            ).fetchall()
+            self._rollup('1m', rows, 60)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('rolled_1m', ?)", (minute_end,))
+
+            rolled = self._meta('rolled_1h')
+            rows = self.conn.execute(
+                "SELECT bucket, probe, requests, errors, histogram FROM rollups "
+                "WHERE resolution = '1m' AND bucket >= ? AND bucket < ?",
+                (rolled, hour_end)
+            ).fetchall()
+            self._rollup('1h', rows, 3600)
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('rolled_1h', ?)", (hour_end,))
+
+            self.conn.execute("DELETE FROM samples WHERE ts < ?", (now - RETENTION['samples'],))
+            self.conn.execute("DELETE FROM rollups WHERE resolution = '1m' AND bucket < ?", (now - RETENTION['1m'],))
+
+    def series(self, probe, resolution='1m', since=0):
+        return self.query(
+            "SELECT bucket, requests, errors, p50, p95, p99, mean FROM rollups "
+            "WHERE resolution = ? AND probe = ? AND bucket >= ? ORDER BY bucket",
+            (resolution, probe, since)
+        )
+
+    def window(self, probe, start, end):
+        """Merged totals and histogram of the 1m rollups in [start, end)"""
+        histogram = LatencyHistogram()
+        requests = errors = 0
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT requests, errors, histogram FROM rollups "
+                "WHERE resolution = '1m' AND probe = ? AND bucket >= ? AND bucket < ?",
+                (probe, start, end)
+            ).fetchall()
+        for row in rows:
+            requests += row['requests']
+            errors += row['errors']
+            histogram.merge(LatencyHistogram.from_dict(json.loads(row['histogram'])))
+        return requests, errors, histogram
+
+
+# --- Probes ---
+
+def run_probe(probe):
+    """Run one probe; returns (requests, errors, histogram, first error)"""
+    histogram = LatencyHistogram()
+    if probe.get('kind', 'page') == 'load':
+        result = performance_tests._test_concurrent_load(probe['url'], probe.get('users', 10))
+        for response_time in result['response_times']:
+            histogram.record(response_time)
+        errors = result['errors']
+        return result['successful'] + result['failed'], result['failed'], histogram, errors[0] if errors else None
+
+    result = performance_tests._fetch_page(probe['url'])
+    if result['success']:
+        histogram.record(result['time'])
+        return 1, 0, histogram, None
+    return 1, 1, histogram, result.get('error', f"HTTP {result.get('status', 'Unknown')}")
+
+
+def detect_trends(store, probe, now=None, settings=TREND):
+    """Compare the recent window with the baseline before it; returns new events"""
+    now = now or time.time()
+    recent_start = now - settings['recent_window']
+    recent_requests, recent_errors, recent = store.window(probe, recent_start, now)
+    baseline_requests, baseline_errors, baseline = store.window(
+        probe, recent_start - settings['baseline_window'], recent_start
+    )
+    if recent_requests < settings['min_samples'] or baseline_requests < settings['min_samples']:
+        return []
+
+    events = []
+    if recent.total_count and baseline.total_count:
+        recent_p95, baseline_p95 = recent.percentile(95), baseline.percentile(95)
+        change = (recent_p95 - baseline_p95) / baseline_p95 if baseline_p95 else 0
+        if abs(change) > settings['latency_threshold']:
+            events.append(('latency_up' if change > 0 else 'latency_down', {
+                'recent_p95': recent_p95, 'baseline_p95': baseline_p95, 'change_pct': change * 100
+            }))
+
+    # Two-proportion z-test so a handful of errors on few samples is not a trend
+    recent_rate = recent_errors / recent_requests
+    baseline_rate = baseline_errors / baseline_requests
+    pooled = (recent_errors + baseline_errors) / (recent_requests + baseline_requests)
+    spread = math.sqrt(pooled * (1 - pooled) * (1 / recent_requests + 1 / baseline_requests))
+    z = (recent_rate - baseline_rate) / spread if spread else 0
+    if recent_rate - baseline_rate > settings['error_threshold'] and z > settings['z_score']:
+        events.append(('error_rate_up', {
+            'recent_error_rate': recent_rate, 'baseline_error_rate': baseline_rate, 'z': z
+        }))
+
+    new_events = []
+    for kind, detail in events:
+        # One event per kind per recent window
+        already = store.query(
+            "SELECT 1 FROM events WHERE probe = ? AND kind = ? AND ts >= ?", (probe, kind, recent_start)
+        )
+        if not already:
+            store.add_event(now, probe, kind, detail)
+            new_events.append((kind, detail))
+    return new_events
+
+
+# --- Dashboard and JSON API ---
+
+DASHBOARD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Quest AI Monitor</title>
+<style>
+body { font-family: sans-serif; margin: 20px; background: #fafafa; }
+.probe { background: #fff; border: 1px solid #ddd; padding: 10px; margin-bottom: 16px; }
+.bad { color: #c00; } .good { color: #080; }
+canvas { width: 100%; height: 160px; }
+</style></head><body>
+<h2>Quest AI Synthetic Monitoring</h2>
+<div id="probes"></div>
+<h3>Events</h3><table id="events" border="1" cellpadding="4"></table>
+<script>
+function draw(canvas, rows) {
+    const ctx = canvas.getContext('2d');
+    canvas.width = canvas.clientWidth; canvas.height = canvas.clientHeight;
+    if (!rows.length) return;
+    const max = Math.max(...rows.map(r => r.p95 || 0)) || 1;
+    const x = i => i / Math.max(rows.length - 1, 1) * (canvas.width - 10) + 5;
+    const y = v => canvas.height - 5 - (v || 0) / max * (canvas.height - 20);
+    [['p50', '#36c'], ['p95', '#e60']].forEach(([key, color]) => {
+        ctx.strokeStyle = color; ctx.beginPath();
+        rows.forEach((r, i) => i ? ctx.lineTo(x(i), y(r[key])) : ctx.moveTo(x(i), y(r[key])));
+        ctx.stroke();
+    });
+    ctx.fillStyle = '#c00';
+    rows.forEach((r, i) => { if (r.errors) ctx.fillRect(x(i) - 2, canvas.height - 6, 4, 6); });
+    ctx.fillStyle = '#333'; ctx.fillText('p95 max ' + (max * 1000).toFixed(0) + ' ms', 8, 12);
+}
+async function refresh() {
+    const probes = await (await fetch('/api/probes')).json();
+    const container = document.getElementById('probes');
+    container.innerHTML = '';
+    for (const p of probes) {
+        const div = document.createElement('div');
+        div.className = 'probe';
+        const last = p.last || {};
+        div.innerHTML = '<b>' + p.name + '</b> ' + p.url + '<br>last: ' +
+            (last.errors ? '<span class="bad">error ' + (last.error || '') + '</span>' : '<span class="good">ok</span>') +
+            ' | 1h p95: ' + ((p.hour_p95 || 0) * 1000).toFixed(0) + ' ms, error rate: ' +
+            ((p.hour_error_rate || 0) * 100).toFixed(1) + '%<canvas></canvas>';
+        container.appendChild(div);
+        const since = Date.now() / 1000 - 6 * 3600;
+        const rows = await (await fetch('/api/series?probe=' + encodeURIComponent(p.name) + '&since=' + since)).json();
+        draw(div.querySelector('canvas'), rows);
+    }
+    const events = await (await fetch('/api/events')).json();
+    document.getElementById('events').innerHTML = '<tr><th>Time</th><th>Probe</th><th>Kind</th><th>Detail</th></tr>' +
+        events.map(e => '<tr><td>' + new Date(e.ts * 1000).toLocaleString() + '</td><td>' + e.probe +
+            '</td><td>' + e.kind + '</td><td>' + e.detail + '</td></tr>').join('');
+}
+refresh(); setInterval(refresh, 60000);
+</script></body></html>
+"""
+
+
+def _probe_status(store, probe, now):
+    last = store.query(
+        "SELECT ts, requests, errors, error FROM samples WHERE probe = ? ORDER BY ts DESC LIMIT 1", (probe['name'],)
+    )
+    requests, errors, histogram = store.window(probe['name'], now - 3600, now)
+    return {
+        **probe,
+        'last': last[0] if last else None,
+        'hour_requests': requests,
+        'hour_error_rate': errors / requests if requests else None,
+        'hour_p95': histogram.percentile(95) if histogram.total_count else None
+    }
+
+
+class _MonitorHandler(BaseHTTPRequestHandler):
+
+    def _send(self, body, content_type='application/json', status=200):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        store = self.server.store
+        now = time.time()
+        if url.path == '/':
+            self._send(DASHBOARD, 'text/html; charset=utf-8')
+        elif url.path == '/api/probes':
+            self._send(json.dumps([_probe_status(store, probe, now) for probe in self.server.probes]))
+        elif url.path == '/api/series':
+            resolution = params.get('resolution', '1m')
+            if 'probe' not in params or resolution not in RESOLUTIONS:
+                self._send(json.dumps({'error': "probe and a resolution of 1m or 1h are required"}), status=400)
+                return
+            since = float(params.get('since', now - 6 * 3600))
+            self._send(json.dumps(store.series(params['probe'], resolution, since)))
+        elif url.path == '/api/events':
+            since = float(params.get('since', now - 7 * 86400))
+            self._send(json.dumps(store.query("SELECT * FROM events WHERE ts >= ? ORDER BY ts DESC", (since,))))
+        else:
+            self._send(json.dumps({'error': "Not found"}), status=404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_dashboard(store, probes, host='127.0.0.1', port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), _MonitorHandler)
+    server.store = store
+    server.probes = probes
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Dashboard: http://{host}:{port}/")
+    return server
+
+
+# --- Scheduler ---
+
+def _record(store, probe, future, started):
+    try:
+        requests, errors, histogram, error = future.result()
+    except Exception as e:
+        requests, errors, histogram, error = 1, 1, LatencyHistogram(), str(e)
+    store.add_sample(started, probe['name'], requests, errors, histogram, error)
+    status = "✓" if not errors else "✗"
+    latency = f"{histogram.mean() * 1000:.0f} ms" if histogram.total_count else error
+    print(f"{time.strftime('%H:%M:%S')} {status} {probe['name']}: {latency}")
+
+
+def run_monitor(probes, db_path="monitor.db", host='127.0.0.1', port=DEFAULT_PORT, max_workers=4, stop_event=None):
+    """Run probes on their intervals until interrupted (or stop_event is set)"""
+    store = MonitorStore(db_path)
+    server = serve_dashboard(store, probes, host, port) if port else None
+    stop_event = stop_event or threading.Event()
+
+    now = time.time()
+    # (next run, order, probe); the rollup/trend job runs every minute
+    queue = [(now, i, probe) for i, probe in enumerate(probes)]
+    queue.append((now // 60 * 60 + 60, len(probes), None))
+    heapq.heapify(queue)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while not stop_event.is_set():
+                due, order, probe = heapq.heappop(queue)
+                if stop_event.wait(max(due - time.time(), 0)):
+                    break
+                if probe is None:
+                    store.rollup()
+                    for p in probes:
+                        for kind, detail in detect_trends(store, p['name']):
+                            print(f"⚠ TREND {p['name']}: {kind} {json.dumps(detail)}")
+                    heapq.heappush(queue, (due + 60, order, None))
+                    continue
+                started = time.time()
+                future = executor.submit(run_probe, probe)
+                future.add_done_callback(lambda f, probe=probe, started=started: _record(store, probe, f, started))
+                heapq.heappush(queue, (due + probe.get('interval', 60), order, probe))
+        except KeyboardInterrupt:
+            print("\nStopping monitor")
+        finally:
+            if server:
+                server.shutdown()
+    return store
+
+
+def load_probes(config_path=None):
+    if config_path is None:
+        return DEFAULT_PROBES
+    with open(config_path, encoding='utf-8') as f:
+        return json.load(f)['probes']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic monitoring for Quest AI")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Run probes and serve the dashboard")
+    run.add_argument('--config', default=None)
+    run.add_argument('--db', default="monitor.db")
+    run.add_argument('--host', default="127.0.0.1")
+    run.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    query = subparsers.add_parser('query', help="Print rollups for a probe")
+    query.add_argument('probe')
+    query.add_argument('--db', default="monitor.db")
+    query.add_argument('--resolution', choices=list(RESOLUTIONS), default='1h')
+    query.add_argument('--hours', type=float, default=24)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run_monitor(load_probes(args.config), args.db, args.host, args.port)
+    else:
+        store = MonitorStore(args.db)
+        print(f"{'Time':<20} {'Requests':<10} {'Errors':<8} {'P50(ms)':<10} {'P95(ms)':<10} {'P99(ms)':<10}")
+        print("-" * 70)
+        for row in store.series(args.probe, args.resolution, time.time() - args.hours * 3600):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(row['bucket'])):<20} {row['requests']:<10} "
+                  f"{row['errors']:<8} {(row['p50'] or 0) * 1000:<10.1f} {(row['p95'] or 0) * 1000:<10.1f} "
+                  f"{(row['p99'] or 0) * 1000:<10.1f}")
+
+
+if __name__ == "__main__":
+    main()
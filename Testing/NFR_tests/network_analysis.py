@@ -0,0 +1,204 @@
+"""
+Network waterfall and asset weight analysis from Chrome's performance log.
+
+The driver must be created with core_tests.initialize_driver(performance_log=True)
+so Chrome records DevTools Network/Page events. A page is loaded once with a
+cleared cache and once more as a repeat visit; the events of each load are
+folded into a per-request waterfall.
+"""
+import json
+import time
+
+import browser_metrics
+
+
+# Resource Timing exposes Chrome's own render-blocking verdict (Chrome 107+)
+_RENDER_BLOCKING_SCRIPT = """
+const status = {};
+for (const entry of performance.getEntriesByType('resource')) {
+    if (entry.renderBlockingStatus) status[entry.name] = entry.renderBlockingStatus;
+}
+return status;
+"""
+
+
+def drain_performance_log(driver):
+    """Return and clear the buffered DevTools events as (method, params) pairs"""
+    events = []
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        events.append((message['method'], message.get('params', {})))
+    return events
+
+
+def _wait_for_network_quiet(driver, quiet_period=0.5, timeout=10):
+    """Collect events until no network activity is seen for quiet_period seconds"""
+    events = drain_performance_log(driver)
+    deadline = time.time() + timeout
+    quiet_since = time.time()
+    while time.time() < deadline and time.time() - quiet_since < quiet_period:
+        time.sleep(0.1)
+        new_events = drain_performance_log(driver)
+        if any(method.startswith('Network.') for method, _ in new_events):
+            quiet_since = time.time()
+        events.extend(new_events)
+    return events
+
+
+def build_waterfall(events, render_blocking_status=None):
+    """Fold DevTools Network events into one entry per request, ordered by start"""
+    render_blocking_status = render_blocking_status or {}
+    requests = {}
+    dom_content_loaded = None
+
+    for method, params in events:
+        if method == 'Page.domContentEventFired':
+            dom_content_loaded = params['timestamp']
+            continue
+        request_id = params.get('requestId')
+        if request_id is None:
+            continue
+        if method == 'Network.requestWillBeSent':
+            requests[request_id] = {
+                'url': params['request']['url'],
+                'type': params.get('type', 'Other'),
+                'priority': params['request'].get('initialPriority'),
+                'start': params['timestamp'],
+                'status': None,
+                'mime_type': None,
+                'transferred_bytes': 0,
+                'from_cache': False,
+                'failed': False
+            }
+            continue
+        request = requests.get(request_id)
+        if request is None:
+            continue
+        if method == 'Network.responseReceived':
+            response = params['response']
+            request['type'] = params.get('type', request['type'])
+            request['status'] = response.get('status')
+            request['mime_type'] = response.get('mimeType')
+            request['response'] = params['timestamp']
+            if response.get('fromDiskCache') or response.get('fromPrefetchCache') or response.get('status') == 304:
+                request['from_cache'] = True
+        elif method == 'Network.requestServedFromCache':
+            request['from_cache'] = True
+        elif method == 'Network.loadingFinished':
+            request['end'] = params['timestamp']
+            request['transferred_bytes'] = params.get('encodedDataLength', 0)
+        elif method == 'Network.loadingFailed':
+            request['end'] = params['timestamp']
+            request['failed'] = True
+
+    waterfall = sorted(requests.values(), key=lambda r: r['start'])
+    origin = waterfall[0]['start'] if waterfall else 0
+    for request in waterfall:
+        end = request.get('end', request.get('response', request['start']))
+        request['start_ms'] = (request['start'] - origin) * 1000
+        request['duration_ms'] = (end - request['start']) * 1000
+        request['ttfb_ms'] = (request['response'] - request['start']) * 1000 if 'response' in request else None
+        if request['url'] in render_blocking_status:
+            request['render_blocking'] = render_blocking_status[request['url']] == 'blocking'
+        else:
+            # Fallback: high-priority CSS/JS requested before DOMContentLoaded
+            request['render_blocking'] = (
+                request['type'] in ('Stylesheet', 'Script')
+                and request['priority'] in ('VeryHigh', 'High')
+                and (dom_content_loaded is None or request['start'] < dom_content_loaded)
+            )
+        for key in ('start', 'end', 'response'):
+            request.pop(key, None)
+    return waterfall
+
+
+def summarize_waterfall(waterfall, slowest=10):
+    """Weight by type, slowest requests, render-blocking assets and cache hits"""
+    by_type = {}
+    for request in waterfall:
+        entry = by_type.setdefault(request['type'], {'requests': 0, 'transferred_bytes': 0})
+        entry['requests'] += 1
+        entry['transferred_bytes'] += request['transferred_bytes']
+    cached = sum(1 for r in waterfall if r['from_cache'])
+    return {
+        'requests': len(waterfall),
+        'transferred_bytes': sum(r['transferred_bytes'] for r in waterfall),
+        'by_type': dict(sorted(by_type.items(), key=lambda item: -item[1]['transferred_bytes'])),
+        'slowest': sorted(waterfall, key=lambda r: -r['duration_ms'])[:slowest],
+        'render_blocking': [r for r in waterfall if r['render_blocking']],
+        'failed': [r for r in waterfall if r['failed']],
+        'cache_hits': cached,
+        'cache_hit_ratio': cached / len(waterfall) if waterfall else 0
+    }
+
+
+def capture_page_load(driver, url, clear_cache=False):
+    """Load url and return its waterfall"""
+    if clear_cache:
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    drain_performance_log(driver)
+    driver.get(url)
+    browser_metrics.wait_for_load_event(driver)
+    events = _wait_for_network_quiet(driver)
+    return build_waterfall(events, driver.execute_script(_RENDER_BLOCKING_SCRIPT))
+
+
+def analyze_page(driver, url):
+    """Cold load followed by a repeat visit, each summarized"""
+    cold = capture_page_load(driver, url, clear_cache=True)
+    repeat = capture_page_load(driver, url)
+    return {
+        'url': url,
+        'cold': {'summary': summarize_waterfall(cold), 'waterfall': cold},
+        'repeat': {'summary': summarize_waterfall(repeat), 'waterfall': repeat}
+    }
+
+
+def write_waterfall_report(analysis, report_dir, prefix):
+    """Write the waterfall analysis as JSON and a readable summary"""
+    report_dir.mkdir(parents=True, exist_ok=True)
+    cold = analysis['cold']['summary']
+    repeat = analysis['repeat']['summary']
+
+    summary_file = report_dir / f"{prefix}_network_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("NETWORK WATERFALL ANALYSIS\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Page: {analysis['url']}\n")
+        f.write(f"Cold load: {cold['requests']} requests, {cold['transferred_bytes'] / 1024:.1f} KB transferred\n")
+        f.write(f"Repeat visit: {repeat['requests']} requests, {repeat['transferred_bytes'] / 1024:.1f} KB transferred, "
+                f"cache hit ratio {repeat['cache_hit_ratio'] * 100:.1f}%\n\n")
+
+        f.write("TRANSFER BY TYPE (cold load)\n")
+        f.write(f"{'Type':<16} {'Requests':<10} {'KB':<10}\n")
+        f.write("-" * 80 + "\n")
+        for resource_type, entry in cold['by_type'].items():
+            f.write(f"{resource_type:<16} {entry['requests']:<10} {entry['transferred_bytes'] / 1024:<10.1f}\n")
+
+        f.write("\nSLOWEST RESOURCES (cold load)\n")
+        f.write(f"{'Duration(ms)':<14} {'Start(ms)':<12} {'KB':<10} URL\n")
+        f.write("-" * 80 + "\n")
+        for request in cold['slowest']:
+            f.write(f"{request['duration_ms']:<14.0f} {request['start_ms']:<12.0f} "
+                    f"{request['transferred_bytes'] / 1024:<10.1f} {request['url']}\n")
+
+        f.write("\nRENDER-BLOCKING RESOURCES\n")
+        f.write("-" * 80 + "\n")
+        for request in cold['render_blocking']:
+            f.write(f"{request['type']:<12} {request['duration_ms']:<10.0f} {request['url']}\n")
+
+        if cold['failed']:
+            f.write("\nFAILED REQUESTS\n")
+            f.write("-" * 80 + "\n")
+            for request in cold['failed']:
+                f.write(f"{request['url']}\n")
+
+    json_file = report_dir / f"{prefix}_network.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'url': analysis['url'], 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')},
+            **analysis
+        }, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
@@ -7,72 +7,110 @@ import performance_tests
 import security_tests
 import reliability_tests
 import compatibility_tests
+from driver_pool import DriverPool
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from collections import namedtuple
+import io
+import os
+import time
 
 
-def run_nfr_test_suite(page_name, page_url):
+GROUPS = ("Performance", "Security", "Reliability", "Compatibility")
+# Browser groups with no timing thresholds, safe to run side by side in parallel suites
+PARALLEL_GROUPS = ("Security", "Reliability")
+
+# One planned test: func is called as func(driver) when needs_driver, else func()
+PlannedTest = namedtuple("PlannedTest", ["group", "name", "func", "needs_driver"])
+
+
+def _page_report_dir(page_name):
+    return Path("nfr_load_reports") / f"{page_name}_page_report"
+
+
+def build_test_plan(page_name, page_url):
     """
-    Run complete NFR test suite for a given page
+    Ordered list of the NFR tests for a page. The order is the order of the
+    summary; tests are independent of each other, so any subset can run on
+    its own (drivers are reset between tests).
+    """
+    report_dir = _page_report_dir(page_name)
+    form_page = page_name == "Login" or page_name == "Sign_Up"
+    plan = [
+        PlannedTest("Performance", "Page Load Time",
+                    partial(performance_tests.test_load_time_single_load, base_url=page_url), True),
+        PlannedTest("Performance", "Average Response Time",
+                    partial(performance_tests.test_response_time_multiple_loads, base_url=page_url,
+                            report_dir=report_dir, prefix=page_name), True),
+        PlannedTest("Performance", "Network Waterfall",
+                    partial(performance_tests.test_network_waterfall, base_url=page_url,
+                            report_dir=report_dir, prefix=page_name), True),
+        PlannedTest("Performance", "Performance Headers",
+                    partial(performance_tests.test_performance_headers, page_url,
+                            report_dir=report_dir, prefix=page_name), False),
+        PlannedTest("Performance", "Concurrent Load (Server-Side)",
+                    partial(performance_tests.test_concurrent_load_server_side, page_url), False),
+        PlannedTest("Security", "SQL Injection Resistance",
+                    partial(security_tests.test_sql_injection_attempt, base_url=page_url), True),
+        PlannedTest("Security", "XSS Resistance",
+                    partial(security_tests.test_xss_attempt, base_url=page_url), True),
+        PlannedTest("Security", "Session Storage Usage",
+                    partial(security_tests.test_session_storage, base_url=page_url), True),
+        PlannedTest("Security", "Rate Limiting",
+                    partial(security_tests.test_rate_limiting, page_url), False),
+    ]
+    if form_page:
+        plan += [
+            PlannedTest("Reliability", "Empty Form Submission",
+                        partial(reliability_tests.test_empty_form_submission, base_url=page_url), True),
+            PlannedTest("Reliability", "Invalid Email Format",
+                        partial(reliability_tests.test_invalid_email_format, base_url=page_url), True),
+        ]
+    plan.append(PlannedTest("Reliability", "Concurrent Users",
+                            partial(reliability_tests.test_concurrent_user_simulation, page_url), False))
+    if form_page:
+        plan += [
+            PlannedTest("Reliability", "Browser Back Button",
+                        partial(reliability_tests.test_browser_back_button, base_url=page_url), True),
+            PlannedTest("Reliability", "Page Refresh",
+                        partial(reliability_tests.test_page_refresh, base_url=page_url), True),
+        ]
+    plan.append(PlannedTest("Compatibility", "Browser Compatibility",
+                            partial(compatibility_tests.test_browser_compatibility, page_url,
+                                    report_dir=report_dir, prefix=page_name), False))
+    return plan
+
+
+def run_test_plan(plan, pool):
+    """
+    Run planned tests in order, drawing drivers from the pool.
+    Returns ({name: passed}, {name: wall time in seconds}).
     """
-    print("=" * 60)
-    print(f"NFR TESTING SUITE FOR QUEST AI - {page_name.upper()} PAGE")
-    print("=" * 60)
-    
-    # Initialize driver
-    driver = core_tests.initialize_driver()
-    
-    # Wait for browser to be ready
-    if not core_tests.wait_browser(driver):
-        print("✗ FAIL: Browser not ready")
-        driver.quit()
-        return False
-    
     results = {}
-    
-    # Performance Tests
-    print("\n" + "=" * 60)
-    print("PERFORMANCE TESTS")
-    print("=" * 60)
-    results['Page Load Time'] = performance_tests.test_load_time_single_load(driver, page_url)
-    results['Average Response Time'] = performance_tests.test_response_time_multiple_loads(driver, page_url)
-    results['Concurrent Load (Server-Side)'] = performance_tests.test_concurrent_load_server_side(page_url)
-    
-    # Security Tests
-    print("\n" + "=" * 60)
-    print("SECURITY TESTS")
-    print("=" * 60)
-    results['SQL Injection Resistance'] = security_tests.test_sql_injection_attempt(driver, page_url)
-    results['XSS Resistance'] = security_tests.test_xss_attempt(driver, page_url)
-    results['Session Storage Usage'] = security_tests.test_session_storage(driver, page_url)
-    results['Rate Limiting'] = security_tests.test_rate_limiting(page_url)
+    timings = {}
+    group = None
+    for test in plan:
+        if test.group != group:
+            group = test.group
+            print("\n" + "=" * 60)
+            print(f"{group.upper()} TESTS")
+            print("=" * 60)
+        start_time = time.perf_counter()
+        if test.needs_driver:
+            with pool.acquire() as driver:
+                results[test.name] = test.func(driver)
+        else:
+            results[test.name] = test.func()
+        timings[test.name] = time.perf_counter() - start_time
+    return results, timings
 
-    
-    # Reliability Tests
-    print("\n" + "=" * 60)
-    print("RELIABILITY TESTS")
-    print("=" * 60)
 
-    if page_name == "Login" or page_name == "Sign_Up":
-        results['Empty Form Submission'] = reliability_tests.test_empty_form_submission(driver, page_url)
-        results['Invalid Email Format'] = reliability_tests.test_invalid_email_format(driver, page_url)
-    
-    results['Concurrent Users'] = reliability_tests.test_concurrent_user_simulation(page_url)
-    
-    if page_name == "Login" or page_name == "Sign_Up":
-        results['Browser Back Button'] = reliability_tests.test_browser_back_button(driver, page_url)
-        results['Page Refresh'] = reliability_tests.test_page_refresh(driver, page_url)
-    
-    # Compatibility Tests
-    print("\n" + "=" * 60)
-    print("COMPATIBILITY TESTS")
-    print("=" * 60)
-    results['Browser Compatibility'] = compatibility_tests.test_browser_compatibility(page_url)
-    
-    driver.quit()
-    
-    # Print summary
+def _write_summary(page_name, results):
+    """Print the pass/fail summary and write it to the page report folder"""
     print("\n" + "=" * 60)
-    print("TEST SUMMARY")
+    print(f"TEST SUMMARY - {page_name.upper()} PAGE")
     print("=" * 60)
     
     passed = sum(1 for result in results.values() if result)
@@ -84,7 +122,7 @@ def run_nfr_test_suite(page_name, page_url):
     
     print(f"\nOverall: {passed}/{total} tests passed ({passed/total*100:.1f}%)")
     print(f"{total - passed} tests failed")
-    report_dir = Path("nfr_load_reports") / f"{page_name}_page_report"
+    report_dir = _page_report_dir(page_name)
     report_dir.mkdir(parents=True, exist_ok=True)  # Create directory if it doesn't exist
 
     summary_file = report_dir / f"{page_name}_tests_summary.txt"
@@ -97,6 +135,142 @@ def run_nfr_test_suite(page_name, page_url):
     return passed == total
 
 
+def _write_timing_report(page_name, plan, timings, wall_time):
+    """
+    Print and save wall time per test. wall_time is the elapsed time of the
+    whole run; with parallel groups it is less than the sum of the tests.
+    """
+    test_time = sum(timings.values())
+    print("\n" + "=" * 60)
+    print(f"TEST TIMINGS - {page_name.upper()} PAGE")
+    print("=" * 60)
+
+    lines = [f"{'Group':<15} {'Test':<32} {'Time(s)':<10} {'Share':<8}"]
+    for test in plan:
+        duration = timings[test.name]
+        share = duration / test_time * 100 if test_time else 0
+        lines.append(f"{test.group:<15} {test.name:<32} {duration:<10.2f} {share:.1f}%")
+    lines.append(f"\nSum of test times: {test_time:.2f}s")
+    lines.append(f"Suite wall time: {wall_time:.2f}s")
+    for line in lines:
+        print(line)
+
+    report_dir = _page_report_dir(page_name)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    timing_file = report_dir / f"{page_name}_tests_timing.txt"
+    with open(timing_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return str(timing_file)
+
+
+def run_nfr_test_suite(page_name, page_url, pool=None):
+    """
+    Run complete NFR test suite for a given page
+    """
+    print("=" * 60)
+    print(f"NFR TESTING SUITE FOR QUEST AI - {page_name.upper()} PAGE")
+    print("=" * 60)
+    
+    suite_start = time.perf_counter()
+    own_pool = pool is None
+    pool = pool or DriverPool(size=1, performance_log=True)
+    plan = build_test_plan(page_name, page_url)
+    try:
+        # Wait for browser to be ready
+        with pool.acquire() as driver:
+            if not core_tests.wait_browser(driver):
+                print("✗ FAIL: Browser not ready")
+                return False
+        results, timings = run_test_plan(plan, pool)
+    finally:
+        if own_pool:
+            pool.close()
+    
+    passed = _write_summary(page_name, results)
+    _write_timing_report(page_name, plan, timings, time.perf_counter() - suite_start)
+    return passed
+
+
+def _run_group(job):
+    """
+    Run the browser tests (needs_driver) or the HTTP-only tests of one test
+    group of one page; browser tests get a private driver pool.
+    """
+    page_name, page_url, group, needs_driver = job
+    plan = [test for test in build_test_plan(page_name, page_url)
+            if test.group == group and test.needs_driver == needs_driver]
+    output = io.StringIO()
+    with redirect_stdout(output):
+        pool = DriverPool(size=1, performance_log=True) if needs_driver else None
+        try:
+            results, timings = run_test_plan(plan, pool)
+        except Exception as e:
+            print(f"✗ FAIL: {group} tests aborted: {str(e)}")
+            results = {test.name: False for test in plan}
+            timings = {test.name: 0.0 for test in plan}
+        finally:
+            if pool is not None:
+                pool.close()
+    return page_name, group, results, timings, output.getvalue()
+
+
+def run_nfr_test_suites_parallel(pages, max_workers=None):
+    """
+    Run the NFR suites of several pages. pages is a list of (page_name, page_url).
+
+    The Security and Reliability browser tests run first, every (page, test
+    group) pair in its own worker process. Everything whose thresholds are
+    timings then runs one job at a time: the Performance browser tests
+    (page-load time, repeated loads, waterfall), then the HTTP-only tests
+    (needs_driver=False: rate limiting, concurrent load and users, ...). No
+    other browser or load traffic competes with them, so their numbers match
+    a serial run. Results are merged back into plan order.
+    Returns {page_name: all_passed}.
+    """
+    suite_start = time.perf_counter()
+    group_results = {}
+
+    def collect(page_name, group, results, timings, output, phase):
+        print("=" * 60)
+        print(f"NFR TESTING SUITE FOR QUEST AI - {page_name.upper()} PAGE ({group}, {phase})")
+        print(output, end="")
+        merged = group_results.setdefault((page_name, group), ({}, {}))
+        merged[0].update(results)
+        merged[1].update(timings)
+
+    # (page, group, needs_driver) combinations that have at least one test
+    jobs = list(dict.fromkeys(
+        (page_name, page_url, test.group, test.needs_driver)
+        for page_name, page_url in pages for test in build_test_plan(page_name, page_url)
+    ))
+    parallel_jobs = [job for job in jobs if job[3] and job[2] in PARALLEL_GROUPS]
+    if parallel_jobs:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(parallel_jobs), os.cpu_count())) as executor:
+            for result in executor.map(_run_group, parallel_jobs):
+                collect(*result, phase="browser")
+
+    for job in jobs:
+        if job[3] and job[2] not in PARALLEL_GROUPS:
+            collect(*_run_group(job), phase="browser, serial")
+    for job in jobs:
+        if not job[3]:
+            collect(*_run_group(job), phase="HTTP")
+    wall_time = time.perf_counter() - suite_start
+
+    summary = {}
+    for page_name, page_url in pages:
+        plan = build_test_plan(page_name, page_url)
+        results = {}
+        timings = {}
+        for test in plan:
+            group_result, group_timings = group_results[(page_name, test.group)]
+            results[test.name] = group_result[test.name]
+            timings[test.name] = group_timings[test.name]
+        summary[page_name] = _write_summary(page_name, results)
+        _write_timing_report(page_name, plan, timings, wall_time)
+    return summary
+
+
 def generate_load_report(page_name, page_url, graph_prefix):
     """
     Generate enhanced concurrent load report for a page
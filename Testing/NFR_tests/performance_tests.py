@@ -8,15 +8,24 @@ from selenium.webdriver.support import expected_conditions as EC
 import time
 import statistics
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import matplotlib.pyplot as plt
 import numpy as np
 import json
 from pathlib import Path
 
+import browser_metrics
+import distributed
+import header_audit
+import load_engine
+import network_analysis
+import report_html
+import waits
+from histogram import LatencyHistogram
+from result_sink import ResultSink
+
 
 def test_load_time_single_load(driver, base_url, max_load_time=3):
-    """Test if page loads within acceptable time"""
+    """Test if page loads within acceptable time (browser-measured load event)"""
     print("\n=== PERFORMANCE TEST: Page Load Time ===")
     try:
         start_time = time.time()
@@ -24,10 +33,14 @@ def test_load_time_single_load(driver, base_url, max_load_time=3):
         
         WebDriverWait(driver, 10).until(EC.url_to_be(base_url))
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            
-        load_time = time.time() - start_time
         
-        print(f"Page Load Time: {load_time:.2f} seconds")
+        wall_time = time.time() - start_time
+        metrics = browser_metrics.collect_page_metrics(driver)
+        load_time = metrics['load'] / 1000 if metrics['load'] else wall_time
+        
+        print(f"Page Load Time: {load_time:.2f} seconds (WebDriver wall time {wall_time:.2f}s)")
+        print(f"TTFB: {metrics['ttfb']:.0f} ms, FCP: {metrics['fcp'] or 0:.0f} ms, "
+              f"LCP: {metrics['lcp'] or 0:.0f} ms, CLS: {metrics['cls']:.3f}")
         
         if load_time < max_load_time:
             print("✓ PASS: Page loads within acceptable time")
@@ -40,10 +53,14 @@ def test_load_time_single_load(driver, base_url, max_load_time=3):
         return False
 
 
-def test_response_time_multiple_loads(driver, base_url, num_loads=5, max_avg_time=3):
-    """Test average response time over multiple page loads"""
+def test_response_time_multiple_loads(driver, base_url, num_loads=5, max_avg_time=3, report_dir=None, prefix="page"):
+    """
+    Test average load time over multiple page loads. Browser metrics of every
+    load are aggregated into percentiles and, with report_dir, written out.
+    """
     print("\n=== PERFORMANCE TEST: Average Response Time ===")
     load_times = []
+    samples = []
     
     try:
         for i in range(num_loads):
@@ -52,16 +69,25 @@ def test_response_time_multiple_loads(driver, base_url, num_loads=5, max_avg_tim
             WebDriverWait(driver, 10).until(EC.url_to_be(base_url))
             WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             
-            load_time = time.time() - start_time
+            wall_time = time.time() - start_time
+            metrics = browser_metrics.collect_page_metrics(driver)
+            samples.append(metrics)
+            load_time = metrics['load'] / 1000 if metrics['load'] else wall_time
             load_times.append(load_time)
-            print(f"Load {i+1}: {load_time:.2f}s")
-            time.sleep(1)
+            print(f"Load {i+1}: {load_time:.2f}s (LCP {metrics['lcp'] or 0:.0f} ms)")
+            # Let late requests finish so they do not overlap the next load
+            waits.wait_for_network_idle(driver)
         
         avg_time = statistics.mean(load_times)
-        std_dev = statistics.stdev(load_times)
+        std_dev = statistics.stdev(load_times) if len(load_times) > 1 else 0
         
         print(f"\nAverage Load Time: {avg_time:.2f}s")
         print(f"Standard Deviation: {std_dev:.2f}s")
+        print("Browser metrics:")
+        browser_metrics.print_metrics(browser_metrics.aggregate_metrics(samples))
+        if report_dir is not None:
+            summary_file, _ = browser_metrics.write_metrics_report(base_url, samples, Path(report_dir), prefix)
+            print(f"Browser metrics saved to: {summary_file}")
         
         if avg_time < max_avg_time:
             print("✓ PASS: Average load time acceptable")
@@ -74,33 +100,79 @@ def test_response_time_multiple_loads(driver, base_url, num_loads=5, max_avg_tim
         return False
 
 
+def test_network_waterfall(driver, base_url, max_page_weight_kb=5000, report_dir=None, prefix="page"):
+    """
+    Capture the network waterfall of a cold load and a repeat visit from
+    Chrome's performance log. Needs a driver created with performance_log=True.
+    """
+    print("\n=== PERFORMANCE TEST: Network Waterfall ===")
+    try:
+        analysis = network_analysis.analyze_page(driver, base_url)
+        cold = analysis['cold']['summary']
+        repeat = analysis['repeat']['summary']
+        page_weight_kb = cold['transferred_bytes'] / 1024
+
+        print(f"Cold load: {cold['requests']} requests, {page_weight_kb:.1f} KB transferred")
+        for resource_type, entry in cold['by_type'].items():
+            print(f"  {resource_type:<16} {entry['requests']:>4} requests  {entry['transferred_bytes'] / 1024:>8.1f} KB")
+        print(f"Render-blocking resources: {len(cold['render_blocking'])}")
+        if cold['slowest']:
+            slowest = cold['slowest'][0]
+            print(f"Slowest resource: {slowest['url']} ({slowest['duration_ms']:.0f} ms)")
+        print(f"Repeat visit: {repeat['transferred_bytes'] / 1024:.1f} KB transferred, "
+              f"cache hit ratio {repeat['cache_hit_ratio'] * 100:.1f}%")
+        if report_dir is not None:
+            summary_file, _ = network_analysis.write_waterfall_report(analysis, Path(report_dir), prefix)
+            print(f"Network analysis saved to: {summary_file}")
+
+        if page_weight_kb <= max_page_weight_kb:
+            print("✓ PASS: Page weight within budget")
+            return True
+        else:
+            print(f"✗ FAIL: Page weight exceeds {max_page_weight_kb} KB")
+            return False
+    except Exception as e:
+        print(f"✗ FAIL: {str(e)}")
+        return False
+
+
+def test_performance_headers(base_url, min_score=70, report_dir=None, prefix="page"):
+    """
+    Audit caching, compression, protocol and Server-Timing headers of the page
+    and the assets it links. Passes when the average score reaches min_score.
+    """
+    print("\n=== PERFORMANCE TEST: Performance Headers ===")
+    try:
+        audits = header_audit.run_header_audit([base_url])
+        for audit in audits:
+            failed = [c['check'] for c in audit['checks'] if c['passed'] is False]
+            marker = "✓" if audit['score'] >= min_score else "✗"
+            print(f"  {marker} {audit['score']:5.1f}  {audit['url']}" + (f"  (failed: {', '.join(failed)})" if failed else ""))
+        if report_dir is not None:
+            report = header_audit.write_audit_report(audits, Path(report_dir), f"{prefix}_headers")
+            print(f"Header audit saved to: {report['metadata']['summary']}")
+
+        average_score = sum(a['score'] for a in audits) / len(audits)
+        print(f"\nAverage score: {average_score:.1f}")
+        if average_score >= min_score:
+            print("✓ PASS: Performance headers acceptable")
+            return True
+        else:
+            print(f"✗ FAIL: Average header score below {min_score}")
+            return False
+    except Exception as e:
+        print(f"✗ FAIL: {str(e)}")
+        return False
+
+
 def test_concurrent_load_server_side(base_url, concurrent_users=10, success_rate_threshold=90, max_response_time=5):
     """Test concurrent load using HTTP requests"""
     print("\n=== PERFORMANCE TEST: Concurrent Load (Server-Side) ===")
     
-    def fetch_page():
-        start_time = time.time()
-        try:
-            response = requests.get(base_url, timeout=10)
-            load_time = time.time() - start_time
-            return {
-                'success': response.status_code == 200,
-                'time': load_time,
-                'status': response.status_code
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'time': time.time() - start_time,
-                'error': str(e)
-            }
-    
     try:
         print(f"Simulating {concurrent_users} concurrent users...")
         
-        with ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-            futures = [executor.submit(fetch_page) for _ in range(concurrent_users)]
-            results = [future.result() for future in as_completed(futures)]
+        results = load_engine.run_concurrent_requests(base_url, concurrent_users)
         
         successful_requests = sum(1 for r in results if r['success'])
         response_times = [r['time'] for r in results if r['success']]
@@ -146,19 +218,33 @@ def _fetch_page(base_url):
         }
 
 
-def _test_concurrent_load(base_url, num_users):
-    """Helper function to test concurrent load for a specific user count"""
+def _test_concurrent_load(base_url, num_users, sink=None, connection_mode='shared', requests_per_user=1):
+    """
+    Helper function to test concurrent load for a specific user count.
+    With a ResultSink, results are streamed to it and summarized from its
+    histograms instead of keeping every response time in the result dict.
+    """
     print(f"\nTesting {num_users} concurrent users...")
-    start_time = time.time()
+    start_time = time.perf_counter()
     
-    with ThreadPoolExecutor(max_workers=num_users) as executor:
-        futures = [executor.submit(_fetch_page, base_url) for _ in range(num_users)]
-        results = [future.result() for future in as_completed(futures)]
+    results = load_engine.run_concurrent_requests(
+        base_url, num_users, connection_mode=connection_mode, requests_per_user=requests_per_user
+    )
     
-    total_time = time.time() - start_time
+    total_time = time.perf_counter() - start_time
+    if sink is None:
+        return _summarize_load(results, num_users, total_time)
     
+    for result in results:
+        sink.record(result, group=num_users)
+    summary = sink.groups[num_users].result(duration=total_time)
+    return {'users': num_users, **summary}
+
+
+def _summarize_load(results, num_users, total_time):
+    """Aggregate per-request results into the dict the report functions consume"""
     successful_requests = sum(1 for r in results if r['success'])
-    failed_requests = num_users - successful_requests
+    failed_requests = len(results) - successful_requests
     response_times = [r['time'] for r in results if r['success']]
     errors = [r.get('error', 'Unknown') for r in results if not r['success']]
     
@@ -175,7 +261,7 @@ def _test_concurrent_load(base_url, num_users):
         median_response_time = p95_response_time = p99_response_time = 0
         std_dev = 0
     
-    success_rate = (successful_requests / num_users) * 100
+    success_rate = (successful_requests / len(results)) * 100 if results else 0
     throughput = successful_requests / total_time if total_time > 0 else 0
     
     return {
@@ -192,8 +278,10 @@ def _test_concurrent_load(base_url, num_users):
         'std_dev': std_dev,
         'total_time': total_time,
         'throughput': throughput,
+        'completions_per_second': load_engine.per_second_series(load_engine.completion_counts(results)),
         'response_times': response_times,
-        'errors': errors
+        'errors': errors,
+        'phases': load_engine.summarize_phases(load_engine.phase_histograms(results))
     }
 
 
@@ -249,6 +337,29 @@ def _create_graphs(results, base_url, report_dir, prefix):
     plt.close()
     graph_files.append(str(file3))
     
+    # Graph 4: Median latency phases vs Users
+    phase_results = [r for r in results if r.get('phases')]
+    if phase_results:
+        plt.figure(figsize=(10, 6))
+        positions = range(len(phase_results))
+        bottom = [0] * len(phase_results)
+        for phase in load_engine.PHASES:
+            values = [r['phases'][phase]['median'] for r in phase_results]
+            plt.bar(positions, values, bottom=bottom, label=phase)
+            bottom = [b + v for b, v in zip(bottom, values)]
+        plt.xticks(list(positions), [r['users'] for r in phase_results])
+        plt.xlabel('Number of Concurrent Users')
+        plt.ylabel('Median Time per Phase (seconds)')
+        plt.title(f'Latency Phases vs Concurrent Users\n{base_url}')
+        plt.legend()
+        plt.grid(True, axis='y')
+        
+        file4 = report_dir / f"{prefix}_latency_phases.png"
+        plt.tight_layout()
+        plt.savefig(file4)
+        plt.close()
+        graph_files.append(str(file4))
+    
     return graph_files
 
 
@@ -332,6 +443,19 @@ def _create_readable_summary(results, insights, report_dir, prefix):
             f.write(f"{result['users']:<10} {result['success_rate']:<12.1f} "
                    f"{result['avg_response_time']:<15.3f} {result['median_response_time']:<12.3f} "
                    f"{result['p95_response_time']:<10.3f} {result['throughput']:<12.1f}\n")
+        
+        phase_results = [r for r in results if r.get('phases')]
+        if phase_results:
+            f.write("\n\n" + "=" * 80 + "\n")
+            f.write("LATENCY PHASES (P50 / P95 seconds)\n")
+            f.write("=" * 80 + "\n\n")
+            f.write(f"{'Users':<10}" + "".join(f"{phase:<12}" for phase in load_engine.PHASES) + "\n")
+            f.write("-" * 80 + "\n")
+            for result in phase_results:
+                f.write(f"{result['users']:<10}" + "".join(
+                    f"{result['phases'][phase]['median']:.3f}/{result['phases'][phase]['p95']:.3f}".ljust(12)
+                    for phase in load_engine.PHASES
+                ) + "\n")
     
     return str(summary_file)
 
@@ -341,9 +465,23 @@ def generate_concurrent_load_report(
     output_dir="load_reports",
     user_counts=[1, 2, 5, 10, 20, 50, 70, 90, 100],
     graph_prefix=None,
-    folder_name=None
+    folder_name=None,
+    stream_results=False,
+    workers=None,
+    hosts=None
 ):
-    """Generate comprehensive concurrent load testing report"""
+    """
+    Generate comprehensive concurrent load testing report.
+    With stream_results, per-request results go to a
+    {prefix}_results.bin stream and the JSON keeps histograms instead of
+    raw response times. With workers and/or hosts, each step is sharded
+    across that many local processes and remote workers (see distributed.py).
+    Distributed steps only return merged histograms, so they cannot be
+    combined with stream_results.
+    """
+    distributed_run = workers is not None or bool(hosts)
+    if stream_results and distributed_run:
+        raise ValueError("stream_results needs per-request results; it cannot be used with workers or hosts")
     
     # Setup report directory
     report_name = folder_name or graph_prefix or "load_test"
@@ -360,19 +498,33 @@ def generate_concurrent_load_report(
     print(f"Output folder: {report_dir}")
     
     # Run tests
+    stream_file = report_dir / f"{prefix}_results.bin"
+    sink = ResultSink(stream_file) if stream_results else None
     results = []
-    for users in user_counts:
-        result = _test_concurrent_load(base_url, users)
-        results.append(result)
-        print(f"  Success Rate: {result['success_rate']:.1f}% ({result['successful']}/{users})")
-        print(f"  Throughput: {result['throughput']:.1f} req/s")
-        print(f"  Avg Response Time: {result['avg_response_time']:.3f}s")
-        if result['errors']:
-            unique_errors = list(set(result['errors']))
-            print(f"  Errors: {len(result['errors'])} total, types: {unique_errors}")
+    try:
+        for users in user_counts:
+            if distributed_run:
+                result = distributed.run_distributed_load(base_url, users, processes=workers, hosts=hosts)
+            else:
+                result = _test_concurrent_load(base_url, users, sink)
+            results.append(result)
+            print(f"  Success Rate: {result['success_rate']:.1f}% ({result['successful']}/{users})")
+            print(f"  Throughput: {result['throughput']:.1f} req/s")
+            print(f"  Avg Response Time: {result['avg_response_time']:.3f}s")
+            if result['errors']:
+                unique_errors = list(set(result['errors']))
+                print(f"  Errors: {result['failed']} total, types: {unique_errors}")
+    finally:
+        if sink:
+            sink.close()
     
     # Generate outputs
     graph_files = _create_graphs(results, base_url, report_dir, prefix)
+    html_file = None
+    if sink and sink.groups:
+        html_file = report_html.generate_html_report(
+            stream_file, report_dir / f"{prefix}_report.html", f"Concurrent Load Report - {base_url}"
+        )
     insights = _generate_insights(results, user_counts)
     summary_file = _create_readable_summary(results, insights, report_dir, prefix)
     
@@ -383,7 +535,11 @@ def generate_concurrent_load_report(
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'user_counts': user_counts,
             'report_folder': str(report_dir),
-            'test_name': report_name
+            'test_name': report_name,
+            'results_stream': str(stream_file) if stream_results else None,
+            'html_report': html_file,
+            'workers': workers,
+            'hosts': hosts or []
         },
         'results': results,
         'insights': insights,
@@ -398,5 +554,392 @@ def generate_concurrent_load_report(
     print(f"Summary: {summary_file}")
     print(f"JSON: {json_file}")
     print(f"Graphs: {len(graph_files)} files")
+    if html_file:
+        print(f"Interactive report: {html_file}")
+    
+    return json_summary
+
+
+def _test_open_loop_load(base_url, stages):
+    """Helper function to run an open-loop arrival schedule, aggregated per stage"""
+    latencies = [LatencyHistogram() for _ in stages]
+    service_times = [LatencyHistogram() for _ in stages]
+    counters = [{'requests': 0, 'successful': 0, 'errors': {}, 'completions': {}} for _ in stages]
+    
+    def on_result(result):
+        stage = result['stage']
+        counters[stage]['requests'] += 1
+        if result['success']:
+            counters[stage]['successful'] += 1
+            latencies[stage].record(result['time'])
+            service_times[stage].record(result['service_time'])
+            for second, count in load_engine.completion_counts([result]).items():
+                counters[stage]['completions'][second] = counters[stage]['completions'].get(second, 0) + count
+        else:
+            error = result.get('error', f"HTTP {result.get('status', 'Unknown')}")
+            counters[stage]['errors'][error] = counters[stage]['errors'].get(error, 0) + 1
+    
+    start_time = time.perf_counter()
+    load_engine.run_open_loop(base_url, stages, on_result)
+    total_time = time.perf_counter() - start_time
+    
+    results = []
+    for index, (duration, start_rps, end_rps) in enumerate(stages):
+        counter = counters[index]
+        latency = latencies[index]
+        service = service_times[index]
+        results.append({
+            'stage': index,
+            'duration': duration,
+            'target_rps': (start_rps + end_rps) / 2,
+            'requests': counter['requests'],
+            'successful': counter['successful'],
+            'failed': counter['requests'] - counter['successful'],
+            'success_rate': counter['successful'] / counter['requests'] * 100 if counter['requests'] else 0,
+            'throughput': counter['successful'] / duration if duration > 0 else 0,
+            'completions_per_second': load_engine.per_second_series(counter['completions']),
+            **latency.summary(),
+            'service_p99_response_time': service.percentile(99),
+            'histogram': latency.to_dict(),
+            'errors': counter['errors']
+        })
+    
+    return results, total_time
+
+
+def test_open_loop_load(base_url, stages=None, success_rate_threshold=90, max_p99_time=5):
+    """Test latency under a fixed arrival rate (open loop, coordinated-omission corrected)"""
+    print("\n=== PERFORMANCE TEST: Open-Loop Constant Arrival Rate ===")
+    stages = stages or load_engine.constant_rate(rps=10, duration=30)
+    
+    try:
+        results, total_time = _test_open_loop_load(base_url, stages)
+        
+        overall = LatencyHistogram()
+        for result in results:
+            overall.merge(LatencyHistogram.from_dict(result['histogram']))
+        requests_sent = sum(r['requests'] for r in results)
+        successful_requests = sum(r['successful'] for r in results)
+        success_rate = successful_requests / requests_sent * 100 if requests_sent else 0
+        p99_time = overall.percentile(99)
+        
+        print(f"Requests: {successful_requests}/{requests_sent} successful in {total_time:.1f}s")
+        print(f"P50 / P99 (from intended start): {overall.percentile(50):.3f}s / {p99_time:.3f}s")
+        
+        if success_rate >= success_rate_threshold and p99_time <= max_p99_time:
+            print("✓ PASS: Server keeps up with target arrival rate")
+            return True
+        else:
+            print("✗ FAIL: Server falls behind target arrival rate")
+            return False
+    except Exception as e:
+        print(f"✗ FAIL: {str(e)}")
+        return False
+
+
+def _create_open_loop_graph(results, base_url, report_dir, prefix):
+    """Plot corrected and service-time latency per stage against target rate"""
+    stages = [r['stage'] for r in results]
+    labels = [f"{r['target_rps']:.0f}" for r in results]
+    
+    plt.figure(figsize=(10, 6))
+    plt.plot(stages, [r['median_response_time'] for r in results], 'o-', label='P50 (intended start)')
+    plt.plot(stages, [r['p99_response_time'] for r in results], 'o-', color='red', label='P99 (intended start)')
+    plt.plot(stages, [r['service_p99_response_time'] for r in results], 'o--', color='gray', label='P99 (service time)')
+    plt.xticks(stages, labels)
+    plt.xlabel('Target Rate per Stage (requests/second)')
+    plt.ylabel('Response Time (seconds)')
+    plt.title(f'Open-Loop Latency vs Arrival Rate\n{base_url}')
+    plt.legend()
+    plt.grid(True)
+    
+    graph_file = report_dir / f"{prefix}_open_loop_latency.png"
+    plt.tight_layout()
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def generate_open_loop_report(
+    base_url,
+    stages,
+    output_dir="load_reports",
+    graph_prefix=None,
+    folder_name=None
+):
+    """Generate an open-loop (arrival-rate driven) load testing report"""
+    report_name = folder_name or graph_prefix or "open_loop"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "open_loop"
+    
+    print("=" * 80)
+    print("OPEN-LOOP LOAD TESTING REPORT")
+    print("=" * 80)
+    print(f"Target URL: {base_url}")
+    print(f"Output folder: {report_dir}")
+    
+    results, total_time = _test_open_loop_load(base_url, stages)
+    for result in results:
+        print(f"\nStage {result['stage']}: target {result['target_rps']:.1f} req/s for {result['duration']}s")
+        print(f"  Success Rate: {result['success_rate']:.1f}% ({result['successful']}/{result['requests']})")
+        print(f"  Throughput: {result['throughput']:.1f} req/s")
+        print(f"  P99 (intended start / service): {result['p99_response_time']:.3f}s / {result['service_p99_response_time']:.3f}s")
+        if result['errors']:
+            print(f"  Errors: {result['errors']}")
+    
+    graph_file = _create_open_loop_graph(results, base_url, report_dir, prefix)
+    
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("OPEN-LOOP LOAD TESTING REPORT\n")
+        f.write("=" * 80 + "\n\n")
+        f.write("Latency is measured from each request's intended start time.\n")
+        f.write("Service P99 excludes client-side queueing and is shown for comparison.\n\n")
+        f.write(f"{'Stage':<8} {'Target RPS':<12} {'Success%':<10} {'Throughput':<12} {'P50(s)':<10} {'P99(s)':<10} {'Service P99(s)':<15}\n")
+        f.write("-" * 80 + "\n")
+        for result in results:
+            f.write(f"{result['stage']:<8} {result['target_rps']:<12.1f} {result['success_rate']:<10.1f} "
+                   f"{result['throughput']:<12.1f} {result['median_response_time']:<10.3f} "
+                   f"{result['p99_response_time']:<10.3f} {result['service_p99_response_time']:<15.3f}\n")
+    
+    json_summary = {
+        'metadata': {
+            'url': base_url,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'mode': 'open_loop',
+            'stages': [list(stage) for stage in stages],
+            'total_time': total_time,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'results': results,
+        'graphs': [graph_file]
+    }
+    
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+    
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    
+    return json_summary
+
+
+def _create_soak_graphs(windows, base_url, report_dir, prefix):
+    """Plot latency percentiles and throughput per time window"""
+    minutes = [(w['window_start'] - windows[0]['window_start']) / 60 for w in windows]
+    
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+    ax1.plot(minutes, [w['median_response_time'] for w in windows], label='P50')
+    ax1.plot(minutes, [w['p99_response_time'] for w in windows], color='red', label='P99')
+    ax1.set_ylabel('Response Time (seconds)')
+    ax1.set_title(f'Soak Test Latency and Throughput\n{base_url}')
+    ax1.legend()
+    ax1.grid(True)
+    ax2.plot(minutes, [w['throughput'] for w in windows], color='green')
+    ax2.set_xlabel('Elapsed Time (minutes)')
+    ax2.set_ylabel('Throughput (requests/second)')
+    ax2.grid(True)
+    
+    graph_file = report_dir / f"{prefix}_soak.png"
+    plt.tight_layout()
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def run_soak_test(
+    base_url,
+    rps=10,
+    duration=3600,
+    window=60,
+    output_dir="load_reports",
+    graph_prefix=None,
+    folder_name=None
+):
+    """
+    Long-running constant-rate soak test. Results are streamed to disk and
+    summarized per time window, so memory use does not grow with duration.
+    """
+    report_name = folder_name or graph_prefix or "soak_test"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "soak_test"
+    stream_file = report_dir / f"{prefix}_results.bin"
+    
+    print("=" * 80)
+    print("SOAK TESTING REPORT")
+    print("=" * 80)
+    print(f"Target URL: {base_url}")
+    print(f"Rate: {rps} req/s for {duration}s")
+    print(f"Results stream: {stream_file}")
+    
+    with ResultSink(stream_file, window=window) as sink:
+        load_engine.run_open_loop(
+            base_url,
+            load_engine.constant_rate(rps, duration),
+            lambda result: sink.record(result, group=result['stage'])
+        )
+        overall = sink.groups[0].result(duration=duration) if sink.groups else {}
+        windows = sink.window_results()
+    
+    graph_file = _create_soak_graphs(windows, base_url, report_dir, prefix) if windows else None
+    html_file = report_html.generate_html_report(
+        stream_file, report_dir / f"{prefix}_report.html", f"Soak Test Report - {base_url}"
+    ) if windows else None
+    
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("SOAK TESTING REPORT\n")
+        f.write("=" * 80 + "\n\n")
+        if overall:
+            f.write(f"Requests: {overall['successful']}/{overall['requests']} successful "
+                    f"({overall['success_rate']:.1f}%)\n")
+            f.write(f"P50 / P95 / P99: {overall['median_response_time']:.3f}s / "
+                    f"{overall['p95_response_time']:.3f}s / {overall['p99_response_time']:.3f}s\n\n")
+        f.write(f"{'Minute':<10} {'Requests':<10} {'Success%':<10} {'Throughput':<12} {'P50(s)':<10} {'P99(s)':<10}\n")
+        f.write("-" * 80 + "\n")
+        for w in windows:
+            minute = (w['window_start'] - windows[0]['window_start']) / 60
+            f.write(f"{minute:<10.1f} {w['requests']:<10} {w['success_rate']:<10.1f} "
+                    f"{w['throughput']:<12.1f} {w['median_response_time']:<10.3f} {w['p99_response_time']:<10.3f}\n")
+    
+    json_summary = {
+        'metadata': {
+            'url': base_url,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'mode': 'soak',
+            'rps': rps,
+            'duration': duration,
+            'window': window,
+            'report_folder': str(report_dir),
+            'test_name': report_name,
+            'results_stream': str(stream_file),
+            'html_report': html_file
+        },
+        'overall': overall,
+        'windows': windows,
+        'graphs': [graph_file] if graph_file else []
+    }
+    
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+    
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    if html_file:
+        print(f"Interactive report: {html_file}")
+    
+    return json_summary
+
+
+def _create_connection_reuse_graph(comparison, base_url, report_dir, prefix):
+    """Plot average and P95 response time for keep-alive and fresh connections"""
+    users = [row['users'] for row in comparison]
+    
+    plt.figure(figsize=(10, 6))
+    plt.plot(users, [row['keep_alive']['avg_response_time'] for row in comparison], 'o-', label='Keep-alive avg')
+    plt.plot(users, [row['keep_alive']['p95_response_time'] for row in comparison], 'o--', label='Keep-alive P95')
+    plt.plot(users, [row['fresh']['avg_response_time'] for row in comparison], 's-', color='red', label='Fresh avg')
+    plt.plot(users, [row['fresh']['p95_response_time'] for row in comparison], 's--', color='red', label='Fresh P95')
+    plt.xlabel('Number of Concurrent Users')
+    plt.ylabel('Response Time (seconds)')
+    plt.title(f'Keep-Alive vs Fresh Connections\n{base_url}')
+    plt.legend()
+    plt.grid(True)
+    
+    graph_file = report_dir / f"{prefix}_connection_reuse.png"
+    plt.tight_layout()
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def generate_connection_reuse_report(
+    base_url,
+    output_dir="load_reports",
+    user_counts=[1, 10, 50],
+    requests_per_user=5,
+    graph_prefix=None,
+    folder_name=None
+):
+    """
+    Run the same load with per-user keep-alive sessions and with a fresh
+    connection per request, and report the connection-setup overhead.
+    """
+    report_name = folder_name or graph_prefix or "connection_reuse"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "connection_reuse"
+    
+    print("=" * 80)
+    print("KEEP-ALIVE VS FRESH CONNECTION REPORT")
+    print("=" * 80)
+    print(f"Target URL: {base_url}")
+    print(f"{requests_per_user} requests per user")
+    
+    comparison = []
+    for users in user_counts:
+        keep_alive = _test_concurrent_load(base_url, users, connection_mode='per_user', requests_per_user=requests_per_user)
+        fresh = _test_concurrent_load(base_url, users, connection_mode='fresh', requests_per_user=requests_per_user)
+        for result in (keep_alive, fresh):
+            result.pop('response_times', None)
+        overhead = fresh['avg_response_time'] - keep_alive['avg_response_time']
+        comparison.append({
+            'users': users,
+            'keep_alive': keep_alive,
+            'fresh': fresh,
+            'setup_overhead': overhead,
+            'setup_overhead_pct': overhead / keep_alive['avg_response_time'] * 100 if keep_alive['avg_response_time'] else 0,
+            'fresh_connect_median': fresh['phases']['connect']['median'] + fresh['phases']['dns']['median']
+        })
+        print(f"  Keep-alive avg: {keep_alive['avg_response_time']:.3f}s  Fresh avg: {fresh['avg_response_time']:.3f}s  "
+              f"Overhead: {overhead * 1000:.1f}ms")
+    
+    graph_file = _create_connection_reuse_graph(comparison, base_url, report_dir, prefix)
+    
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("KEEP-ALIVE VS FRESH CONNECTION REPORT\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Each virtual user sends {requests_per_user} sequential requests.\n")
+        f.write("Keep-alive: one persistent session per user. Fresh: new TCP+TLS connection per request.\n\n")
+        f.write(f"{'Users':<8} {'KA Avg(s)':<11} {'KA P95(s)':<11} {'Fresh Avg(s)':<14} {'Fresh P95(s)':<14} "
+                f"{'Overhead(ms)':<14} {'Overhead%':<10}\n")
+        f.write("-" * 80 + "\n")
+        for row in comparison:
+            f.write(f"{row['users']:<8} {row['keep_alive']['avg_response_time']:<11.3f} "
+                    f"{row['keep_alive']['p95_response_time']:<11.3f} {row['fresh']['avg_response_time']:<14.3f} "
+                    f"{row['fresh']['p95_response_time']:<14.3f} {row['setup_overhead'] * 1000:<14.1f} "
+                    f"{row['setup_overhead_pct']:<10.1f}\n")
+    
+    json_summary = {
+        'metadata': {
+            'url': base_url,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'user_counts': user_counts,
+            'requests_per_user': requests_per_user,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'results': comparison,
+        'graphs': [graph_file]
+    }
+    
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+    
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
     
-    return json_summary
\ No newline at end of file
+    return json_summary
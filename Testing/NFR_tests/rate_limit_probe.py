@@ -0,0 +1,396 @@
+"""
+Rate-limit discovery probe.
+
+Ramps the request rate against one endpoint in open-loop steps (asyncio +
+aiohttp, like load_engine) until 429s appear or latency bends upwards, then
+runs two follow-up phases against the limiter:
+
+  burst    - after a cooldown, fire a batch at once; how many get through
+             before the first 429 is the bucket / window size
+  sustain  - keep offering more than the limit; the accepted rate is the
+             refill rate, and clustered acceptances reveal a fixed window
+
+Standard rate-limit headers (RateLimit-*, X-RateLimit-*, Retry-After) are
+parsed on every response and reported next to the measured values.
+
+Usage:
+    python rate_limit_probe.py http://localhost:3000/api/v1/story/publicstories \
+        [--rates 1 2 5 10 20 50] [--step-duration 5] [--output-dir load_reports]
+"""
+import argparse
+import asyncio
+import email.utils
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+import aiohttp
+import matplotlib.pyplot as plt
+
+import load_engine
+
+
+DEFAULT_RATES = (1, 2, 5, 10, 20, 50, 100, 200)
+
+RATE_LIMIT_HEADERS = (
+    'ratelimit', 'ratelimit-policy', 'ratelimit-limit', 'ratelimit-remaining', 'ratelimit-reset',
+    'x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset', 'retry-after'
+)
+
+# Stop ramping once this share of a step is rejected or fails
+STOP_RATIO = 0.5
+# A step's median latency this many times the first step's marks a knee
+KNEE_FACTOR = 2.0
+MAX_COOLDOWN = 120
+
+
+async def _probe_request(session, url, timeout, origin):
+    sent = time.perf_counter()
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            await response.read()
+            return {
+                'offset': sent - origin,
+                'status': response.status,
+                'time': time.perf_counter() - sent,
+                'headers': {
+                    name.lower(): value for name, value in response.headers.items()
+                    if name.lower() in RATE_LIMIT_HEADERS
+                }
+            }
+    except asyncio.TimeoutError:
+        return {'offset': sent - origin, 'status': 'timeout', 'time': time.perf_counter() - sent, 'headers': {}}
+    except Exception as e:
+        return {'offset': sent - origin, 'status': 'error', 'time': time.perf_counter() - sent,
+                'headers': {}, 'error': str(e) or type(e).__name__}
+
+
+async def _fire_at_rate(session, url, rps, duration, timeout):
+    """Open-loop: requests start on schedule whether or not earlier ones finished"""
+    origin = time.perf_counter()
+    tasks = []
+    for offset, _ in load_engine.arrival_offsets(load_engine.constant_rate(rps, duration)):
+        delay = origin + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_probe_request(session, url, timeout, origin)))
+    return list(await asyncio.gather(*tasks))
+
+
+async def _fire_burst(session, url, count, timeout):
+    origin = time.perf_counter()
+    return list(await asyncio.gather(*(_probe_request(session, url, timeout, origin) for _ in range(count))))
+
+
+def _accepted(result):
+    return isinstance(result['status'], int) and result['status'] < 400
+
+
+def _summarize_step(rps, duration, results):
+    accepted = [r for r in results if _accepted(r)]
+    limited = sum(1 for r in results if r['status'] == 429)
+    failed = len(results) - len(accepted) - limited
+    latencies = [r['time'] for r in accepted]
+    return {
+        'offered_rps': rps,
+        'requests': len(results),
+        'accepted': len(accepted),
+        'limited': limited,
+        'failed': failed,
+        'limited_ratio': limited / len(results) if results else 0,
+        'failed_ratio': failed / len(results) if results else 0,
+        'accepted_rps': len(accepted) / duration,
+        'limited_rps': limited / duration,
+        'median_latency': statistics.median(latencies) if latencies else None,
+        'p95_latency': statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else None
+    }
+
+
+# --- Header parsing ---
+
+def _first_int(value):
+    match = re.search(r'\d+', value or '')
+    return int(match.group()) if match else None
+
+
+def _seconds_until(value):
+    """Delta-seconds, epoch seconds or an HTTP date, as seconds from now"""
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = int(value)
+        return max(seconds - time.time(), 0) if seconds > 1e9 else seconds
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_headers(results):
+    """Limiter settings advertised by the server across all responses"""
+    info = {'limit': None, 'window': None, 'max_reset': None, 'retry_after': None}
+    for result in results:
+        headers = result['headers']
+        for name in ('ratelimit-policy', 'ratelimit-limit', 'x-ratelimit-limit'):
+            if name in headers:
+                info['limit'] = info['limit'] or _first_int(headers[name])
+                window = re.search(r'w=(\d+)', headers[name])
+                if window:
+                    info['window'] = int(window.group(1))
+        if 'ratelimit' in headers:
+            # Structured form: limit=100, remaining=50, reset=30
+            fields = dict(re.findall(r'(\w+)=(\d+)', headers['ratelimit']))
+            info['limit'] = info['limit'] or (int(fields['limit']) if 'limit' in fields else None)
+            if 'reset' in fields:
+                info['max_reset'] = max(info['max_reset'] or 0, int(fields['reset']))
+        for name in ('ratelimit-reset', 'x-ratelimit-reset'):
+            reset = _seconds_until(headers.get(name))
+            if reset is not None:
+                info['max_reset'] = max(info['max_reset'] or 0, reset)
+        retry_after = _seconds_until(headers.get('retry-after'))
+        if retry_after is not None:
+            info['retry_after'] = max(info['retry_after'] or 0, retry_after)
+    return info
+
+
+# --- Inference from the burst and sustain phases ---
+
+def _clusters(offsets, gap):
+    """Group sorted offsets into runs separated by more than `gap` seconds"""
+    clusters = []
+    for offset in offsets:
+        if clusters and offset - clusters[-1][-1] <= gap:
+            clusters[-1].append(offset)
+        else:
+            clusters.append([offset])
+    return clusters
+
+
+def infer_limiter(burst_results, sustain_results, sustain_rps, sustain_duration):
+    """Estimate burst size, refill rate, window and algorithm"""
+    burst_accepted = sum(1 for r in burst_results if _accepted(r))
+    accepted = sorted(r['offset'] for r in sustain_results if _accepted(r))
+    refill_rate = len(accepted) / sustain_duration
+
+    # Under a fixed window every acceptance lands in a run at a window start;
+    # a token bucket spreads them evenly at the refill rate.
+    clusters = _clusters(accepted, gap=max(5 / sustain_rps, 0.5))
+    if len(clusters) >= 2 and len(accepted) > len(clusters) * 2:
+        starts = [cluster[0] for cluster in clusters]
+        window = statistics.median(b - a for a, b in zip(starts, starts[1:]))
+        algorithm = 'fixed_window'
+        refill_rate = statistics.median(len(cluster) for cluster in clusters) / window
+    elif len(clusters) == 1 and len(accepted) > 1 and accepted[-1] - accepted[0] < sustain_duration / 4:
+        # One run and nothing after it: the window outlasts the sustain phase
+        window = None
+        algorithm = 'fixed_window'
+    else:
+        algorithm = 'token_bucket' if accepted else 'unknown'
+        window = burst_accepted / refill_rate if refill_rate > 0 else None
+
+    return {
+        'algorithm': algorithm,
+        'burst': burst_accepted,
+        'refill_rate': refill_rate,
+        'window': window
+    }
+
+
+async def _probe(url, rates, step_duration, cooldown, sustain_duration, timeout, connection_limit):
+    steps = []
+    all_results = []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connection_limit)) as session:
+        baseline_latency = None
+        onset_rps = knee_rps = None
+        for rps in rates:
+            print(f"Step {rps} req/s for {step_duration}s...")
+            results = await _fire_at_rate(session, url, rps, step_duration, timeout)
+            all_results.extend(results)
+            step = _summarize_step(rps, step_duration, results)
+            steps.append(step)
+            print(f"  accepted {step['accepted']}/{step['requests']}, 429s {step['limited']}, "
+                  f"failed {step['failed']}, median {(step['median_latency'] or 0) * 1000:.0f} ms")
+
+            if baseline_latency is None:
+                baseline_latency = step['median_latency']
+            if onset_rps is None and step['limited']:
+                onset_rps = rps
+            if (knee_rps is None and baseline_latency and step['median_latency']
+                    and step['median_latency'] > baseline_latency * KNEE_FACTOR):
+                knee_rps = rps
+            if step['limited_ratio'] >= STOP_RATIO or step['failed_ratio'] >= STOP_RATIO:
+                break
+            if step['limited']:
+                await asyncio.sleep(_cooldown(cooldown, results))
+
+        burst_results = sustain_results = []
+        sustain_rps = None
+        if onset_rps is not None:
+            await asyncio.sleep(_cooldown(cooldown, all_results))
+            largest_step = max(step['requests'] for step in steps)
+            burst_size = min(max(largest_step * 2, 20), 1000)
+            print(f"Burst of {burst_size} requests...")
+            burst_results = await _fire_burst(session, url, burst_size, timeout)
+
+            # The bucket is empty now; offer twice the onset rate and watch what gets through
+            sustain_rps = onset_rps * 2
+            print(f"Sustain {sustain_rps} req/s for {sustain_duration}s...")
+            sustain_results = await _fire_at_rate(session, url, sustain_rps, sustain_duration, timeout)
+            all_results.extend(burst_results + sustain_results)
+
+    return {
+        'steps': steps,
+        'onset_rps': onset_rps,
+        'knee_rps': knee_rps,
+        'max_clean_rps': max((s['offered_rps'] for s in steps if not s['limited'] and not s['failed']), default=None),
+        'headers': parse_rate_limit_headers(all_results),
+        'limiter': infer_limiter(burst_results, sustain_results, sustain_rps, sustain_duration)
+        if onset_rps is not None else None,
+        'sustain_rps': sustain_rps
+    }
+
+
+def _cooldown(cooldown, results):
+    """Wait long enough for the limiter to reset, trusting reset headers when present"""
+    info = parse_rate_limit_headers(results)
+    advertised = max(info['max_reset'] or 0, info['retry_after'] or 0)
+    return min(max(cooldown, advertised), MAX_COOLDOWN)
+
+
+def run_rate_limit_probe(
+    url,
+    rates=DEFAULT_RATES,
+    step_duration=5,
+    cooldown=5,
+    sustain_duration=30,
+    timeout=10,
+    connection_limit=load_engine.DEFAULT_CONNECTION_LIMIT
+):
+    """Run the ramp, burst and sustain phases and return the findings"""
+    return asyncio.run(_probe(url, rates, step_duration, cooldown, sustain_duration, timeout, connection_limit))
+
+
+def _create_probe_graph(probe, base_url, report_dir, prefix):
+    steps = probe['steps']
+    offered = [s['offered_rps'] for s in steps]
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 9), sharex=True)
+    ax1.plot(offered, [s['accepted_rps'] for s in steps], marker='o', linewidth=2, color='green', label='Accepted')
+    ax1.plot(offered, [s['limited_rps'] for s in steps], marker='s', linewidth=2, color='red', label='429 / s')
+    ax1.plot(offered, offered, linestyle='--', color='gray', label='Offered')
+    ax1.set_ylabel('Requests per second', fontsize=12)
+    ax1.set_title(f'Rate Limit Discovery\n{base_url}', fontsize=14, fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2.plot(offered, [(s['median_latency'] or 0) * 1000 for s in steps], marker='o', linewidth=2, label='Median')
+    ax2.plot(offered, [(s['p95_latency'] or 0) * 1000 for s in steps], marker='s', linewidth=2, label='P95')
+    for rps, label, color in ((probe['onset_rps'], 'First 429', 'red'), (probe['knee_rps'], 'Latency knee', 'orange')):
+        if rps is not None:
+            ax2.axvline(rps, linestyle=':', color=color, label=label)
+    ax2.set_xlabel('Offered rate (req/s)', fontsize=12)
+    ax2.set_ylabel('Latency (ms)', fontsize=12)
+    ax2.set_xscale('log')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    graph_file = report_dir / f"{prefix}_steps.png"
+    plt.savefig(graph_file, dpi=300, bbox_inches='tight')
+    plt.close()
+    return str(graph_file)
+
+
+def _create_probe_summary(probe, base_url, report_dir, prefix):
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("RATE LIMIT DISCOVERY\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Endpoint: {base_url}\n\n")
+        f.write(f"{'Offered':<10} {'Requests':<10} {'Accepted':<10} {'429':<8} {'Failed':<8} "
+                f"{'Median(ms)':<12} {'P95(ms)':<10}\n")
+        f.write("-" * 80 + "\n")
+        for s in probe['steps']:
+            f.write(f"{s['offered_rps']:<10} {s['requests']:<10} {s['accepted']:<10} {s['limited']:<8} "
+                    f"{s['failed']:<8} {(s['median_latency'] or 0) * 1000:<12.0f} {(s['p95_latency'] or 0) * 1000:<10.0f}\n")
+
+        f.write("\nFINDINGS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"First 429 at: {probe['onset_rps'] or 'not reached'} req/s\n")
+        f.write(f"Latency knee at: {probe['knee_rps'] or 'not reached'} req/s\n")
+        f.write(f"Highest clean rate: {probe['max_clean_rps']} req/s\n")
+        limiter = probe['limiter']
+        if limiter:
+            window = f"{limiter['window']:.1f}s" if limiter['window'] else "longer than the sustain phase"
+            f.write(f"Algorithm (inferred): {limiter['algorithm']}\n")
+            f.write(f"Burst size: {limiter['burst']} requests\n")
+            f.write(f"Refill rate: {limiter['refill_rate']:.2f} req/s (at {probe['sustain_rps']} req/s offered)\n")
+            f.write(f"Window: {window}\n")
+
+        headers = probe['headers']
+        f.write("\nADVERTISED BY HEADERS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Limit: {headers['limit']}\nWindow: {headers['window']}\n"
+                f"Max reset: {headers['max_reset']}\nRetry-After: {headers['retry_after']}\n")
+
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {'url': base_url, 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')},
+            **probe
+        }, f, indent=2, ensure_ascii=False)
+
+    return str(summary_file), str(json_file)
+
+
+def generate_rate_limit_report(
+    base_url,
+    output_dir="load_reports",
+    graph_prefix=None,
+    folder_name=None,
+    **probe_options
+):
+    """Run the probe and write summary, JSON and graph to {folder_name}_report"""
+    report_name = folder_name or graph_prefix or "rate_limit"
+    prefix = graph_prefix or report_name
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    probe = run_rate_limit_probe(base_url, **probe_options)
+    summary_file, json_file = _create_probe_summary(probe, base_url, report_dir, prefix)
+    graph_file = _create_probe_graph(probe, base_url, report_dir, prefix)
+    probe['metadata'] = {'report_folder': str(report_dir), 'summary': summary_file, 'json': json_file}
+    probe['graphs'] = [graph_file]
+    return probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discover the rate limiter configuration of an endpoint")
+    parser.add_argument('url')
+    parser.add_argument('--rates', type=float, nargs='+', default=list(DEFAULT_RATES))
+    parser.add_argument('--step-duration', type=float, default=5)
+    parser.add_argument('--cooldown', type=float, default=5)
+    parser.add_argument('--sustain-duration', type=float, default=30)
+    parser.add_argument('--output-dir', default="load_reports")
+    parser.add_argument('--prefix', default="rate_limit")
+    args = parser.parse_args()
+
+    report = generate_rate_limit_report(
+        args.url,
+        output_dir=args.output_dir,
+        graph_prefix=args.prefix,
+        rates=args.rates,
+        step_duration=args.step_duration,
+        cooldown=args.cooldown,
+        sustain_duration=args.sustain_duration
+    )
+    with open(report['metadata']['summary'], encoding='utf-8') as f:
+        print(f.read())
+
+
+if __name__ == "__main__":
+    main()
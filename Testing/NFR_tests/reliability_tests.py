@@ -1,7 +1,10 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+from selenium.common.exceptions import TimeoutException
+
+import load_engine
+import waits
 
 
 def test_empty_form_submission(driver, base_url):
@@ -15,9 +18,12 @@ def test_empty_form_submission(driver, base_url):
         
         # Try to submit without filling fields
         submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
+        # The browser's URL, not base_url: it may differ by a trailing slash
+        old_url = driver.current_url
+        waits.instrument(driver)
         submit_button.click()
         
-        time.sleep(1)
+        waits.wait_for_settled(driver, old_url=old_url)
         
         # Should still be on sign in page due to HTML5 validation
         current_url = driver.current_url
@@ -45,9 +51,11 @@ def test_invalid_email_format(driver, base_url):
         # Enter invalid email
         driver.find_element(By.ID, "email").send_keys("notanemail")
         driver.find_element(By.ID, "password").send_keys("password123")
+        old_url = driver.current_url
+        waits.instrument(driver)
         driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
         
-        time.sleep(1)
+        waits.wait_for_settled(driver, old_url=old_url)
         
         # Should still be on sign in page
         current_url = driver.current_url
@@ -66,34 +74,11 @@ def test_invalid_email_format(driver, base_url):
 def test_concurrent_user_simulation(base_url, concurrent_users=10):
     """Test concurrent user simulation using HTTP requests (no browser overhead)"""
     print("\n=== RELIABILITY TEST: Concurrent Users (HTTP-only) ===")
-    import requests
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
-    def fetch_page():
-        """Single HTTP request to the page"""
-        start_time = time.time()
-        try:
-            response = requests.get(base_url, timeout=10)
-            load_time = time.time() - start_time
-            return {
-                'success': response.status_code == 200,
-                'time': load_time,
-                'status': response.status_code
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'time': time.time() - start_time,
-                'error': str(e)
-            }
-    
     try:
         print(f"Simulating {concurrent_users} concurrent users via HTTP...")
         
         # Execute concurrent requests
-        with ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-            futures = [executor.submit(fetch_page) for _ in range(concurrent_users)]
-            results = [future.result() for future in as_completed(futures)]
+        results = load_engine.run_concurrent_requests(base_url, concurrent_users)
         
         # Analyze results
         successful_requests = sum(1 for r in results if r['success'])
@@ -124,19 +109,20 @@ def test_browser_back_button(driver, base_url):
         
         WebDriverWait(driver, 10).until(EC.url_to_be(base_url))
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        start_url = driver.current_url
         
         # Navigate away then back
         driver.get("https://quest-ai-frontend.vercel.app/")
-        time.sleep(2)
+        waits.wait_for_page_ready(driver)
         driver.back()
-        time.sleep(2)
+        waits.wait_for_url(driver, start_url)
         
         # Check if form is still accessible
         try:
-            driver.find_element(By.ID, "email")
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "email")))
             print("✓ PASS: Page state maintained after back button")
             return True
-        except:
+        except TimeoutException:
             print("✗ FAIL: Page broken after back button")
             return False
     except Exception as e:
@@ -154,14 +140,16 @@ def test_page_refresh(driver, base_url):
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         
         # Fill in some data
-        driver.find_element(By.ID, "email").send_keys("test@example.com")
+        old_email_field = driver.find_element(By.ID, "email")
+        old_email_field.send_keys("test@example.com")
         
         # Refresh page
         driver.refresh()
-        time.sleep(2)
+        WebDriverWait(driver, 10).until(EC.staleness_of(old_email_field))
+        waits.wait_for_dom_stable(driver)
         
         # Check if form is cleared and accessible
-        email_field = driver.find_element(By.ID, "email")
+        email_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "email")))
         email_value = email_field.get_attribute("value")
         
         print(f"Email field value after refresh: '{email_value}'")
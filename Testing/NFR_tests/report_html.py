@@ -0,0 +1,371 @@
+"""
+Interactive HTML load report built from a result stream.
+
+Reads a result_sink stream chunk by chunk and does every aggregation with
+NumPy (no per-request Python loop): latency histograms and CDFs per group,
+a latency-over-time heatmap, per-second throughput and an error breakdown.
+The output is one self-contained HTML file with the data inlined and plain
+canvas charts (hover for values), so it opens offline and can be attached
+to a ticket. Multi-million-record streams aggregate in a few seconds.
+
+Usage:
+    python report_html.py load_reports/Login_page_report/Login_page_results.bin \
+        [--output load_reports/Login_page_report/Login_page_report.html] [--title "Login page"]
+"""
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+
+from result_sink import iter_records, load_errors
+
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+LATENCY_BINS = 120
+HEATMAP_LATENCY_BINS = 60
+MAX_HEATMAP_COLUMNS = 400
+MAX_THROUGHPUT_POINTS = 2000
+# Latencies are clipped into [MIN_LATENCY, max observed] for the log-spaced bins
+MIN_LATENCY = 1e-4
+
+
+def _scan(path, chunk_size):
+    """First pass: time range, latency range and group ids"""
+    t_min, t_max = math.inf, -math.inf
+    latency_max = MIN_LATENCY * 10
+    groups = set()
+    for chunk in iter_records(path, chunk_size):
+        t_min = min(t_min, float(chunk['timestamp'].min()))
+        t_max = max(t_max, float(chunk['timestamp'].max()))
+        latencies = chunk['latency'][chunk['success'] == 1]
+        if len(latencies):
+            latency_max = max(latency_max, float(latencies.max()))
+        groups.update(np.unique(chunk['group']).tolist())
+    return t_min, t_max, latency_max, np.array(sorted(groups), dtype=np.uint32)
+
+
+def aggregate_stream(path, chunk_size=1_000_000):
+    """Aggregate a result stream into the arrays behind every chart"""
+    t_min, t_max, latency_max, groups = _scan(path, chunk_size)
+    if not len(groups):
+        raise ValueError(f"{path} contains no records")
+
+    log_low, log_high = math.log10(MIN_LATENCY), math.log10(latency_max * 1.001)
+    bin_width = (log_high - log_low) / LATENCY_BINS
+    edges = np.logspace(log_low, log_high, LATENCY_BINS + 1)
+    seconds = int(t_max - t_min) + 1
+    column_width = max(1, math.ceil(seconds / MAX_HEATMAP_COLUMNS))
+    columns = math.ceil(seconds / column_width)
+    group_count = len(groups)
+
+    histograms = np.zeros(group_count * LATENCY_BINS, dtype=np.int64)
+    heatmap = np.zeros(columns * HEATMAP_LATENCY_BINS, dtype=np.int64)
+    ok_per_second = np.zeros(seconds, dtype=np.int64)
+    failed_per_second = np.zeros(seconds, dtype=np.int64)
+    requests = np.zeros(group_count, dtype=np.int64)
+    successes = np.zeros(group_count, dtype=np.int64)
+    error_ids = np.zeros(1 << 16, dtype=np.int64)
+    failed_statuses = np.zeros(1 << 16, dtype=np.int64)
+    statuses = np.zeros(1 << 16, dtype=np.int64)
+    latency_chunks, group_chunks = [], []
+
+    for chunk in iter_records(path, chunk_size):
+        success = chunk['success'] == 1
+        group = np.searchsorted(groups, chunk['group'])
+        second = (chunk['timestamp'] - t_min).astype(np.int64)
+        latency = chunk['latency'][success]
+        latency_bin = ((np.log10(np.clip(latency, MIN_LATENCY, None)) - log_low) / bin_width).astype(np.int64)
+        latency_bin = np.clip(latency_bin, 0, LATENCY_BINS - 1)
+        ok_group = group[success]
+
+        histograms += np.bincount(ok_group * LATENCY_BINS + latency_bin, minlength=len(histograms))
+        heat_bin = latency_bin * HEATMAP_LATENCY_BINS // LATENCY_BINS
+        heatmap += np.bincount((second[success] // column_width) * HEATMAP_LATENCY_BINS + heat_bin,
+                               minlength=len(heatmap))
+        ok_per_second += np.bincount(second[success], minlength=seconds)
+        failed_per_second += np.bincount(second[~success], minlength=seconds)
+        requests += np.bincount(group, minlength=group_count)
+        successes += np.bincount(ok_group, minlength=group_count)
+        statuses += np.bincount(chunk['status'], minlength=len(statuses))
+        failed = chunk[~success]
+        error_ids += np.bincount(failed['error'], minlength=len(error_ids))
+        failed_statuses += np.bincount(failed['status'][failed['error'] == 0], minlength=len(failed_statuses))
+        latency_chunks.append(latency)
+        group_chunks.append(ok_group)
+
+    latencies = np.concatenate(latency_chunks)
+    latency_groups = np.concatenate(group_chunks)
+    histograms = histograms.reshape(group_count, LATENCY_BINS)
+
+    summary = []
+    for index, group_id in enumerate(groups.tolist()):
+        group_latencies = latencies[latency_groups == index]
+        values = np.percentile(group_latencies, PERCENTILES) if len(group_latencies) else np.zeros(len(PERCENTILES))
+        summary.append({
+            'group': group_id,
+            'requests': int(requests[index]),
+            'successful': int(successes[index]),
+            'success_rate': float(successes[index] / requests[index] * 100) if requests[index] else 0.0,
+            'mean': float(group_latencies.mean()) if len(group_latencies) else 0.0,
+            'max': float(group_latencies.max()) if len(group_latencies) else 0.0,
+            'percentiles': {str(q): float(v) for q, v in zip(PERCENTILES, values)}
+        })
+
+    totals = histograms.sum(axis=1, keepdims=True)
+    cdf = np.divide(np.cumsum(histograms, axis=1), totals, out=np.zeros(histograms.shape), where=totals > 0)
+
+    # Throughput, downsampled to at most MAX_THROUGHPUT_POINTS averaged points
+    step = max(1, math.ceil(seconds / MAX_THROUGHPUT_POINTS))
+    padded = math.ceil(seconds / step) * step
+    ok_rate = np.pad(ok_per_second, (0, padded - seconds)).reshape(-1, step).sum(axis=1) / step
+    failed_rate = np.pad(failed_per_second, (0, padded - seconds)).reshape(-1, step).sum(axis=1) / step
+
+    messages = load_errors(path)
+    errors = [{'error': messages.get(int(i), f"Error #{int(i)}"), 'count': int(error_ids[i])}
+              for i in np.nonzero(error_ids)[0] if i != 0]
+    errors += [{'error': f"HTTP {int(s)}" if s else "No response", 'count': int(failed_statuses[s])}
+               for s in np.nonzero(failed_statuses)[0]]
+    errors.sort(key=lambda e: -e['count'])
+
+    duration = max(t_max - t_min, 1e-9)
+    return {
+        'start': t_min,
+        'duration': duration,
+        'requests': int(requests.sum()),
+        'successful': int(successes.sum()),
+        'throughput': float(successes.sum() / duration),
+        'groups': summary,
+        'latency_edges': edges.tolist(),
+        'histograms': histograms.tolist(),
+        'cdf': np.round(cdf, 6).tolist(),
+        'heatmap': {
+            'column_seconds': column_width,
+            'latency_edges': edges[::LATENCY_BINS // HEATMAP_LATENCY_BINS].tolist(),
+            'counts': heatmap.reshape(columns, HEATMAP_LATENCY_BINS).tolist()
+        },
+        'throughput_series': {
+            'step_seconds': step,
+            'ok': np.round(ok_rate, 3).tolist(),
+            'failed': np.round(failed_rate, 3).tolist()
+        },
+        'statuses': {str(int(s)): int(statuses[s]) for s in np.nonzero(statuses)[0]},
+        'errors': errors
+    }
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; margin: 24px; color: #222; }
+h2 { margin-top: 32px; }
+table { border-collapse: collapse; font-size: 13px; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+th { background: #f0f0f0; }
+canvas { width: 100%; height: 320px; border: 1px solid #eee; }
+#tip { position: fixed; background: rgba(0,0,0,.8); color: #fff; padding: 4px 8px; font-size: 12px;
+       pointer-events: none; display: none; border-radius: 3px; }
+label { margin-right: 12px; font-size: 13px; }
+</style></head><body>
+<h1>__TITLE__</h1>
+<div id="overview"></div>
+<h2>Summary by group</h2><table id="summary"></table>
+<h2>Latency distribution</h2><div id="groups"></div><canvas id="histogram"></canvas>
+<h2>Latency CDF</h2><canvas id="cdf"></canvas>
+<h2>Latency over time</h2><canvas id="heatmap"></canvas>
+<h2>Throughput per second</h2><canvas id="throughput"></canvas>
+<h2>Errors</h2><table id="errors"></table>
+<div id="tip"></div>
+<script>
+const DATA = __DATA__;
+const COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+const tip = document.getElementById('tip');
+const ms = s => (s * 1000).toFixed(s < 0.01 ? 2 : 1) + ' ms';
+const visible = DATA.groups.map(() => true);
+
+function showTip(event, html) {
+    tip.innerHTML = html; tip.style.display = 'block';
+    tip.style.left = (event.clientX + 12) + 'px'; tip.style.top = (event.clientY + 12) + 'px';
+}
+function hideTip() { tip.style.display = 'none'; }
+
+function setup(id) {
+    const canvas = document.getElementById(id);
+    const ratio = window.devicePixelRatio || 1;
+    canvas.width = canvas.clientWidth * ratio; canvas.height = canvas.clientHeight * ratio;
+    const ctx = canvas.getContext('2d');
+    ctx.scale(ratio, ratio);
+    const box = {left: 60, top: 10, width: canvas.clientWidth - 80, height: canvas.clientHeight - 45};
+    ctx.clearRect(0, 0, canvas.clientWidth, canvas.clientHeight);
+    ctx.font = '11px sans-serif';
+    return {canvas, ctx, box};
+}
+
+function axes(ctx, box, xTicks, yTicks) {
+    ctx.strokeStyle = '#999'; ctx.fillStyle = '#444';
+    ctx.strokeRect(box.left, box.top, box.width, box.height);
+    ctx.textAlign = 'center';
+    xTicks.forEach(([x, label]) => ctx.fillText(label, x, box.top + box.height + 15));
+    ctx.textAlign = 'right';
+    yTicks.forEach(([y, label]) => ctx.fillText(label, box.left - 5, y + 4));
+}
+
+// Log-scaled latency axis shared by the histogram, CDF and heatmap
+function latencyScale(box, edges) {
+    const lo = Math.log10(edges[0]), hi = Math.log10(edges[edges.length - 1]);
+    const x = v => box.left + (Math.log10(v) - lo) / (hi - lo) * box.width;
+    const ticks = [];
+    for (let p = Math.ceil(lo); p <= hi; p++) ticks.push([x(Math.pow(10, p)), ms(Math.pow(10, p))]);
+    return {x, ticks, invert: px => Math.pow(10, lo + (px - box.left) / box.width * (hi - lo))};
+}
+
+function lineChart(id, series, edges, yMax, yFormat, tipFormat) {
+    const {canvas, ctx, box} = setup(id);
+    const scale = latencyScale(box, edges);
+    const y = v => box.top + box.height - v / yMax * box.height;
+    axes(ctx, box, scale.ticks, [0, 0.25, 0.5, 0.75, 1].map(f => [y(f * yMax), yFormat(f * yMax)]));
+    series.forEach(s => {
+        if (!s.visible) return;
+        ctx.strokeStyle = s.color; ctx.lineWidth = 1.5; ctx.beginPath();
+        s.values.forEach((v, i) => {
+            const px = scale.x(Math.sqrt(edges[i] * edges[i + 1]));
+            i ? ctx.lineTo(px, y(v)) : ctx.moveTo(px, y(v));
+        });
+        ctx.stroke();
+    });
+    canvas.onmousemove = e => {
+        const latency = scale.invert(e.offsetX);
+        const i = edges.findIndex((edge, k) => k < edges.length - 1 && latency < edges[k + 1]);
+        if (i < 0) return hideTip();
+        showTip(e, ms(edges[i]) + ' - ' + ms(edges[i + 1]) + '<br>' + series.filter(s => s.visible)
+            .map(s => '<span style="color:' + s.color + '">■</span> ' + s.name + ': ' + tipFormat(s.values[i])).join('<br>'));
+    };
+    canvas.onmouseleave = hideTip;
+}
+
+function drawDistributions() {
+    const series = values => DATA.groups.map((g, i) => ({
+        name: 'group ' + g.group, color: COLORS[i % COLORS.length], values: values[i], visible: visible[i]
+    }));
+    const shares = DATA.histograms.map(h => { const t = h.reduce((a, b) => a + b, 0) || 1; return h.map(c => c / t); });
+    const max = Math.max(...shares.filter((_, i) => visible[i]).flat(), 1e-9);
+    const pct = v => (v * 100).toFixed(1) + '%';
+    lineChart('histogram', series(shares), DATA.latency_edges, max, pct, pct);
+    lineChart('cdf', series(DATA.cdf), DATA.latency_edges, 1, pct, pct);
+}
+
+function drawHeatmap() {
+    const {canvas, ctx, box} = setup('heatmap');
+    const {counts, latency_edges: edges, column_seconds: step} = DATA.heatmap;
+    const max = Math.max(...counts.flat(), 1);
+    const cw = box.width / counts.length, rh = box.height / edges.length;
+    counts.forEach((column, c) => column.forEach((count, r) => {
+        if (!count) return;
+        const shade = Math.log(1 + count) / Math.log(1 + max);
+        ctx.fillStyle = 'rgba(214, 39, 40,' + (0.1 + 0.9 * shade) + ')';
+        ctx.fillRect(box.left + c * cw, box.top + box.height - (r + 1) * rh, Math.ceil(cw), Math.ceil(rh));
+    }));
+    const xTicks = [0, 0.25, 0.5, 0.75, 1].map(f => [box.left + f * box.width, (f * counts.length * step).toFixed(0) + ' s']);
+    const yTicks = [];
+    for (let r = 0; r < edges.length; r += 10) yTicks.push([box.top + box.height - r * rh, ms(edges[r])]);
+    axes(ctx, box, xTicks, yTicks);
+    canvas.onmousemove = e => {
+        const c = Math.floor((e.offsetX - box.left) / cw), r = Math.floor((box.top + box.height - e.offsetY) / rh);
+        if (c < 0 || c >= counts.length || r < 0 || r >= edges.length) return hideTip();
+        const upper = r + 1 < edges.length ? ms(edges[r + 1]) : '+';
+        showTip(e, (c * step) + '-' + ((c + 1) * step) + ' s<br>' + ms(edges[r]) + ' - ' + upper +
+            '<br>' + (counts[c][r] || 0) + ' requests');
+    };
+    canvas.onmouseleave = hideTip;
+}
+
+function drawThroughput() {
+    const {canvas, ctx, box} = setup('throughput');
+    const {ok, failed, step_seconds: step} = DATA.throughput_series;
+    const max = Math.max(...ok.map((v, i) => v + failed[i]), 1e-9);
+    const bw = box.width / ok.length;
+    const y = v => v / max * box.height;
+    ok.forEach((v, i) => {
+        ctx.fillStyle = '#2ca02c'; ctx.fillRect(box.left + i * bw, box.top + box.height - y(v), Math.max(bw, 1), y(v));
+        ctx.fillStyle = '#d62728';
+        ctx.fillRect(box.left + i * bw, box.top + box.height - y(v) - y(failed[i]), Math.max(bw, 1), y(failed[i]));
+    });
+    axes(ctx, box,
+        [0, 0.25, 0.5, 0.75, 1].map(f => [box.left + f * box.width, (f * ok.length * step).toFixed(0) + ' s']),
+        [0, 0.5, 1].map(f => [box.top + box.height - f * box.height, (f * max).toFixed(1) + '/s']));
+    canvas.onmousemove = e => {
+        const i = Math.floor((e.offsetX - box.left) / bw);
+        if (i < 0 || i >= ok.length) return hideTip();
+        showTip(e, (i * step) + ' s<br>ok: ' + ok[i].toFixed(1) + '/s<br>failed: ' + failed[i].toFixed(1) + '/s');
+    };
+    canvas.onmouseleave = hideTip;
+}
+
+function tables() {
+    const pcts = Object.keys(DATA.groups[0].percentiles);
+    document.getElementById('overview').innerHTML = DATA.requests.toLocaleString() + ' requests, ' +
+        DATA.successful.toLocaleString() + ' successful over ' + DATA.duration.toFixed(1) + ' s (' +
+        DATA.throughput.toFixed(1) + ' req/s). Started ' + new Date(DATA.start * 1000).toLocaleString() + '.';
+    document.getElementById('summary').innerHTML = '<tr><th>Group</th><th>Requests</th><th>Success %</th><th>Mean</th>' +
+        pcts.map(p => '<th>P' + p + '</th>').join('') + '<th>Max</th></tr>' +
+        DATA.groups.map(g => '<tr><td>' + g.group + '</td><td>' + g.requests + '</td><td>' + g.success_rate.toFixed(1) +
+            '</td><td>' + ms(g.mean) + '</td>' + pcts.map(p => '<td>' + ms(g.percentiles[p]) + '</td>').join('') +
+            '<td>' + ms(g.max) + '</td></tr>').join('');
+    const failed = DATA.requests - DATA.successful;
+    document.getElementById('errors').innerHTML = '<tr><th>Error</th><th>Count</th><th>Share of failures</th></tr>' +
+        (DATA.errors.length ? DATA.errors.map(e => '<tr><td style="text-align:left">' + e.error.replace(/</g, '&lt;') +
+            '</td><td>' + e.count + '</td><td>' + (e.count / failed * 100).toFixed(1) + '%</td></tr>').join('')
+            : '<tr><td colspan="3">No errors</td></tr>') +
+        '<tr><th>Status</th><th colspan="2">Responses</th></tr>' + Object.entries(DATA.statuses)
+            .map(([s, c]) => '<tr><td>' + (s === '0' ? 'none' : s) + '</td><td colspan="2">' + c + '</td></tr>').join('');
+    document.getElementById('groups').innerHTML = DATA.groups.map((g, i) =>
+        '<label><input type="checkbox" checked data-i="' + i + '"> <span style="color:' + COLORS[i % COLORS.length] +
+        '">■</span> group ' + g.group + '</label>').join('');
+    document.querySelectorAll('#groups input').forEach(box => box.onchange = () => {
+        visible[box.dataset.i] = box.checked; drawDistributions();
+    });
+}
+
+function drawAll() { drawDistributions(); drawHeatmap(); drawThroughput(); }
+tables(); drawAll();
+window.onresize = drawAll;
+</script></body></html>
+"""
+
+
+def write_html_report(aggregates, output_file, title="Load Test Report"):
+    """Render aggregates into one self-contained HTML file"""
+    # </ inside inlined JSON would end the script element early
+    data = json.dumps(aggregates, separators=(',', ':')).replace('</', '<\\/')
+    html = _TEMPLATE.replace('__TITLE__', title.replace('<', '&lt;')).replace('__DATA__', data)
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(html, encoding='utf-8')
+    return str(output_file)
+
+
+def generate_html_report(stream_file, output_file=None, title=None, chunk_size=1_000_000):
+    """Aggregate a result stream and write its HTML report next to it by default"""
+    stream_file = Path(stream_file)
+    if output_file is None:
+        output_file = stream_file.with_name(stream_file.name.replace("_results.bin", "") + "_report.html")
+    start_time = time.perf_counter()
+    aggregates = aggregate_stream(stream_file, chunk_size)
+    html_file = write_html_report(aggregates, output_file, title or f"Load Test Report - {stream_file.stem}")
+    print(f"HTML report: {html_file} ({aggregates['requests']} records in {time.perf_counter() - start_time:.2f}s)")
+    return html_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an interactive HTML report from a result stream")
+    parser.add_argument('stream', help="*_results.bin written by ResultSink")
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--title', default=None)
+    args = parser.parse_args()
+    generate_html_report(args.stream, args.output, args.title)
+
+
+if __name__ == "__main__":
+    main()
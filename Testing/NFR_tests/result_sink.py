@@ -0,0 +1,217 @@
+"""
+Result stream for long load and soak runs.
+
+Every request is written as a fixed-size binary record instead of being kept
+in a Python list, and per-group / per-window histograms are updated as
+records arrive. Memory therefore stays bounded regardless of run length, and
+reports can be rebuilt from the stream later, chunk by chunk.
+
+Record layout (little endian, 23 bytes):
+    timestamp  float64  wall-clock send time
+    latency    float32  seconds
+    group      uint32   user count, stage index, ...
+    status     uint16   HTTP status, 0 if no response
+    error      uint32   index into the errors sidecar, 0 if none
+    success    uint8
+"""
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+import load_engine
+from histogram import LatencyHistogram
+
+
+# QLR1 streams had a uint16 error id, which overflowed after 65,535 distinct errors
+MAGIC = b"QLR2"
+RECORD = struct.Struct("<dfIHIB")
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('latency', '<f4'),
+    ('group', '<u4'),
+    ('status', '<u2'),
+    ('error', '<u4'),
+    ('success', 'u1')
+])
+
+
+def _errors_path(path):
+    return Path(path).with_suffix(".errors.jsonl")
+
+
+class _Aggregate:
+    """Incrementally maintained counters and histogram for one slice of the stream"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.successful = 0
+        self.errors = {}
+        self.completions = {}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def add(self, timestamp, latency, success, error):
+        self.requests += 1
+        if success:
+            self.successful += 1
+            self.histogram.record(latency)
+            second = int(timestamp + latency)
+            self.completions[second] = self.completions.get(second, 0) + 1
+        else:
+            self.errors[error] = self.errors.get(error, 0) + 1
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        end = timestamp + latency
+        if self.last_timestamp is None or end > self.last_timestamp:
+            self.last_timestamp = end
+
+    def result(self, duration=None):
+        if duration is None:
+            duration = (self.last_timestamp - self.first_timestamp) if self.requests else 0
+        return {
+            'requests': self.requests,
+            'successful': self.successful,
+            'failed': self.requests - self.successful,
+            'success_rate': self.successful / self.requests * 100 if self.requests else 0,
+            'throughput': self.successful / duration if duration > 0 else 0,
+            'total_time': duration,
+            **self.histogram.summary(),
+            'histogram': self.histogram.to_dict(),
+            'completions_per_second': load_engine.per_second_series(self.completions),
+            'errors': self.errors
+        }
+
+
+class ResultSink:
+    """
+    Streams per-request results to `path` and keeps mergeable summaries per
+    group and per `window` seconds of wall-clock time.
+    """
+
+    def __init__(self, path, window=60, buffer_size=4096):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.window = window
+        self.buffer_size = buffer_size
+        self.groups = {}
+        self.windows = {}
+        self._error_ids = {}
+        self._buffer = []
+        # Each sink starts a fresh stream: error ids restart at 1, so appending to a
+        # previous run's files would relabel its errors and merge both runs' groups
+        self._file = open(self.path, "wb")
+        self._errors_file = open(_errors_path(self.path), "w", encoding="utf-8")
+        self._file.write(MAGIC)
+
+    def _error_id(self, error):
+        if error is None:
+            return 0
+        if error not in self._error_ids:
+            self._error_ids[error] = len(self._error_ids) + 1
+            self._errors_file.write(json.dumps({'id': self._error_ids[error], 'error': error}) + "\n")
+            self._errors_file.flush()
+        return self._error_ids[error]
+
+    def record(self, result, group=0):
+        """Append one result dict as produced by the load engine"""
+        success = bool(result['success'])
+        error = None if success else result.get('error', f"HTTP {result.get('status', 'Unknown')}")
+        timestamp = result.get('timestamp', 0.0)
+        latency = result['time']
+        self._buffer.append(RECORD.pack(
+            timestamp, latency, group, result.get('status') or 0, self._error_id(error), success
+        ))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+        self.groups.setdefault(group, _Aggregate()).add(timestamp, latency, success, error)
+        window_start = int(timestamp // self.window) * self.window
+        self.windows.setdefault(window_start, _Aggregate()).add(timestamp, latency, success, error)
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._errors_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def group_results(self):
+        """Report result dict per group, in group order"""
+        return {group: self.groups[group].result() for group in sorted(self.groups)}
+
+    def window_results(self):
+        """Report result dict per time window, in time order"""
+        return [
+            {'window_start': start, **self.windows[start].result(duration=self.window)}
+            for start in sorted(self.windows)
+        ]
+
+
+def load_errors(path):
+    """Error-id to message table of a stream"""
+    errors = {}
+    errors_file = _errors_path(path)
+    if errors_file.exists():
+        with open(errors_file, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                errors[entry['id']] = entry['error']
+    return errors
+
+
+def iter_records(path, chunk_size=1_000_000):
+    """Yield the stream as NumPy structured arrays of at most chunk_size records"""
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a result stream")
+        while True:
+            chunk = np.fromfile(f, dtype=RECORD_DTYPE, count=chunk_size)
+            if len(chunk) == 0:
+                break
+            yield chunk
+
+
+def summarize_stream(path, window=None, chunk_size=1_000_000):
+    """
+    Rebuild per-group (or, if window is given, per-window) report results
+    from a stream file with memory bounded by chunk_size.
+    """
+    errors = load_errors(path)
+    aggregates = {}
+    for chunk in iter_records(path, chunk_size):
+        keys = chunk['group'] if window is None else (chunk['timestamp'] // window * window).astype(np.int64)
+        for key in np.unique(keys):
+            part = chunk[keys == key]
+            aggregate = aggregates.setdefault(int(key), _Aggregate())
+            ok = part[part['success'] == 1]
+            for latency, count in zip(*np.unique(ok['latency'], return_counts=True)):
+                aggregate.histogram.record(float(latency), int(count))
+            aggregate.requests += len(part)
+            aggregate.successful += len(ok)
+            seconds, second_counts = np.unique((ok['timestamp'] + ok['latency']).astype(np.int64), return_counts=True)
+            for second, count in zip(seconds, second_counts):
+                aggregate.completions[int(second)] = aggregate.completions.get(int(second), 0) + int(count)
+            failed_ids, failed_counts = np.unique(part['error'][part['success'] == 0], return_counts=True)
+            for error_id, count in zip(failed_ids, failed_counts):
+                error = errors.get(int(error_id), 'Unknown')
+                aggregate.errors[error] = aggregate.errors.get(error, 0) + int(count)
+            start = float(part['timestamp'].min())
+            end = float((part['timestamp'] + part['latency']).max())
+            if aggregate.first_timestamp is None or start < aggregate.first_timestamp:
+                aggregate.first_timestamp = start
+            if aggregate.last_timestamp is None or end > aggregate.last_timestamp:
+                aggregate.last_timestamp = end
+    return {key: aggregates[key].result(duration=window) for key in sorted(aggregates)}
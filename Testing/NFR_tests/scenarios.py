@@ -0,0 +1,368 @@
+"""
+Scenario-based user-journey load testing.
+
+Each virtual user logs in and then repeatedly picks a journey from a weighted
+mix (play a story, browse stories, drive the FastAPI service directly),
+pausing for a sampled think time between steps. Latency is recorded per step
+so the report shows which part of the story flow degrades under load.
+
+Journeys run against the Node backend (/api/v1/...) and the FastAPI
+storyteller service. Story creation and turns call the real model through
+the user's stored API key unless the stack is configured otherwise.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+
+import aiohttp
+import matplotlib.pyplot as plt
+
+from histogram import LatencyHistogram
+
+
+BACKEND_URL = os.environ.get("QUEST_BACKEND_URL", "http://localhost:3000")
+LLM_URL = os.environ.get("QUEST_LLM_URL", "http://localhost:8000")
+
+TURN_ACTIONS = [
+    "I look around carefully.",
+    "I open the door and step inside.",
+    "I ask the stranger who they are.",
+    "I draw my weapon and wait.",
+    "I follow the footprints into the forest.",
+]
+
+
+class JourneyAborted(Exception):
+    """Raised by a step whose failure makes the rest of the journey meaningless"""
+
+
+def think_time_sampler(distribution="exponential", mean=3.0, spread=None):
+    """
+    Return a function producing think times in seconds.
+    distribution: 'constant', 'uniform' (mean +/- spread), 'exponential' or
+    'lognormal' (spread is the sigma of the underlying normal).
+    """
+    if distribution == "constant":
+        return lambda: mean
+    if distribution == "uniform":
+        spread = mean if spread is None else spread
+        return lambda: random.uniform(max(0, mean - spread), mean + spread)
+    if distribution == "exponential":
+        return lambda: random.expovariate(1 / mean) if mean > 0 else 0
+    if distribution == "lognormal":
+        sigma = 0.5 if spread is None else spread
+        mu = math.log(mean) - sigma ** 2 / 2
+        return lambda: random.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown think time distribution: {distribution}")
+
+
+class _Stats:
+    """Per-step and per-journey latency histograms and outcome counters"""
+
+    def __init__(self):
+        self.steps = {}
+        self.journeys = {}
+
+    def _entry(self, table, name):
+        return table.setdefault(name, {'histogram': LatencyHistogram(), 'count': 0, 'failed': 0, 'errors': {}})
+
+    def record(self, table, name, elapsed, ok, error=None):
+        entry = self._entry(table, name)
+        entry['count'] += 1
+        if ok:
+            entry['histogram'].record(elapsed)
+        else:
+            entry['failed'] += 1
+            entry['errors'][error] = entry['errors'].get(error, 0) + 1
+
+    def results(self, table):
+        rows = []
+        for name, entry in table.items():
+            successful = entry['count'] - entry['failed']
+            rows.append({
+                'name': name,
+                'count': entry['count'],
+                'successful': successful,
+                'failed': entry['failed'],
+                'success_rate': successful / entry['count'] * 100 if entry['count'] else 0,
+                **entry['histogram'].summary(),
+                'histogram': entry['histogram'].to_dict(),
+                'errors': entry['errors']
+            })
+        return rows
+
+
+class VirtualUser:
+    """One simulated user with its own cookie jar and auth token"""
+
+    def __init__(self, session, stats, config, account):
+        self.session = session
+        self.stats = stats
+        self.config = config
+        self.account = account
+        self.think_time = config['think_time']
+        self.token = None
+        self.user_id = None
+
+    async def think(self):
+        await asyncio.sleep(self.think_time())
+
+    async def request(self, step, method, url, **kwargs):
+        """Issue one step's request, record its latency and return the decoded JSON body"""
+        headers = kwargs.pop('headers', {})
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method, url, headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.config['timeout']), **kwargs
+            ) as response:
+                body = await response.read()
+                elapsed = time.perf_counter() - start
+                ok = response.status < 400
+                self.stats.record(self.stats.steps, step, elapsed, ok, None if ok else f"HTTP {response.status}")
+                if not ok:
+                    raise JourneyAborted(f"{step}: HTTP {response.status}")
+                return _decode(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+            self.stats.record(self.stats.steps, step, time.perf_counter() - start, False, error)
+            raise JourneyAborted(f"{step}: {error}")
+
+
+def _decode(body):
+    try:
+        return json.loads(body) if body else {}
+    except ValueError:
+        return {}
+
+
+# --- Journeys ---
+
+async def login(vu):
+    data = await vu.request('login', 'POST', f"{vu.config['backend_url']}/api/v1/user/login", json={
+        'email': vu.account['email'],
+        'password': vu.account['password']
+    })
+    user = data['data']['user']
+    vu.token = user['accessToken']
+    vu.user_id = user['_id']
+
+
+async def _create_story(vu):
+    data = await vu.request('create_story', 'POST', f"{vu.config['backend_url']}/api/v1/story/create", json={
+        'title': f"Load test story {random.randint(0, 10 ** 6)}",
+        'description': "A traveller wakes up in an abandoned lighthouse with no memory.",
+        'character': "Ash",
+        'genre': "mystery"
+    })
+    return data['data']['_id']
+
+
+async def play_story_journey(vu):
+    """Create a story, play several turns through the backend, then read it back"""
+    backend = vu.config['backend_url']
+    story_id = await _create_story(vu)
+    for _ in range(vu.config['turns']):
+        await vu.think()
+        await vu.request('continue_turn', 'POST', f"{backend}/api/v1/story/addcontent/{story_id}", json={
+            'prompt': random.choice(TURN_ACTIONS)
+        })
+    await vu.think()
+    await vu.request('list_stories', 'GET', f"{backend}/api/v1/story/all")
+    await vu.request('fetch_content', 'GET', f"{backend}/api/v1/story/content/{story_id}")
+
+
+async def browse_journey(vu):
+    """List own and public stories and open a few of them"""
+    backend = vu.config['backend_url']
+    own = await vu.request('list_stories', 'GET', f"{backend}/api/v1/story/all")
+    await vu.think()
+    public = await vu.request('public_stories', 'GET', f"{backend}/api/v1/story/publicstories")
+    stories = (own.get('data') or []) + (public.get('data') or [])
+    for story in random.sample(stories, min(len(stories), vu.config['stories_to_open'])):
+        await vu.think()
+        await vu.request('fetch_content', 'GET', f"{backend}/api/v1/story/content/{story['_id']}")
+
+
+async def llm_direct_journey(vu):
+    """Create a story through the backend, then continue it straight against FastAPI"""
+    story_id = await _create_story(vu)
+    for _ in range(vu.config['turns']):
+        await vu.think()
+        await vu.request('llm_continue', 'POST', f"{vu.config['llm_url']}/story/continue", json={
+            'story_id': story_id,
+            'user_id': vu.user_id,
+            'user_action': random.choice(TURN_ACTIONS),
+            'api_key': vu.config['api_key']
+        })
+
+
+JOURNEYS = {
+    'play_story': play_story_journey,
+    'browse': browse_journey,
+    'llm_direct': llm_direct_journey,
+}
+
+
+def default_config(**overrides):
+    """Scenario configuration; accounts default to QUEST_TEST_EMAIL / QUEST_TEST_PASSWORD"""
+    config = {
+        'backend_url': BACKEND_URL,
+        'llm_url': LLM_URL,
+        'api_key': os.environ.get("GROQ_API_KEY", ""),
+        'accounts': [{
+            'email': os.environ.get("QUEST_TEST_EMAIL", "test@example.com"),
+            'password': os.environ.get("QUEST_TEST_PASSWORD", "testpassword123")
+        }],
+        'mix': {'browse': 0.7, 'play_story': 0.3},
+        'virtual_users': 20,
+        'duration': 300,
+        'ramp_up': 30,
+        'turns': 3,
+        'stories_to_open': 2,
+        'think_time': think_time_sampler("exponential", 3.0),
+        'timeout': 120,
+    }
+    config.update(overrides)
+    return config
+
+
+async def _virtual_user(index, connector, stats, config, deadline):
+    await asyncio.sleep(config['ramp_up'] * index / max(config['virtual_users'], 1))
+    account = config['accounts'][index % len(config['accounts'])]
+    names = list(config['mix'])
+    weights = [config['mix'][name] for name in names]
+
+    async with aiohttp.ClientSession(connector=connector, connector_owner=False) as session:
+        vu = VirtualUser(session, stats, config, account)
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                if vu.token is None:
+                    await login(vu)
+                await JOURNEYS[name](vu)
+                stats.record(stats.journeys, name, time.perf_counter() - start, True)
+            except (JourneyAborted, KeyError, TypeError) as e:
+                # KeyError/TypeError: the response did not have the expected shape
+                stats.record(stats.journeys, name, time.perf_counter() - start, False, str(e))
+                vu.token = None
+                await vu.think()
+
+
+async def _run_scenario(config):
+    stats = _Stats()
+    connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300)
+    deadline = time.perf_counter() + config['duration']
+    try:
+        await asyncio.gather(*(
+            _virtual_user(i, connector, stats, config, deadline) for i in range(config['virtual_users'])
+        ))
+    finally:
+        await connector.close()
+    return stats
+
+
+def run_scenario(config=None):
+    """Run the weighted journey mix and return per-step and per-journey results"""
+    config = config or default_config()
+    unknown = set(config['mix']) - set(JOURNEYS)
+    if unknown:
+        raise ValueError(f"Unknown journeys in mix: {', '.join(sorted(unknown))}")
+    start = time.perf_counter()
+    stats = asyncio.run(_run_scenario(config))
+    return {
+        'total_time': time.perf_counter() - start,
+        'steps': stats.results(stats.steps),
+        'journeys': stats.results(stats.journeys)
+    }
+
+
+def _create_step_graph(steps, report_dir, prefix):
+    """Bar chart of median and p95 latency per step"""
+    names = [s['name'] for s in steps]
+    positions = range(len(names))
+    plt.figure(figsize=(10, 6))
+    plt.bar([p - 0.2 for p in positions], [s['median_response_time'] for s in steps], width=0.4, label='P50')
+    plt.bar([p + 0.2 for p in positions], [s['p95_response_time'] for s in steps], width=0.4, color='red', label='P95')
+    plt.xticks(list(positions), names, rotation=30, ha='right')
+    plt.ylabel('Response Time (seconds)')
+    plt.title('Latency per Journey Step')
+    plt.legend()
+    plt.grid(True, axis='y')
+
+    graph_file = report_dir / f"{prefix}_step_latency.png"
+    plt.tight_layout()
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def generate_scenario_report(config=None, output_dir="load_reports", graph_prefix=None, folder_name=None):
+    """Run a journey mix and write per-step / per-journey breakdowns"""
+    config = config or default_config()
+    report_name = folder_name or graph_prefix or "scenario"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "scenario"
+
+    print("=" * 80)
+    print("SCENARIO LOAD TESTING REPORT")
+    print("=" * 80)
+    print(f"Backend: {config['backend_url']}  LLM service: {config['llm_url']}")
+    print(f"{config['virtual_users']} virtual users for {config['duration']}s, mix: {config['mix']}")
+
+    results = run_scenario(config)
+    graph_file = _create_step_graph(results['steps'], report_dir, prefix) if results['steps'] else None
+
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("SCENARIO LOAD TESTING REPORT\n")
+        f.write("=" * 80 + "\n\n")
+        f.write("JOURNEYS\n")
+        f.write(f"{'Journey':<16} {'Runs':<8} {'Complete%':<12} {'Avg(s)':<10} {'P95(s)':<10}\n")
+        f.write("-" * 80 + "\n")
+        for j in results['journeys']:
+            f.write(f"{j['name']:<16} {j['count']:<8} {j['success_rate']:<12.1f} "
+                    f"{j['avg_response_time']:<10.2f} {j['p95_response_time']:<10.2f}\n")
+        f.write("\nSTEPS\n")
+        f.write(f"{'Step':<16} {'Count':<8} {'Success%':<10} {'Avg(s)':<10} {'P50(s)':<10} {'P95(s)':<10} {'P99(s)':<10}\n")
+        f.write("-" * 80 + "\n")
+        for s in results['steps']:
+            f.write(f"{s['name']:<16} {s['count']:<8} {s['success_rate']:<10.1f} {s['avg_response_time']:<10.3f} "
+                    f"{s['median_response_time']:<10.3f} {s['p95_response_time']:<10.3f} {s['p99_response_time']:<10.3f}\n")
+
+    json_summary = {
+        'metadata': {
+            'backend_url': config['backend_url'],
+            'llm_url': config['llm_url'],
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'mix': config['mix'],
+            'virtual_users': config['virtual_users'],
+            'duration': config['duration'],
+            'turns': config['turns'],
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        **results,
+        'graphs': [graph_file] if graph_file else []
+    }
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    return json_summary
+
+
+if __name__ == "__main__":
+    generate_scenario_report(graph_prefix="Story_Flow")
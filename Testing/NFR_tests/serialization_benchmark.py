@@ -0,0 +1,312 @@
+"""
+Response serialization microbenchmark for /story/continue (LLM_API).
+
+/story/continue returns every turn of the story, so its serialization cost
+grows with story length. For stories of increasing size this compares:
+    jsonable_encoder   FastAPI without a response_model: jsonable_encoder,
+                       then json.dumps in JSONResponse (the old path)
+    response_model     FastAPI with ContinueStoryResponse: pydantic-core
+                       validates the dict and dumps JSON bytes directly
+    orjson             jsonable_encoder + orjson.dumps, i.e. ORJSONResponse
+                       (only when orjson is installed)
+
+A second table covers the read path in front of it: the handler's two
+story reads, decoded as Motor decodes them, turned into the prompt context
+and the response body (then serialized as above).
+    full               whole stored document both times (before projections)
+    projected          STORY_CONTEXT_PROJECTION and STORY_RESPONSE_PROJECTION:
+                       no turn ids or timestamps, user ids already strings
+    raw_projected      the projected documents as RawBSONDocument, for
+                       comparison: lazy decoding only pays off for fields the
+                       handler does not touch, and it touches every turn
+
+Time is the median of several calls; allocations are the tracemalloc peak
+of a single call, which is memory the worker holds while serializing.
+No server, database or model is needed.
+
+Usage:
+    python serialization_benchmark.py [--turns 10 100 500 1000 2000] [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bson
+import matplotlib.pyplot as plt
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "LLM_API"))
+
+from storyteller_fastapi import ContinueStoryResponse, format_story_chunk  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DEFAULT_TURNS = (10, 100, 500, 1000, 2000)
+# Roughly the size of a real turn: a short action and 2-3 paragraphs of narration
+PROMPT = "I open the door slowly and step into the lighthouse"
+RESPONSE = ("The hinges groan as the door gives way, and salt air rushes past you into the dark. "
+            "Somewhere above, the lamp turns without a keeper, throwing pale arcs across the stairwell. ") * 6
+
+
+def make_story(turns):
+    """A /story/continue response body with the given number of turns"""
+    user = str(ObjectId())
+    return {
+        "story_id": str(ObjectId()),
+        "title": "The Door That Was Not There",
+        "description": "A lighthouse keeper finds a door that was not there yesterday.",
+        "character": "Ash",
+        "content": [{"prompt": PROMPT, "user": user, "response": RESPONSE} for _ in range(turns)],
+        "summary": "Ash found a door. " * 20,
+        "complete": False,
+        "dialect": "ORIGINAL: quiet coastal gothic"
+    }
+
+
+def make_stored_story(turns):
+    """(stored, context-projected, response-projected) BSON of a story as the Node backend saves it"""
+    user = ObjectId()
+    story_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    content = [{"_id": ObjectId(), "prompt": PROMPT, "user": user, "response": RESPONSE} for _ in range(turns)]
+    stored = {
+        "_id": story_id,
+        "title": "The Door That Was Not There",
+        "description": "A lighthouse keeper finds a door that was not there yesterday.",
+        "genre": "mystery",
+        "ownerid": [{"owner": user, "character": "Ash"}],
+        "content": content,
+        "summary": "Ash found a door. " * 20,
+        "complete": False,
+        "public": False,
+        "dialect": "ORIGINAL: quiet coastal gothic",
+        "createdAt": now,
+        "updatedAt": now
+    }
+    context = {
+        "_id": story_id,
+        "title": stored["title"],
+        "description": stored["description"],
+        "ownerid": stored["ownerid"],
+        "content": [{"prompt": c["prompt"], "response": c["response"]} for c in content],
+        "summary": stored["summary"],
+        "dialect": stored["dialect"]
+    }
+    response = {
+        "_id": story_id,
+        "title": stored["title"],
+        "description": stored["description"],
+        "summary": stored["summary"],
+        "complete": False,
+        "content": [{"prompt": c["prompt"], "user": str(c["user"]), "response": c["response"]} for c in content]
+    }
+    return bson.encode(stored), bson.encode(context), bson.encode(response)
+
+
+def _response_from(story):
+    """The /story/continue response body, built the way the handler builds it"""
+    return {
+        "story_id": str(story["_id"]),
+        "title": story.get("title", ""),
+        "description": story.get("description", ""),
+        "character": "Ash",
+        "content": [{"prompt": c.get("prompt", ""), "user": str(c.get("user", "")), "response": c.get("response", "")}
+                    for c in story.get("content", [])],
+        "summary": story.get("summary", ""),
+        "complete": story.get("complete", False),
+        "dialect": "ORIGINAL: quiet coastal gothic"
+    }
+
+
+def _read_paths():
+    adapter = TypeAdapter(ContinueStoryResponse)
+    raw_options = CodecOptions(document_class=RawBSONDocument)
+
+    def read(context_bson, response_bson, options=None):
+        format_story_chunk(bson.decode(context_bson, options).get("content", []))
+        return adapter.dump_json(adapter.validate_python(_response_from(bson.decode(response_bson, options))))
+
+    return {
+        'full': lambda data: read(data[0], data[0]),
+        'projected': lambda data: read(data[1], data[2]),
+        'raw_projected': lambda data: read(data[1], data[2], raw_options)
+    }
+
+
+def _serializers():
+    adapter = TypeAdapter(ContinueStoryResponse)
+    serializers = {
+        # Same arguments as starlette's JSONResponse.render
+        'jsonable_encoder': lambda body: json.dumps(
+            jsonable_encoder(body), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8"),
+        'response_model': lambda body: adapter.dump_json(adapter.validate_python(body))
+    }
+    if orjson is not None:
+        serializers['orjson'] = lambda body: orjson.dumps(jsonable_encoder(body))
+    return serializers
+
+
+def measure(serialize, body, repeat=20):
+    """Median seconds per call, tracemalloc peak bytes of one call, and output size"""
+    output = serialize(body)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(body)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    serialize(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'peak_bytes': peak, 'output_bytes': len(output)}
+
+
+def _create_graphs(results, turns, report_dir, prefix, stage="serialization"):
+    graph_files = []
+    for key, label, scale, unit in (('median_s', 'Median Time', 1000, 'ms'),
+                                    ('peak_bytes', 'Peak Allocation', 1 / 1024, 'KB')):
+        plt.figure(figsize=(10, 6))
+        for name, rows in results.items():
+            plt.plot(turns, [row[key] * scale for row in rows], marker='o', label=name)
+        plt.xlabel('Turns in Story')
+        plt.ylabel(f'{label} ({unit})')
+        plt.title(f'/story/continue {stage.replace("_", " ").title()}: {label}')
+        plt.legend()
+        plt.grid(True)
+        suffix = key.split('_')[0] if stage == "serialization" else f"{stage}_{key.split('_')[0]}"
+        graph_file = report_dir / f"{prefix}_{suffix}.png"
+        plt.savefig(graph_file)
+        plt.close()
+        graph_files.append(str(graph_file))
+    return graph_files
+
+
+def generate_serialization_report(turns=DEFAULT_TURNS, repeat=20, output_dir="load_reports", graph_prefix=None, folder_name=None):
+    """Benchmark every serializer for every story size and write the report"""
+    report_name = folder_name or graph_prefix or "serialization"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "serialization"
+
+    print("=" * 80)
+    print("RESPONSE SERIALIZATION BENCHMARK")
+    print("=" * 80)
+    if orjson is None:
+        print("orjson is not installed; skipping the orjson column")
+
+    serializers = _serializers()
+    results = {name: [] for name in serializers}
+    for n in turns:
+        body = make_story(n)
+        print(f"\n{n} turns:")
+        for name, serialize in serializers.items():
+            row = measure(serialize, body, repeat)
+            row['turns'] = n
+            results[name].append(row)
+            print(f"  {name:<18} {row['median_s'] * 1000:>8.2f}ms  peak {row['peak_bytes'] / 1024:>8.0f}KB  "
+                  f"({row['output_bytes'] / 1024:.0f}KB JSON)")
+
+    print()
+    baseline, typed = results['jsonable_encoder'], results['response_model']
+    for before, after in zip(baseline, typed):
+        symbol = "✓" if after['median_s'] <= before['median_s'] else "✗"
+        print(f"{symbol} {before['turns']} turns: {before['median_s'] * 1000:.2f}ms -> {after['median_s'] * 1000:.2f}ms "
+              f"({before['median_s'] / after['median_s']:.1f}x), peak {before['peak_bytes'] / 1024:.0f}KB -> "
+              f"{after['peak_bytes'] / 1024:.0f}KB")
+
+    print("\nRead path (decode + build + serialize):")
+    read_paths = _read_paths()
+    read_results = {name: [] for name in read_paths}
+    for n in turns:
+        data = make_stored_story(n)
+        print(f"\n{n} turns (BSON read per request: {2 * len(data[0]) / 1024:.0f}KB full, "
+              f"{(len(data[1]) + len(data[2])) / 1024:.0f}KB projected):")
+        for name, read in read_paths.items():
+            row = measure(read, data, repeat)
+            row['turns'] = n
+            read_results[name].append(row)
+            print(f"  {name:<18} {row['median_s'] * 1000:>8.2f}ms  peak {row['peak_bytes'] / 1024:>8.0f}KB")
+
+    print()
+    for before, after in zip(read_results['full'], read_results['projected']):
+        symbol = "✓" if after['median_s'] <= before['median_s'] else "✗"
+        print(f"{symbol} read path {before['turns']} turns: {before['median_s'] * 1000:.2f}ms -> "
+              f"{after['median_s'] * 1000:.2f}ms, peak {before['peak_bytes'] / 1024:.0f}KB -> {after['peak_bytes'] / 1024:.0f}KB")
+
+    graph_files = _create_graphs(results, list(turns), report_dir, prefix)
+    graph_files += _create_graphs(read_results, list(turns), report_dir, prefix, stage="read_path")
+
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("RESPONSE SERIALIZATION BENCHMARK\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Calls per measurement: {repeat} (median time, tracemalloc peak of one call)\n\n")
+        f.write(f"{'Turns':<8}{'JSON':>10}  " + "".join(f"{name:>26}" for name in results) + "\n")
+        f.write("-" * 80 + "\n")
+        for i, n in enumerate(turns):
+            row = f"{n:<8}{baseline[i]['output_bytes'] / 1024:>8.0f}KB  "
+            for rows in results.values():
+                cell = f"{rows[i]['median_s'] * 1000:.2f}ms / {rows[i]['peak_bytes'] / 1024:.0f}KB"
+                row += f"{cell:>26}"
+            f.write(row + "\n")
+        f.write("\nRead path (decode + build + serialize)\n")
+        f.write(f"{'Turns':<8}" + "".join(f"{name:>26}" for name in read_results) + "\n")
+        f.write("-" * 80 + "\n")
+        for i, n in enumerate(turns):
+            row = f"{n:<8}"
+            for rows in read_results.values():
+                cell = f"{rows[i]['median_s'] * 1000:.2f}ms / {rows[i]['peak_bytes'] / 1024:.0f}KB"
+                row += f"{cell:>26}"
+            f.write(row + "\n")
+
+    json_summary = {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'turns': list(turns),
+            'repeat': repeat,
+            'orjson': orjson is not None,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'results': results,
+        'read_path': read_results,
+        'graphs': graph_files
+    }
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    return json_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare /story/continue serialization paths by story size")
+    parser.add_argument('--turns', type=int, nargs='+', default=list(DEFAULT_TURNS))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--prefix', default=None)
+    args = parser.parse_args()
+    generate_serialization_report(args.turns, args.repeat, graph_prefix=args.prefix)
+
+
+if __name__ == "__main__":
+    main()
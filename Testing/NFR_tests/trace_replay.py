@@ -0,0 +1,392 @@
+"""
+Trace-driven replay of recorded storyteller traffic.
+
+Reads a trace written by LLM_API/trace_recorder.py (TRACE_RECORD_PATH) and
+re-drives it against a local stack at 1x, 10x, 100x ... speed, keeping the
+recorded endpoint mix, inter-arrival gaps and request shapes (story length,
+action length). Stories for /story/continue are seeded directly in MongoDB
+with the recorded number of turns and size, and removed afterwards.
+
+Run the service with the fake model so replay measures the service, not Groq:
+    STORYTELLER_FAKE_LLM=1 STORYTELLER_FAKE_LLM_LATENCY=1.0 uvicorn storyteller_fastapi:app
+    python trace_replay.py trace.jsonl --url http://localhost:8000 --speeds 1 10 100
+
+Latency is measured from each request's intended start, as in load_engine.
+When the service exposes /metrics/pool (METRICS_TOKEN set, and the same
+token set here), the MongoDB pool telemetry is reset before and read after
+every speed, so each run shows its own pool peaks.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+import aiohttp
+import matplotlib.pyplot as plt
+import requests
+from bson import ObjectId
+from pymongo import MongoClient
+
+from histogram import LatencyHistogram
+
+
+LLM_URL = os.environ.get("QUEST_LLM_URL", "http://localhost:8000")
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+DEFAULT_SPEEDS = (1, 10, 100)
+FILLER = "the quiet road bends past a ruined tower where crows gather at dusk "
+
+
+def load_trace(path):
+    """Trace records in arrival order, each with 'at' = seconds since the first request"""
+    records = []
+    started = 0.0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if 'trace' in entry:
+                started = entry['started']
+            else:
+                entry['at'] = started + entry['t']
+                records.append(entry)
+    records.sort(key=lambda r: r['at'])
+    if records:
+        origin = records[0]['at']
+        for record in records:
+            record['at'] -= origin
+    return records
+
+
+def summarize_trace(records):
+    """Endpoint mix, inter-arrival gaps and recorded service times"""
+    gaps = [b['at'] - a['at'] for a, b in zip(records, records[1:])]
+    endpoints = {}
+    for record in records:
+        entry = endpoints.setdefault(record['ep'], {'count': 0, 'histogram': LatencyHistogram()})
+        entry['count'] += 1
+        entry['histogram'].record(record['d'])
+    return {
+        'requests': len(records),
+        'duration': records[-1]['at'] if records else 0,
+        'mean_gap': statistics.mean(gaps) if gaps else 0,
+        'median_gap': statistics.median(gaps) if gaps else 0,
+        'endpoints': {
+            name: {
+                'count': entry['count'],
+                'share': entry['count'] / len(records) * 100,
+                'recorded_p50': entry['histogram'].percentile(50),
+                'recorded_p95': entry['histogram'].percentile(95)
+            } for name, entry in sorted(endpoints.items())
+        }
+    }
+
+
+def _filler(length):
+    return (FILLER * (length // len(FILLER) + 1))[:length]
+
+
+def seed_stories(records, mongo_uri=MONGO_URI, db_name="test"):
+    """
+    Insert one story per /story/continue record, shaped like the recorded one.
+    Returns (run_id, {record index: (story_id, user_id)}); delete with cleanup_stories.
+    """
+    run_id = uuid.uuid4().hex
+    user_id = ObjectId()
+    documents, targets = [], {}
+    for index, record in enumerate(records):
+        if record['ep'] != "/story/continue":
+            continue
+        shape = record.get('shape', {})
+        turns = shape.get('turns', 0)
+        # format_story_chunk writes "prompt: response" per turn, joined by newlines
+        turn_chars = max(shape.get('story_chars', 0) - max(turns - 1, 0), 0) // turns if turns else 0
+        prompt = _filler(min(40, turn_chars))
+        response = _filler(max(turn_chars - len(prompt) - 2, 0))
+        story_id = ObjectId()
+        documents.append({
+            '_id': story_id,
+            'title': "Trace replay story",
+            'description': "Seeded by trace_replay.py",
+            'dialect': "ORIGINAL: plain narrative",
+            'summary': _filler(shape.get('summary_chars', 0)),
+            'content': [{'prompt': prompt, 'user': user_id, 'response': response} for _ in range(turns)],
+            'ownerid': [{'owner': user_id, 'character': "Ash"}],
+            'complete': False,
+            'trace_replay_run': run_id
+        })
+        targets[index] = (str(story_id), str(user_id))
+
+    if documents:
+        with MongoClient(mongo_uri) as client:
+            collection = client[db_name]["stories"]
+            for start in range(0, len(documents), 1000):
+                collection.insert_many(documents[start:start + 1000], ordered=False)
+    return run_id, targets
+
+
+def cleanup_stories(run_id, mongo_uri=MONGO_URI, db_name="test"):
+    with MongoClient(mongo_uri) as client:
+        return client[db_name]["stories"].delete_many({'trace_replay_run': run_id}).deleted_count
+
+
+def _request_for(record, target, api_key):
+    """(method, path, json body) reproducing the recorded request shape"""
+    shape = record.get('shape', {})
+    if record['ep'] == "/story/new":
+        return "POST", "/story/new", {
+            'name': _filler(shape.get('name_chars', 20)),
+            'description': _filler(shape.get('description_chars', 200)),
+            'owner': {'owner': str(ObjectId()), 'character': _filler(shape.get('character_chars', 3))},
+            'api_key': api_key
+        }
+    if record['ep'] == "/story/continue":
+        story_id, user_id = target
+        return "POST", "/story/continue", {
+            'story_id': story_id,
+            'user_id': user_id,
+            'user_action': _filler(shape.get('action_chars', 30)),
+            'api_key': api_key
+        }
+    return record['m'], record['ep'], None
+
+
+async def _send(session, base_url, method, path, body, timeout, scheduled):
+    sent = time.perf_counter()
+    try:
+        async with session.request(method, base_url + path, json=body,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            await response.read()
+            error = None if response.status < 400 else f"HTTP {response.status}"
+    except asyncio.TimeoutError:
+        error = "Timeout"
+    except aiohttp.ClientError as e:
+        error = str(e) or type(e).__name__
+    now = time.perf_counter()
+    return path, now - scheduled, now - sent, sent - scheduled, error
+
+
+async def _replay(records, targets, base_url, speed, api_key, timeout, connection_limit):
+    stats = {}
+    lags = []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connection_limit)) as session:
+        origin = time.perf_counter() + 0.1
+        tasks = []
+        for index, record in enumerate(records):
+            if record['ep'] == "<unmatched>":
+                continue
+            method, path, body = _request_for(record, targets.get(index), api_key)
+            scheduled = origin + record['at'] / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(session, base_url, method, path, body, timeout, scheduled)))
+        for path, latency, service_time, lag, error in await asyncio.gather(*tasks):
+            entry = stats.setdefault(path, {'histogram': LatencyHistogram(), 'service': LatencyHistogram(),
+                                            'count': 0, 'failed': 0, 'errors': {}})
+            entry['count'] += 1
+            lags.append(lag)
+            if error is None:
+                entry['histogram'].record(latency)
+                entry['service'].record(service_time)
+            else:
+                entry['failed'] += 1
+                entry['errors'][error] = entry['errors'].get(error, 0) + 1
+        wall_time = time.perf_counter() - origin
+
+    endpoints = {}
+    for path, entry in sorted(stats.items()):
+        successful = entry['count'] - entry['failed']
+        endpoints[path] = {
+            'count': entry['count'],
+            'successful': successful,
+            'success_rate': successful / entry['count'] * 100 if entry['count'] else 0,
+            **entry['histogram'].summary(),
+            'service_p95': entry['service'].percentile(95),
+            'errors': entry['errors']
+        }
+    return {
+        'speed': speed,
+        'requests': sum(e['count'] for e in endpoints.values()),
+        'wall_time': wall_time,
+        'max_send_lag': max(lags) if lags else 0,
+        'endpoints': endpoints
+    }
+
+
+def replay_trace(records, base_url=LLM_URL, speed=1, mongo_uri=MONGO_URI, api_key="trace-replay",
+                 timeout=120, connection_limit=1000):
+    """Seed stories, replay the trace at `speed` times real time and clean up"""
+    run_id, targets = seed_stories(records, mongo_uri)
+    try:
+        return asyncio.run(_replay(records, targets, base_url, speed, api_key, timeout, connection_limit))
+    finally:
+        cleanup_stories(run_id, mongo_uri)
+
+
+def pool_metrics(base_url, reset=False):
+    """Service-side Mongo pool telemetry, or None if the service does not expose it"""
+    headers = {'X-Metrics-Token': os.environ.get('METRICS_TOKEN', '')}
+    try:
+        if reset:
+            requests.post(f"{base_url}/metrics/pool/reset", headers=headers, timeout=5)
+            return None
+        response = requests.get(f"{base_url}/metrics/pool", headers=headers, timeout=5)
+        return response.json() if response.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def _pool_lines(pool):
+    """One summary line per Mongo server pool"""
+    lines = []
+    for address, stats in (pool or {}).get('pools', {}).items():
+        lines.append(f"Mongo pool {address}: peak in use {stats['max_in_use']}/{stats['max_pool_size']}, "
+                     f"peak waiting {stats['max_waiting']}, checkout P95 {stats['checkout_ms']['p95']:.1f}ms, "
+                     f"failed checkouts {sum(stats['checkout_failures'].values())}")
+    return lines
+
+
+def _create_speed_graph(runs, report_dir, prefix):
+    """P50/P95 per endpoint against replay speed"""
+    plt.figure(figsize=(10, 6))
+    endpoints = sorted({path for run in runs for path in run['endpoints']})
+    speeds = [run['speed'] for run in runs]
+    for path in endpoints:
+        rows = [run['endpoints'].get(path) for run in runs]
+        line = plt.plot(speeds, [r['median_response_time'] if r else None for r in rows], 'o-', label=f"{path} P50")
+        plt.plot(speeds, [r['p95_response_time'] if r else None for r in rows], 'o--',
+                 color=line[0].get_color(), label=f"{path} P95")
+    plt.xscale('log')
+    plt.xticks(speeds, [f"{s}x" for s in speeds])
+    plt.xlabel('Replay Speed')
+    plt.ylabel('Response Time (seconds)')
+    plt.title('Latency per Endpoint vs Replay Speed')
+    plt.legend()
+    plt.grid(True)
+
+    graph_file = report_dir / f"{prefix}_speeds.png"
+    plt.savefig(graph_file)
+    plt.close()
+    return str(graph_file)
+
+
+def generate_trace_replay_report(
+    trace_path,
+    base_url=LLM_URL,
+    speeds=DEFAULT_SPEEDS,
+    mongo_uri=MONGO_URI,
+    max_duration=None,
+    output_dir="load_reports",
+    graph_prefix=None,
+    folder_name=None
+):
+    """
+    Replay a recorded trace at each speed and compare per-endpoint latency.
+    max_duration (seconds of recorded time) truncates long traces.
+    """
+    report_name = folder_name or graph_prefix or "trace_replay"
+    report_dir = Path(output_dir) / f"{report_name}_report"
+    report_dir.mkdir(parents=True, exist_ok=True)
+    prefix = graph_prefix or "trace_replay"
+
+    records = load_trace(trace_path)
+    if max_duration is not None:
+        records = [r for r in records if r['at'] <= max_duration]
+    trace = summarize_trace(records)
+
+    print("=" * 80)
+    print("TRACE REPLAY REPORT")
+    print("=" * 80)
+    print(f"Trace: {trace_path} ({trace['requests']} requests over {trace['duration']:.1f}s)")
+    print(f"Target URL: {base_url}")
+    for path, entry in trace['endpoints'].items():
+        print(f"  {path}: {entry['count']} ({entry['share']:.1f}%), recorded P95 {entry['recorded_p95']:.3f}s")
+
+    runs = []
+    for speed in speeds:
+        print(f"\nReplaying at {speed}x ({trace['duration'] / speed:.1f}s)...")
+        pool_metrics(base_url, reset=True)
+        run = replay_trace(records, base_url, speed, mongo_uri)
+        run['pool'] = pool_metrics(base_url)
+        runs.append(run)
+        for path, entry in run['endpoints'].items():
+            print(f"  {path}: {entry['success_rate']:.1f}% ok, P50 {entry['median_response_time']:.3f}s, "
+                  f"P95 {entry['p95_response_time']:.3f}s")
+        for line in _pool_lines(run['pool']):
+            print(f"  {line}")
+        if run['max_send_lag'] > 0.1:
+            print(f"  ⚠ Replayer fell behind schedule by up to {run['max_send_lag']:.2f}s")
+
+    graph_file = _create_speed_graph(runs, report_dir, prefix) if runs else None
+
+    summary_file = report_dir / f"{prefix}_summary.txt"
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("TRACE REPLAY REPORT\n")
+        f.write("=" * 80 + "\n\n")
+        f.write(f"Trace: {trace_path}\n")
+        f.write(f"Requests: {trace['requests']} over {trace['duration']:.1f}s  "
+                f"Mean gap: {trace['mean_gap']:.3f}s  Median gap: {trace['median_gap']:.3f}s\n\n")
+        f.write("RECORDED MIX\n")
+        f.write(f"{'Endpoint':<20} {'Count':<8} {'Share%':<8} {'P50(s)':<10} {'P95(s)':<10}\n")
+        f.write("-" * 80 + "\n")
+        for path, entry in trace['endpoints'].items():
+            f.write(f"{path:<20} {entry['count']:<8} {entry['share']:<8.1f} "
+                    f"{entry['recorded_p50']:<10.3f} {entry['recorded_p95']:<10.3f}\n")
+        for run in runs:
+            f.write(f"\nREPLAY AT {run['speed']}x  (wall time {run['wall_time']:.1f}s, "
+                    f"max send lag {run['max_send_lag']:.3f}s)\n")
+            f.write(f"{'Endpoint':<20} {'Count':<8} {'Success%':<10} {'P50(s)':<10} {'P95(s)':<10} {'P99(s)':<10}\n")
+            f.write("-" * 80 + "\n")
+            for path, entry in run['endpoints'].items():
+                f.write(f"{path:<20} {entry['count']:<8} {entry['success_rate']:<10.1f} "
+                        f"{entry['median_response_time']:<10.3f} {entry['p95_response_time']:<10.3f} "
+                        f"{entry['p99_response_time']:<10.3f}\n")
+                for error, count in entry['errors'].items():
+                    f.write(f"    {error}: {count}\n")
+            for line in _pool_lines(run['pool']):
+                f.write(f"{line}\n")
+
+    json_summary = {
+        'metadata': {
+            'trace': str(trace_path),
+            'url': base_url,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'speeds': list(speeds),
+            'max_duration': max_duration,
+            'report_folder': str(report_dir),
+            'test_name': report_name
+        },
+        'trace': trace,
+        'runs': runs,
+        'graphs': [graph_file] if graph_file else []
+    }
+    json_file = report_dir / f"{prefix}_summary.json"
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(json_summary, f, indent=2, ensure_ascii=False)
+
+    print(f"\nReport saved to: {report_dir}")
+    print(f"Summary: {summary_file}")
+    print(f"JSON: {json_file}")
+    return json_summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded storyteller trace")
+    parser.add_argument('trace', help="File written with TRACE_RECORD_PATH")
+    parser.add_argument('--url', default=LLM_URL)
+    parser.add_argument('--speeds', type=float, nargs='+', default=list(DEFAULT_SPEEDS))
+    parser.add_argument('--mongo-uri', default=MONGO_URI)
+    parser.add_argument('--max-duration', type=float, default=None)
+    parser.add_argument('--prefix', default=None)
+    args = parser.parse_args()
+    speeds = [int(s) if s == int(s) else s for s in args.speeds]
+    generate_trace_replay_report(args.trace, args.url, speeds, args.mongo_uri, args.max_duration,
+                                 graph_prefix=args.prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Event-driven waits shared by the Selenium NFR tests.
+
+Each wait returns as soon as the condition it watches for holds (URL change,
+DOM quiet, network idle, or any predicate) instead of sleeping a fixed time.
+Waits that check for "something happened" return True/False rather than
+raising, so tests can treat a timeout as the negative outcome.
+"""
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+DEFAULT_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+# Records the time of the last DOM mutation and counts fetch/XHR requests in
+# flight. Installed once per document; a navigation discards it.
+_INSTRUMENT_SCRIPT = """
+if (!window.__nfrWaits) {
+    const state = window.__nfrWaits = {lastMutation: performance.now(), inflight: 0};
+    new MutationObserver(() => { state.lastMutation = performance.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function() {
+            state.inflight++;
+            return originalFetch.apply(this, arguments).finally(() => { state.inflight--; });
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        state.inflight++;
+        this.addEventListener('loadend', () => { state.inflight--; }, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+_STATE_SCRIPT = """
+const state = window.__nfrWaits;
+const resources = performance.getEntriesByType('resource');
+const lastResponse = resources.reduce((latest, entry) => Math.max(latest, entry.responseEnd), 0);
+return {
+    now: performance.now(),
+    ready: document.readyState === 'complete',
+    lastMutation: state ? state.lastMutation : null,
+    inflight: state ? state.inflight : 0,
+    lastResponse: lastResponse
+};
+"""
+
+
+def until(driver, predicate, timeout=DEFAULT_TIMEOUT, poll=POLL_INTERVAL):
+    """Wait for predicate(driver) to be truthy and return its value; raises TimeoutException"""
+    return WebDriverWait(driver, timeout, poll_frequency=poll).until(predicate)
+
+
+def wait_for(driver, predicate, timeout=DEFAULT_TIMEOUT, poll=POLL_INTERVAL):
+    """Like until(), but returns False instead of raising on timeout"""
+    try:
+        return until(driver, predicate, timeout, poll)
+    except TimeoutException:
+        return False
+
+
+def wait_for_url_change(driver, old_url, timeout=DEFAULT_TIMEOUT):
+    """True once the current URL differs from old_url"""
+    return bool(wait_for(driver, lambda d: d.current_url != old_url, timeout))
+
+
+def wait_for_url(driver, url, timeout=DEFAULT_TIMEOUT):
+    """True once the browser is on url"""
+    return bool(wait_for(driver, lambda d: d.current_url == url, timeout))
+
+
+def wait_for_page_ready(driver, timeout=DEFAULT_TIMEOUT):
+    """True once document.readyState is complete"""
+    return bool(wait_for(driver, lambda d: d.execute_script("return document.readyState") == 'complete', timeout))
+
+
+def instrument(driver):
+    """Install the mutation and request trackers into the current document"""
+    driver.execute_script(_INSTRUMENT_SCRIPT)
+
+
+def _quiet(driver, quiet_ms, network):
+    state = driver.execute_script(_STATE_SCRIPT)
+    if state['lastMutation'] is None:
+        # New document since the last check: instrument it and start over
+        instrument(driver)
+        return False
+    if not state['ready'] or state['now'] - state['lastMutation'] < quiet_ms:
+        return False
+    if network and (state['inflight'] > 0 or state['now'] - state['lastResponse'] < quiet_ms):
+        return False
+    return True
+
+
+def wait_for_dom_stable(driver, quiet_ms=300, timeout=DEFAULT_TIMEOUT):
+    """True once the document has loaded and not mutated for quiet_ms"""
+    return bool(wait_for(driver, lambda d: _quiet(d, quiet_ms, network=False), timeout))
+
+
+def wait_for_network_idle(driver, quiet_ms=500, timeout=DEFAULT_TIMEOUT):
+    """
+    True once no fetch/XHR is in flight, no resource finished within quiet_ms
+    and the DOM has been quiet for quiet_ms.
+    """
+    return bool(wait_for(driver, lambda d: _quiet(d, quiet_ms, network=True), timeout))
+
+
+def wait_for_settled(driver, old_url=None, quiet_ms=300, timeout=DEFAULT_TIMEOUT):
+    """
+    After an interaction: wait until the page has either navigated away from
+    old_url or gone network-idle. Returns True if the URL changed. Call
+    instrument() before the interaction so requests it starts are tracked.
+    """
+    def settled(d):
+        if old_url is not None and d.current_url != old_url:
+            return 'navigated'
+        return _quiet(d, quiet_ms, network=True) and 'idle'
+
+    return wait_for(driver, settled, timeout) == 'navigated'
@@ -0,0 +1,130 @@
+import gzip
+
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, make_encoder, negotiate
+
+PROSE = "The lamp turns above the stairwell and the sea answers below. " * 100
+
+
+def make_client(encoders=None):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1000, encoders=encoders)
+
+    @app.get("/story")
+    async def story():
+        return {"response": PROSE}
+
+    @app.get("/small")
+    async def small():
+        return {"status": "healthy"}
+
+    @app.get("/binary")
+    async def binary():
+        return PlainTextResponse(PROSE, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield PROSE
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def raw_get(client, path, accept):
+    """GET without letting the client decode the body"""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+ENCODERS = {"zstd": make_encoder("zstd"), "gzip": make_encoder("gzip")}
+
+
+class TestNegotiate:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_server_preference_on_equal_q(self):
+        """Codings with the same q go to the server's order, so zstd beats gzip."""
+        assert negotiate("gzip, deflate, br, zstd", ENCODERS) == "zstd"
+
+    @pytest.mark.happy_path
+    def test_highest_q_wins(self):
+        """A client preference expressed through q-values overrides the server order."""
+        assert negotiate("zstd;q=0.5, gzip;q=0.9", ENCODERS) == "gzip"
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_q_zero_refuses_coding(self):
+        """q=0 excludes a coding even when the wildcard would allow it."""
+        assert negotiate("zstd;q=0, *", ENCODERS) == "gzip"
+
+    @pytest.mark.edge_case
+    def test_no_acceptable_coding(self):
+        """No header, identity only, or unknown codings mean no compression."""
+        assert negotiate("", ENCODERS) is None
+        assert negotiate("identity", ENCODERS) is None
+        assert negotiate("compress, deflate", ENCODERS) is None
+
+
+class TestCompressionMiddleware:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_large_json_compressed_with_zstd(self):
+        """A story body above the threshold is zstd-compressed when the client accepts it."""
+        response, body = raw_get(make_client(ENCODERS), "/story", "gzip, zstd")
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(body)
+        assert PROSE in zstandard.ZstdDecompressor().decompress(body).decode()
+        assert len(body) < len(PROSE) / 5
+
+    @pytest.mark.happy_path
+    def test_gzip_only_client(self):
+        """Clients that only know gzip (e.g. axios) get gzip."""
+        response, body = raw_get(make_client(ENCODERS), "/story", "gzip, compress, deflate, br")
+        assert response.headers["content-encoding"] == "gzip"
+        assert PROSE in gzip.decompress(body).decode()
+
+    @pytest.mark.happy_path
+    def test_streaming_response_compressed(self):
+        """Streamed bodies are compressed chunk by chunk into one valid stream."""
+        response, body = raw_get(make_client(ENCODERS), "/stream", "gzip")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(body).decode() == PROSE * 3
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_small_body_not_compressed(self):
+        """Bodies under the threshold pass through but still vary by Accept-Encoding."""
+        response, body = raw_get(make_client(ENCODERS), "/small", "zstd")
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert body == b'{"status":"healthy"}'
+
+    @pytest.mark.edge_case
+    def test_incompressible_type_untouched(self):
+        """Only JSON and text are compressed."""
+        response, _ = raw_get(make_client(ENCODERS), "/binary", "zstd")
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    @pytest.mark.edge_case
+    def test_without_accept_encoding(self):
+        """Clients that accept no coding get the identity body."""
+        response, body = raw_get(make_client(ENCODERS), "/story", "identity")
+        assert "content-encoding" not in response.headers
+        assert PROSE in body.decode()
+
+    @pytest.mark.edge_case
+    def test_app_decodes_transparently(self):
+        """The storyteller app is wrapped, and a decoding client sees the original JSON."""
+        import storyteller_fastapi
+        assert any(m.cls is CompressionMiddleware for m in storyteller_fastapi.app.user_middleware)
+        assert make_client().get("/story").json() == {"response": PROSE}
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, patch, MagicMock
 from bson import ObjectId
 from fastapi import HTTPException
 
+import storyteller_fastapi
 from storyteller_fastapi import continue_story_api, ContinueStoryRequest
 
 @pytest.mark.asyncio
@@ -771,3 +772,67 @@ class TestContinueStoryApi:
             assert result["title"] == ""      # defaults safely
             assert result["description"] == ""  # defaults safely
             assert result["content"][-1]["response"] == "OK"
+
+    @pytest.mark.edge_case
+    async def test_continue_story_reads_with_projections(self):
+        """
+        Both story reads pass a projection, so the server returns only the fields the handler uses.
+        """
+        story_id = str(ObjectId())
+        user_id = str(ObjectId())
+        story = {
+            "_id": ObjectId(story_id),
+            "ownerid": [{"owner": ObjectId(user_id), "character": "Hero"}],
+            "summary": "",
+            "content": [{"prompt": "Act", "user": user_id, "response": "OK"}],
+            "complete": False
+        }
+
+        with patch("storyteller_fastapi.story_collection") as mock_collection, \
+             patch("storyteller_fastapi.story_chain") as mock_story_chain:
+            mock_collection.find_one = AsyncMock(side_effect=[story, story])
+            mock_collection.update_one = AsyncMock()
+            mock_story_chain.ainvoke = AsyncMock(return_value="OK")
+
+            req = ContinueStoryRequest(story_id=story_id, user_id=user_id, user_action="Act", api_key="test")
+            result = await continue_story_api(req)
+
+            first, second = mock_collection.find_one.await_args_list
+            assert first.args[1] == storyteller_fastapi.STORY_CONTEXT_PROJECTION
+            assert second.args[1] == storyteller_fastapi.STORY_RESPONSE_PROJECTION
+            # Ids converted by the server projection pass through unchanged
+            assert result["content"][-1]["user"] == user_id
+
+    @pytest.mark.edge_case
+    async def test_continue_story_summarization_trims_on_server(self):
+        """
+        Summarization drops the summarized turns with an update pipeline instead of writing the rest back.
+        """
+        story_id = str(ObjectId())
+        user_id = str(ObjectId())
+        story = {
+            "_id": ObjectId(story_id),
+            "ownerid": [{"owner": ObjectId(user_id), "character": "Hero"}],
+            "summary": "",
+            "content": [{"prompt": f"Act {i}", "response": "OK"} for i in range(16)],
+            "complete": False
+        }
+
+        with patch("storyteller_fastapi.story_collection") as mock_collection, \
+             patch("storyteller_fastapi.story_chain") as mock_story_chain, \
+             patch("storyteller_fastapi.summary_chain") as mock_summary_chain:
+            mock_collection.find_one = AsyncMock(side_effect=[story, story])
+            mock_collection.update_one = AsyncMock()
+            mock_story_chain.ainvoke = AsyncMock(return_value="OK")
+            mock_summary_chain.ainvoke = AsyncMock(return_value="Summary")
+
+            req = ContinueStoryRequest(story_id=story_id, user_id=user_id, user_action="Act", api_key="test")
+            await continue_story_api(req)
+
+            trim = mock_collection.update_one.await_args_list[0].args[1]
+            assert trim == [{"$set": {
+                "summary": "Summary",
+                "content": {"$slice": ["$content", 10, {"$size": "$content"}]}
+            }}]
+            context = mock_story_chain.ainvoke.await_args.args[0]["story_so_far"]
+            assert "Act 9:" not in context and "Act 10: OK" in context
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from llm_cassette import CassetteLLM, CassetteMissError, with_cassette
+
+prompt = PromptTemplate(input_variables=["action"], template="Continue the story: {action}")
+
+
+def chain(llm):
+    return prompt | llm | StrOutputParser()
+
+
+def record(directory, text="The door creaks open.", sleep=None):
+    real = FakeListChatModel(responses=[text], sleep=sleep)
+    return chain(CassetteLLM(real, "test-model", "record", directory)).invoke({"action": "open door"})
+
+
+class TestLlmCassette:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_record_then_replay_returns_same_completion(self, tmp_path):
+        """A recorded completion is served back in replay mode without the real model."""
+        assert record(tmp_path) == "The door creaks open."
+        replay = chain(CassetteLLM(None, "test-model", "replay", tmp_path, speed=0))
+        assert replay.invoke({"action": "open door"}) == "The door creaks open."
+
+    @pytest.mark.happy_path
+    @pytest.mark.asyncio
+    async def test_async_replay_streams_recorded_chunks(self, tmp_path):
+        """astream yields the recorded chunks in order."""
+        record(tmp_path, text="abc")
+        replay = chain(CassetteLLM(None, "test-model", "replay", tmp_path, speed=0))
+        chunks = [chunk async for chunk in replay.astream({"action": "open door"})]
+        assert chunks == ["a", "b", "c"]
+
+    @pytest.mark.happy_path
+    def test_replay_reproduces_recorded_latency(self, tmp_path):
+        """Replay at speed 1 takes about as long as the recording, and speed 0 is instant."""
+        record(tmp_path, text="abcd", sleep=0.05)
+        start = time.perf_counter()
+        chain(CassetteLLM(None, "test-model", "replay", tmp_path, speed=1)).invoke({"action": "open door"})
+        assert time.perf_counter() - start >= 0.15
+
+        start = time.perf_counter()
+        chain(CassetteLLM(None, "test-model", "replay", tmp_path, speed=0)).invoke({"action": "open door"})
+        assert time.perf_counter() - start < 0.05
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_unrecorded_prompt_raises(self, tmp_path):
+        """Replay is exact-match on the rendered prompt."""
+        record(tmp_path)
+        replay = chain(CassetteLLM(None, "test-model", "replay", tmp_path))
+        with pytest.raises(CassetteMissError):
+            replay.invoke({"action": "close door"})
+
+    @pytest.mark.edge_case
+    def test_key_depends_on_model(self, tmp_path):
+        """The same prompt recorded for another model is not replayed."""
+        record(tmp_path)
+        replay = chain(CassetteLLM(None, "other-model", "replay", tmp_path))
+        with pytest.raises(CassetteMissError):
+            replay.invoke({"action": "open door"})
+
+    @pytest.mark.edge_case
+    def test_with_cassette_off_returns_model(self, monkeypatch):
+        """With cassettes off the real model is used unchanged."""
+        monkeypatch.delenv("LLM_CASSETTE_MODE", raising=False)
+        model = FakeListChatModel(responses=["x"])
+        assert with_cassette(lambda: model, "test-model") is model
+
+    @pytest.mark.edge_case
+    def test_with_cassette_replay_does_not_build_model(self, monkeypatch):
+        """Replay mode never constructs the provider client."""
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "replay")
+
+        def build():
+            raise AssertionError("model built in replay mode")
+
+        assert isinstance(with_cassette(build, "test-model"), CassetteLLM)
+
+    @pytest.mark.edge_case
+    def test_invalid_mode_rejected(self, monkeypatch):
+        """Typos in LLM_CASSETTE_MODE fail loudly instead of silently calling the provider."""
+        monkeypatch.setenv("LLM_CASSETTE_MODE", "sometimes")
+        with pytest.raises(ValueError):
+            with_cassette(lambda: None, "test-model")
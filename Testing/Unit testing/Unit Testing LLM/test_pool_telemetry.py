@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import monitoring
+
+import storyteller_fastapi
+from pool_telemetry import PoolTelemetry
+
+ADDRESS = ("localhost", 27017)
+
+
+def checkout(telemetry, connection_id, seconds):
+    telemetry.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    telemetry.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, seconds))
+
+
+def checkin(telemetry, connection_id):
+    telemetry.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, connection_id))
+
+
+class TestPoolTelemetry:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_tracks_in_use_and_peaks(self):
+        """In-use connections rise on checkout and fall on checkin; the peak is kept."""
+        telemetry = PoolTelemetry()
+        telemetry.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 4}))
+        for i in range(3):
+            checkout(telemetry, i, 0.001)
+        checkin(telemetry, 0)
+
+        pool = telemetry.snapshot()["localhost:27017"]
+        assert pool["in_use"] == 2
+        assert pool["max_in_use"] == 3
+        assert pool["checkouts"] == 3
+        assert pool["max_pool_size"] == 4
+        assert pool["peak_utilization"] == 75.0
+
+    @pytest.mark.happy_path
+    def test_wait_queue_depth(self):
+        """Checkouts that started but have not completed count as waiting."""
+        telemetry = PoolTelemetry()
+        for _ in range(5):
+            telemetry.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        telemetry.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.002))
+
+        pool = telemetry.snapshot()["localhost:27017"]
+        assert pool["waiting"] == 4
+        assert pool["max_waiting"] == 5
+
+    @pytest.mark.happy_path
+    def test_checkout_latency_percentiles(self):
+        """Checkout durations land in millisecond buckets; percentiles never exceed the max."""
+        telemetry = PoolTelemetry()
+        for i in range(99):
+            checkout(telemetry, i, 0.0005)
+        checkout(telemetry, 99, 0.3)
+
+        latency = telemetry.snapshot()["localhost:27017"]["checkout_ms"]
+        assert latency["p50"] == 0.5
+        assert latency["p99"] == 0.5
+        assert latency["max"] == pytest.approx(300)
+        assert latency["p50"] <= latency["p95"] <= latency["max"]
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_failed_checkouts_by_reason(self):
+        """Wait-queue timeouts are counted per reason and leave the queue."""
+        telemetry = PoolTelemetry()
+        telemetry.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        telemetry.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, "timeout", 1.0))
+
+        pool = telemetry.snapshot()["localhost:27017"]
+        assert pool["checkout_failures"] == {"timeout": 1}
+        assert pool["waiting"] == 0
+
+    @pytest.mark.edge_case
+    def test_default_pool_size_when_not_configured(self):
+        """PoolCreatedEvent omits default options, so the driver default of 100 is assumed."""
+        telemetry = PoolTelemetry()
+        telemetry.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+        assert telemetry.snapshot()["localhost:27017"]["max_pool_size"] == 100
+
+    @pytest.mark.edge_case
+    def test_reset_keeps_current_levels(self):
+        """Reset zeroes counters but connections still checked out stay in use."""
+        telemetry = PoolTelemetry()
+        checkout(telemetry, 1, 0.001)
+        checkout(telemetry, 2, 0.001)
+        checkin(telemetry, 1)
+        telemetry.reset()
+
+        pool = telemetry.snapshot()["localhost:27017"]
+        assert pool["checkouts"] == 0
+        assert pool["in_use"] == 1
+        assert pool["max_in_use"] == 1
+
+    @pytest.mark.edge_case
+    def test_pool_metrics_endpoint(self, monkeypatch):
+        """/metrics/pool reports the configured options and the listener's snapshot."""
+        telemetry = PoolTelemetry()
+        checkout(telemetry, 1, 0.001)
+        monkeypatch.setattr(storyteller_fastapi, "pool_telemetry", telemetry)
+        monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "50")
+        monkeypatch.setenv("METRICS_TOKEN", "secret")
+
+        data = TestClient(storyteller_fastapi.app).get("/metrics/pool", headers={"X-Metrics-Token": "secret"}).json()
+        assert data["config"] == {"maxPoolSize": 50}
+        assert data["pools"]["localhost:27017"]["in_use"] == 1
+
+    @pytest.mark.edge_case
+    def test_pool_metrics_require_token(self, monkeypatch):
+        """The metrics routes are hidden without METRICS_TOKEN and reject a missing or wrong token."""
+        telemetry = PoolTelemetry()
+        checkout(telemetry, 1, 0.001)
+        monkeypatch.setattr(storyteller_fastapi, "pool_telemetry", telemetry)
+        client = TestClient(storyteller_fastapi.app)
+
+        monkeypatch.delenv("METRICS_TOKEN", raising=False)
+        assert client.get("/metrics/pool").status_code == 404
+        assert client.post("/metrics/pool/reset").status_code == 404
+
+        monkeypatch.setenv("METRICS_TOKEN", "secret")
+        assert client.get("/metrics/pool").status_code == 401
+        assert client.post("/metrics/pool/reset", headers={"X-Metrics-Token": "wrong"}).status_code == 401
+        assert telemetry.snapshot()["localhost:27017"]["checkouts"] == 1
+
+    @pytest.mark.edge_case
+    def test_pool_options_from_environment(self, monkeypatch):
+        """Only pool variables that are set are passed to the driver."""
+        monkeypatch.setenv("MONGO_MIN_POOL_SIZE", "5")
+        monkeypatch.setenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "250")
+        monkeypatch.delenv("MONGO_MAX_POOL_SIZE", raising=False)
+        assert storyteller_fastapi.mongo_pool_options() == {"minPoolSize": 5, "waitQueueTimeoutMS": 250}
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import storyteller_fastapi
+from storyteller_fastapi import app
+
+
+@pytest.fixture
+def client():
+    """Test client without the lifespan, so no background warm-up runs."""
+    storyteller_fastapi.readiness_cache.clear()
+    yield TestClient(app)
+    storyteller_fastapi.readiness_cache.clear()
+
+
+def mongo_client(side_effect=None):
+    mock = MagicMock()
+    mock.admin.command = AsyncMock(return_value={"ok": 1}, side_effect=side_effect)
+    return mock
+
+
+async def provider_ok():
+    return {"status_code": 401}
+
+
+class TestReadinessCheck:
+    # ------------------- HAPPY PATHS -------------------
+    @pytest.mark.happy_path
+    def test_ready_when_dependencies_answer(self, client):
+        """200 with per-check latency when Mongo and the provider both answer."""
+        with patch("storyteller_fastapi.get_mongo_client", return_value=mongo_client()), \
+             patch.dict(storyteller_fastapi.READY_CHECKS, {"llm_provider": provider_ok}):
+            response = client.get("/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["checks"]["mongo"]["ok"] is True
+        assert data["checks"]["mongo"]["latency_ms"] >= 0
+        assert data["checks"]["llm_provider"]["status_code"] == 401
+
+    @pytest.mark.happy_path
+    def test_results_are_cached_between_probes(self, client):
+        """Frequent polling reuses the cached result instead of pinging Mongo each time."""
+        mongo = mongo_client()
+        with patch("storyteller_fastapi.get_mongo_client", return_value=mongo), \
+             patch.dict(storyteller_fastapi.READY_CHECKS, {"llm_provider": provider_ok}):
+            for _ in range(10):
+                assert client.get("/ready").status_code == 200
+        assert mongo.admin.command.await_count == 1
+
+    @pytest.mark.happy_path
+    def test_provider_skipped_with_fake_model(self, client, monkeypatch):
+        """With the fake model the provider is not contacted."""
+        monkeypatch.setenv("STORYTELLER_FAKE_LLM", "1")
+        with patch("storyteller_fastapi.get_mongo_client", return_value=mongo_client()), \
+             patch("storyteller_fastapi.get_provider_http_clients") as clients:
+            response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["checks"]["llm_provider"]["skipped"] == "fake model"
+        clients.assert_not_called()
+
+    # ------------------- EDGE CASES -------------------
+    @pytest.mark.edge_case
+    def test_not_ready_when_mongo_fails(self, client):
+        """A failing ping makes the instance not ready and reports the error."""
+        with patch("storyteller_fastapi.get_mongo_client",
+                   return_value=mongo_client(side_effect=ConnectionError("connection refused"))), \
+             patch.dict(storyteller_fastapi.READY_CHECKS, {"llm_provider": provider_ok}):
+            response = client.get("/ready")
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert data["checks"]["mongo"]["ok"] is False
+        assert "connection refused" in data["checks"]["mongo"]["error"]
+
+    @pytest.mark.edge_case
+    def test_not_ready_when_mongo_times_out(self, client, monkeypatch):
+        """A ping that does not answer within READY_TIMEOUT counts as a failure."""
+        async def hang(*args):
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(storyteller_fastapi, "READY_TIMEOUT", 0.05)
+        mongo = MagicMock()
+        mongo.admin.command = hang
+        with patch("storyteller_fastapi.get_mongo_client", return_value=mongo), \
+             patch.dict(storyteller_fastapi.READY_CHECKS, {"llm_provider": provider_ok}):
+            response = client.get("/ready")
+        assert response.status_code == 503
+        assert "no answer" in response.json()["checks"]["mongo"]["error"]
+
+    @pytest.mark.edge_case
+    def test_warming_up_until_warm_up_finishes(self, client, monkeypatch):
+        """Probes arriving before the startup warm-up completes get 503 warming_up."""
+        pending = MagicMock()
+        pending.done.return_value = False
+        monkeypatch.setattr(storyteller_fastapi, "warmup_task", pending)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+    @pytest.mark.edge_case
+    def test_health_is_unchanged(self, client):
+        """/health stays a cheap liveness check with the original body."""
+        assert client.get("/health").json() == {"status": "healthy", "database": "test"}
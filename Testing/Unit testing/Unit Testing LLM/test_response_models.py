@@ -0,0 +1,85 @@
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+import storyteller_fastapi
+from storyteller_fastapi import app
+
+
+def story(story_id, user_id, turns):
+    return {
+        "_id": ObjectId(story_id),
+        "title": "The Long Road",
+        "description": "A journey.",
+        "ownerid": [{"owner": ObjectId(user_id), "character": "Ash"}],
+        "dialect": "ORIGINAL: quiet",
+        "summary": "",
+        "content": [{"prompt": f"step {i}", "user": ObjectId(user_id), "response": "You walk on."} for i in range(turns)],
+        "complete": False
+    }
+
+
+def projected(story_doc):
+    """What STORY_RESPONSE_PROJECTION makes the server return for story_doc"""
+    turns = [{
+        "prompt": "" if turn.get("prompt") is None else turn["prompt"],
+        "user": "" if turn.get("user") is None else str(turn["user"]),
+        "response": "" if turn.get("response") is None else turn["response"]
+    } for turn in story_doc.get("content") or []]
+    return {**story_doc, "content": turns}
+
+
+def continue_story(story_doc, user_id):
+    """POST /story/continue over HTTP with the collection and chain mocked"""
+    with patch("storyteller_fastapi.story_collection") as collection, \
+         patch("storyteller_fastapi.story_chain") as story_chain, \
+         patch("storyteller_fastapi.summary_chain") as summary_chain:
+        collection.find_one = AsyncMock(side_effect=[story_doc, projected(story_doc)])
+        collection.update_one = AsyncMock()
+        story_chain.ainvoke = AsyncMock(return_value="You walk on.")
+        summary_chain.ainvoke = AsyncMock(return_value="Ash walked.")
+        return TestClient(app).post("/story/continue", json={
+            "story_id": str(story_doc["_id"]),
+            "user_id": user_id,
+            "user_action": "walk",
+            "api_key": "test"
+        })
+
+
+class TestResponseModels:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_endpoints_declare_response_models(self):
+        """Every JSON endpoint has a typed response model, so FastAPI takes the pydantic-core JSON path."""
+        for route in app.routes:
+            if getattr(route, "methods", None) and not route.path.startswith(("/docs", "/redoc", "/openapi")):
+                assert route.response_model is not None, route.path
+
+    @pytest.mark.happy_path
+    def test_long_story_serializes_every_turn(self):
+        """A story with hundreds of turns comes back with each turn's ObjectId as a string."""
+        story_id, user_id = str(ObjectId()), str(ObjectId())
+        response = continue_story(story(story_id, user_id, 500), user_id)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["story_id"] == story_id
+        assert len(data["content"]) == 500
+        assert data["content"][0] == {"prompt": "step 0", "user": user_id, "response": "You walk on."}
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_missing_fields_serialize_as_defaults(self):
+        """Turns without a prompt come back as "" from the projection; a missing owner entry is null."""
+        story_id, user_id = str(ObjectId()), str(ObjectId())
+        doc = story(story_id, user_id, 1)
+        doc["ownerid"] = []
+        doc["content"][0]["prompt"] = None
+        data = continue_story(doc, user_id).json()
+        assert data["character"] is None
+        assert data["content"][0]["prompt"] == ""
+
+    @pytest.mark.edge_case
+    def test_health_body_is_unchanged(self):
+        """The typed /health response keeps exactly the original keys."""
+        assert TestClient(app).get("/health").json() == {"status": "healthy", "database": storyteller_fastapi.DATABASE_NAME}
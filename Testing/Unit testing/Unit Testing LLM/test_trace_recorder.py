@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from trace_recorder import TraceRecorder, record_shape
+
+
+def make_client(path):
+    """Small app behind the recorder so the tests do not depend on MongoDB or the LLM."""
+    app = FastAPI()
+    app.add_middleware(TraceRecorder, path=str(path))
+
+    @app.post("/story/continue")
+    async def continue_story(body: dict):
+        record_shape(action_chars=len(body["user_action"]), turns=3)
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return TestClient(app)
+
+
+def read_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestTraceRecorder:
+    # -------------------- HAPPY PATHS --------------------
+    @pytest.mark.happy_path
+    def test_records_route_status_and_shape(self, tmp_path):
+        """Each request becomes one record with the route, status, timing and reported shape."""
+        trace_file = tmp_path / "trace.jsonl"
+        client = make_client(trace_file)
+        client.post("/story/continue", json={"user_action": "I open the door"})
+
+        header, record = read_trace(trace_file)
+        assert header["trace"] == 1
+        assert record["ep"] == "/story/continue"
+        assert record["m"] == "POST"
+        assert record["st"] == 200
+        assert record["d"] >= 0
+        assert record["shape"] == {"action_chars": 15, "turns": 3}
+
+    @pytest.mark.happy_path
+    def test_arrival_offsets_increase(self, tmp_path):
+        """Offsets are relative to the header so inter-arrival gaps can be rebuilt."""
+        trace_file = tmp_path / "trace.jsonl"
+        client = make_client(trace_file)
+        for _ in range(3):
+            client.get("/health")
+
+        records = read_trace(trace_file)[1:]
+        offsets = [r["t"] for r in records]
+        assert offsets == sorted(offsets)
+        assert all("shape" not in r for r in records)
+
+    # -------------------- EDGE CASES --------------------
+    @pytest.mark.edge_case
+    def test_text_is_never_recorded(self, tmp_path):
+        """Only sizes are written, never the request text itself."""
+        trace_file = tmp_path / "trace.jsonl"
+        client = make_client(trace_file)
+        client.post("/story/continue", json={"user_action": "my secret plan"})
+
+        assert "secret" not in trace_file.read_text(encoding="utf-8")
+
+    @pytest.mark.edge_case
+    def test_unknown_paths_are_anonymized(self, tmp_path):
+        """Requests that match no route are logged without their raw path."""
+        trace_file = tmp_path / "trace.jsonl"
+        client = make_client(trace_file)
+        client.get("/users/12345/private")
+
+        record = read_trace(trace_file)[1]
+        assert record["ep"] == "<unmatched>"
+        assert record["st"] == 404
+
+    @pytest.mark.edge_case
+    def test_record_shape_outside_request_is_noop(self):
+        """record_shape may be called when recording is disabled."""
+        record_shape(turns=5)